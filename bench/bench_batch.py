@@ -0,0 +1,108 @@
+"""Per-symbol indicator/score path vs. the vectorized batch engine.
+
+    python -m bench.bench_batch --symbols 15 100 300
+"""
+import argparse
+import json
+import random
+import time
+
+from src.app.domain.batch import score_batch, to_matrix
+from src.app.domain.indicators import ema, rsi, atr, NotEnoughData
+
+
+def _walk(n: int, rng: random.Random, start: float = 100.0):
+    closes, highs, lows = [], [], []
+    p = start
+    for _ in range(n):
+        p *= 1 + rng.gauss(0, 0.01)
+        closes.append(p)
+        highs.append(p * (1 + abs(rng.gauss(0, 0.004))))
+        lows.append(p * (1 - abs(rng.gauss(0, 0.004))))
+    return closes, highs, lows
+
+
+def make_universe(n_symbols: int, seed: int = 7):
+    rng = random.Random(seed)
+    uni = []
+    for _ in range(n_symbols):
+        d, _, _ = _walk(rng.choice([220, 220, 220, 150]), rng)  # bazı kısa geçmişler
+        h, _, _ = _walk(120, rng)
+        e = _walk(160, rng)
+        uni.append((d, h, e))
+    return uni
+
+
+def per_symbol(uni):
+    out = []
+    for d, h, (ec, eh, el) in uni:
+        try:
+            d50, d200 = ema(d, 50), ema(d, 200)
+            daily_ok = d[-1] > d50 > d200
+            h_ok = h[-1] > ema(h, 50)
+            e20, e50 = ema(ec, 20), ema(ec, 50)
+            r = rsi(ec, 14)
+            a = atr(eh, el, ec, 14)
+        except NotEnoughData:
+            out.append(10)
+            continue
+        score = 50
+        score += 15 if daily_ok else -10
+        score += 10 if h_ok else -8
+        score += 8 if e20 > e50 else -8
+        score += 6 if r >= 55 else (-6 if r <= 45 else 0)
+        _plan = (ec[-1], ec[-1] - 1.3 * a, ec[-1] + 2.0 * a)
+        out.append(max(0, min(100, int(score))))
+    return out
+
+
+def matrices(uni):
+    return (
+        to_matrix([u[0] for u in uni], 220),
+        to_matrix([u[1] for u in uni], 120),
+        to_matrix([u[2][0] for u in uni], 160),
+        to_matrix([u[2][1] for u in uni], 160),
+        to_matrix([u[2][2] for u in uni], 160),
+    )
+
+
+def batch(mats):
+    return score_batch(*mats).score.tolist()
+
+
+def _best(fn, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, nargs="+", default=[15, 100, 300])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    results = []
+    for n in args.symbols:
+        uni = make_universe(n)
+        mats = matrices(uni)
+        assert per_symbol(uni) == batch(mats), "batch/per-symbol score mismatch"
+        ps = _best(per_symbol, uni, args.repeat)
+        # listeden matris kurulumu ayrı raporlanır (columnar veriyle ~sıfır)
+        mt = _best(matrices, uni, args.repeat)
+        bt = _best(batch, mats, args.repeat)
+        results.append({
+            "symbols": n,
+            "per_symbol_ms": round(ps * 1000, 3),
+            "batch_ms": round(bt * 1000, 3),
+            "matrix_build_ms": round(mt * 1000, 3),
+            "speedup": round(ps / bt, 2) if bt > 0 else None,
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
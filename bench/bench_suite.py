@@ -0,0 +1,331 @@
+"""End-to-end benchmark suite against a local fake Binance server.
+
+    python -m bench.bench_suite --out bench-results.json
+    python -m bench.bench_suite --only refresh --symbols 15 100 --latency-ms 30 --p429 0.02
+    python -m bench.bench_suite --out new.json --compare bench-results.json --tolerance 0.25
+
+Sections:
+- refresh:    run_refresh latency (cold = full history fetch, warm = steady
+              state) for each universe size, with the per-stage breakdown
+- indicators: domain/indicators.py throughput (incremental updates, window functions)
+- api:        /signals requests per second in-process (plain, gzip, 304)
+- sqlite:     snapshot blob + history write cost
+
+Results are one JSON document. Keys ending in ``_ms`` are lower-is-better,
+``_per_s`` higher-is-better; ``--compare`` checks those against a baseline
+file and exits 1 on a regression beyond ``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench.fake_binance import FakeBinance
+
+# DB_PATH göreli (data/app.db): repo'daki veritabanına dokunmamak için geçici dizinde çalış
+_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CWD = os.getcwd()
+os.chdir(tempfile.mkdtemp(prefix="trader-bench-"))
+
+from src.app.domain import indicators as ind  # noqa: E402
+from src.app.domain.models import Decision, Plan, Signal  # noqa: E402
+from src.app.infra.http.binance_client import BinanceClient  # noqa: E402
+from src.app.infra.scheduler import jobs  # noqa: E402
+from src.app.infra.storage import db  # noqa: E402
+from src.app.services.market_service import MarketService  # noqa: E402
+
+SECTIONS = ("refresh", "indicators", "api", "sqlite")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_REPO, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+# -------- refresh_signals --------
+async def bench_refresh(sizes: list[int], latency_ms: float, p429: float, warm_runs: int, weight_limit: int) -> list:
+    out = []
+    fake = FakeBinance(symbols=max(sizes), latency_ms=latency_ms, p429=p429)
+    with fake.run() as base_url:
+        for n in sizes:
+            client = BinanceClient(base_url, weight_limit_1m=weight_limit)
+            market = MarketService(client, top_n=n, whitelist=[], min_quote_volume_24h=0.0)
+            jobs.store.signals = []
+            before = fake.stats()
+            try:
+                await jobs.run_refresh(market)
+                cold = jobs.store.runs[-1]
+                cold_requests = fake.stats()["requests"] - before["requests"]
+                warm = []
+                for _ in range(warm_runs):
+                    await jobs.run_refresh(market)
+                    warm.append(jobs.store.runs[-1]["duration_ms"])
+            finally:
+                await client.close()
+            after = fake.stats()
+            out.append({
+                "symbols": n,
+                "status": cold["status"],
+                "cold_ms": cold["duration_ms"],
+                "cold_stages": cold.get("stages"),
+                "cold_requests": cold_requests,
+                "warm_median_ms": round(statistics.median(warm), 3) if warm else None,
+                "warm_max_ms": max(warm) if warm else None,
+                "requests": after["requests"] - before["requests"],
+                "throttled": after["throttled"] - before["throttled"],
+                "signals": len(jobs.store.signals),
+                "error": jobs.store.last_error,
+            })
+    return out
+
+
+# -------- indicators --------
+def _series(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    p, c, h, l = 100.0, [], [], []
+    for _ in range(n):
+        p *= 1 + rng.gauss(0, 0.01)
+        c.append(p)
+        h.append(p * (1 + abs(rng.gauss(0, 0.004))))
+        l.append(p * (1 - abs(rng.gauss(0, 0.004))))
+    return c, h, l
+
+
+def _rate(fn, units: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return round(units / best, 1)
+
+
+def bench_indicators(n: int, repeat: int) -> dict:
+    c, h, l = _series(n)
+
+    def inc_ema():
+        e = ind.EMA(50)
+        for x in c:
+            e.update(x)
+
+    def inc_wema():
+        # canlı yolun kullandığı pencereli EMA (1d EMA200 / 220 mum)
+        e = ind.WindowedEMA(200, 220)
+        for x in c:
+            e.update(x)
+
+    def inc_rsi():
+        r = ind.RSI(14)
+        for x in c:
+            r.update(x)
+
+    def inc_atr():
+        a = ind.ATR(14)
+        for hi, lo, cl in zip(h, l, c):
+            a.update(hi, lo, cl)
+
+    # canlı yol: pencere fonksiyonları (160 mum) sembol başına
+    win = 160
+    windows = [(c[i:i + win], h[i:i + win], l[i:i + win]) for i in range(0, n - win, win)]
+
+    def window_fns():
+        for wc, wh, wl in windows:
+            ind.ema(wc, 20), ind.ema(wc, 50), ind.rsi(wc, 14), ind.atr(wh, wl, wc, 14)
+
+    return {
+        "values": n,
+        "ema_update_per_s": _rate(inc_ema, n, repeat),
+        "wema_update_per_s": _rate(inc_wema, n, repeat),
+        "rsi_update_per_s": _rate(inc_rsi, n, repeat),
+        "atr_update_per_s": _rate(inc_atr, n, repeat),
+        "window_sets_per_s": _rate(window_fns, len(windows), repeat),
+    }
+
+
+# -------- /signals --------
+def _fake_signals(n: int) -> list[Signal]:
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    out = []
+    for i in range(n):
+        px = 1 + rng.random() * 100
+        out.append(Signal(
+            symbol=f"S{i:03d}USDT",
+            decision=rng.choice(list(Decision)),
+            score=rng.randint(0, 100),
+            daily_trend_ok=rng.random() > 0.5,
+            updated_at=now - timedelta(seconds=rng.randint(0, 300)),
+            plan=Plan(entry=px, stop=px * 0.98, target=px * 1.03, rr=1.5),
+            reason=f"1d:OK 1h:NO EMA20/50:UP RSI:{rng.uniform(20, 80):.1f} OI:2 Spread:0.010% | bench",
+        ))
+    return out
+
+
+async def bench_api(n: int, requests: int, concurrency: int) -> dict:
+    import httpx
+    from src.app.main import app  # startup çalışmaz (lifespan yok), sadece route'lar
+
+    jobs.store.signals = _fake_signals(n)
+    jobs.store.last_updated = datetime.utcnow().isoformat()
+    jobs.store.publish()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        etag = (await http.get("/signals")).headers["etag"]
+
+        async def run(headers: dict) -> float:
+            sem = asyncio.Semaphore(concurrency)
+
+            async def one():
+                async with sem:
+                    r = await http.get("/signals", headers=headers)
+                    assert r.status_code in (200, 304), r.status_code
+
+            t0 = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(requests)))
+            return round(requests / (time.perf_counter() - t0), 1)
+
+        body = len((await http.get("/signals", headers={"Accept-Encoding": "identity"})).content)
+        return {
+            "signals": n,
+            "body_bytes": body,
+            "plain_per_s": await run({"Accept-Encoding": "identity"}),
+            "gzip_per_s": await run({"Accept-Encoding": "gzip"}),
+            "not_modified_per_s": await run({"If-None-Match": etag}),
+        }
+
+
+# -------- SQLite --------
+async def bench_sqlite(n: int, repeat: int) -> dict:
+    jobs.store.signals = _fake_signals(n)
+    jobs.store.last_updated = datetime.utcnow().isoformat()
+    payload = json.dumps({"last_updated": jobs.store.last_updated, "warning": None,
+                          "signals": [s.model_dump(mode="json") for s in jobs.store.signals]})
+    rows = [jobs._history_row(s) for s in jobs.store.signals]
+
+    snap, hist, full = [], [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await db.save_signals_snapshot(jobs.store.last_updated, payload)
+        snap.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        await db.save_signals_history(rows)
+        hist.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        await jobs.persist_snapshot()
+        full.append(time.perf_counter() - t0)
+    return {
+        "signals": n,
+        "payload_bytes": len(payload),
+        "snapshot_write_ms": _ms(statistics.median(snap)),
+        "history_write_ms": _ms(statistics.median(hist)),
+        "persist_snapshot_ms": _ms(statistics.median(full)),
+    }
+
+
+# -------- karşılaştırma --------
+def _flatten(obj, prefix: str = "") -> dict:
+    out = {}
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            out.update(_flatten(v, f"{prefix}.{k}" if prefix else k))
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            key = v.get("symbols", v.get("signals", i)) if isinstance(v, dict) else i
+            out.update(_flatten(v, f"{prefix}[{key}]"))
+    elif isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        out[prefix] = obj
+    return out
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[dict]:
+    cur, base = _flatten(current["results"]), _flatten(baseline["results"])
+    regressions = []
+    for key, old in base.items():
+        new = cur.get(key)
+        if new is None or not old or "stages" in key:
+            continue
+        if key.endswith("_ms"):
+            change = (new - old) / old          # pozitif = yavaşladı
+        elif key.endswith("_per_s"):
+            change = (old - new) / old          # pozitif = throughput düştü
+        else:
+            continue
+        if change > tolerance:
+            regressions.append({"metric": key, "baseline": old, "current": new, "worse_pct": round(change * 100, 1)})
+    return regressions
+
+
+async def run_suite(args) -> dict:
+    await db.init_db()
+    results = {}
+    if "refresh" in args.only:
+        results["refresh"] = await bench_refresh(args.symbols, args.latency_ms, args.p429, args.warm_runs, args.weight_limit)
+    if "indicators" in args.only:
+        results["indicators"] = bench_indicators(args.indicator_values, args.repeat)
+    if "api" in args.only:
+        results["api"] = [await bench_api(n, args.requests, args.concurrency) for n in args.symbols]
+    if "sqlite" in args.only:
+        results["sqlite"] = [await bench_sqlite(n, args.repeat) for n in args.symbols]
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark suite (fake Binance server, JSON output)")
+    ap.add_argument("--only", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    ap.add_argument("--symbols", type=int, nargs="+", default=[15, 100, 300])
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="fake server latency per request")
+    ap.add_argument("--p429", type=float, default=0.0, help="fraction of upstream requests answered 429")
+    ap.add_argument("--weight-limit", type=int, default=2400)
+    ap.add_argument("--warm-runs", type=int, default=3)
+    ap.add_argument("--indicator-values", type=int, default=100_000)
+    ap.add_argument("--requests", type=int, default=500, help="/signals requests per variant")
+    ap.add_argument("--concurrency", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", help="write the JSON here as well as stdout")
+    ap.add_argument("--compare", metavar="BASELINE", help="fail (exit 1) on regressions vs. this result file")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown for --compare")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    results = asyncio.run(run_suite(args))
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+            "elapsed_s": round(time.perf_counter() - t0, 3),
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(os.path.join(_CWD, args.compare)) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(os.path.join(_CWD, args.out), "w") as f:
+            f.write(text + "\n")
+    print(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
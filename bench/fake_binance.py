@@ -0,0 +1,213 @@
+"""Local fake of the Binance USD-M futures REST endpoints the bot uses.
+
+    with FakeBinance(symbols=300, latency_ms=20, p429=0.01).run() as base_url:
+        client = BinanceClient(base_url)
+
+    python -m bench.fake_binance --symbols 100 --port 8900   # standalone
+
+Prices are a deterministic function of (symbol, open_time), so incremental
+kline fetches line up with earlier ones exactly like the real API. Every
+request sleeps `latency_ms` (+- jitter); a `p429` fraction of them answers
+429 with ``Retry-After`` and the used-weight header is maintained per minute.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from src.app.infra.http.rate_limit import endpoint_weight
+from src.app.infra.storage.candles import INTERVAL_MS
+
+
+def _symbols(n: int) -> list[str]:
+    head = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "BNBUSDT", "DOGEUSDT", "ADAUSDT", "AVAXUSDT"]
+    return (head + [f"C{i:03d}USDT" for i in range(max(0, n - len(head)))])[:n]
+
+
+def _seed(symbol: str) -> int:
+    return sum((i + 1) * ord(ch) for i, ch in enumerate(symbol))
+
+
+@lru_cache(maxsize=200_000)
+def _kline_row(symbol: str, interval: str, ot: int) -> str:
+    step = INTERVAL_MS[interval]
+    s = _seed(symbol)
+    base = 1 + s % 500
+    k = ot / step
+    # yavaş trend + kısa dalga + deterministik gürültü
+    def px(x):
+        return base * (1 + 0.08 * math.sin(x / (40 + s % 23)) + 0.02 * math.sin(x / 5.3) + 0.004 * math.sin(x * 12.9898 + s))
+    o, c = px(k - 1), px(k)
+    r = random.Random(ot * 31 + s)
+    h = max(o, c) * (1 + 0.003 * r.random())
+    l = min(o, c) * (1 - 0.003 * r.random())
+    v = 1000 + 500 * r.random()
+    return json.dumps([ot, f"{o:.6f}", f"{h:.6f}", f"{l:.6f}", f"{c:.6f}", f"{v:.3f}", ot + step - 1,
+                       f"{v * c:.2f}", 100, f"{v / 2:.3f}", f"{v * c / 2:.2f}", "0"], separators=(",", ":"))
+
+
+class FakeBinance:
+    def __init__(self, symbols: int = 100, latency_ms: float = 0.0, jitter: float = 0.2, p429: float = 0.0,
+                 retry_after: int = 0, seed: int = 0):
+        self.symbols = _symbols(symbols)
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.p429 = p429
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self.requests: Counter = Counter()   # path -> istek sayısı
+        self.throttled = 0
+        self._minute = 0
+        self._used = 0
+        self.app = Starlette(routes=[
+            Route("/fapi/v1/ping", self._ping),
+            Route("/fapi/v1/exchangeInfo", self._exchange_info),
+            Route("/fapi/v1/ticker/24hr", self._ticker_24h),
+            Route("/fapi/v1/ticker/bookTicker", self._book_ticker),
+            Route("/fapi/v1/klines", self._klines),
+            Route("/futures/data/openInterestHist", self._oi_hist),
+        ])
+
+    # -------- ortak: gecikme / 429 / weight header --------
+    async def _gate(self, request: Request) -> Response | None:
+        path = request.url.path
+        self.requests[path] += 1
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000 * (1 + self.jitter * (2 * self._rng.random() - 1)))
+        if self.p429 and self._rng.random() < self.p429:
+            self.throttled += 1
+            return Response(b'{"code":-1003,"msg":"Too many requests."}', status_code=429,
+                            headers={"Retry-After": str(self.retry_after)}, media_type="application/json")
+        minute = int(time.time() // 60)
+        if minute != self._minute:
+            self._minute, self._used = minute, 0
+        self._used += endpoint_weight(path, dict(request.query_params))
+        return None
+
+    def _json(self, body) -> Response:
+        data = body if isinstance(body, bytes) else json.dumps(body, separators=(",", ":")).encode()
+        return Response(data, media_type="application/json", headers={"X-MBX-USED-WEIGHT-1M": str(self._used)})
+
+    async def _ping(self, request: Request):
+        return await self._gate(request) or self._json({})
+
+    async def _exchange_info(self, request: Request):
+        return await self._gate(request) or self._json({"symbols": [
+            {"symbol": s, "quoteAsset": "USDT", "contractType": "PERPETUAL", "status": "TRADING"} for s in self.symbols
+        ]})
+
+    def _last(self, symbol: str) -> float:
+        step = INTERVAL_MS["1m"]
+        now = int(time.time() * 1000)
+        return float(json.loads(_kline_row(symbol, "1m", now - now % step))[4])
+
+    async def _ticker_24h(self, request: Request):
+        if (r := await self._gate(request)) is not None:
+            return r
+        out = []
+        for i, s in enumerate(self.symbols):
+            last = self._last(s)
+            out.append({
+                "symbol": s,
+                "lastPrice": f"{last:.6f}",
+                "highPrice": f"{last * 1.04:.6f}",
+                "lowPrice": f"{last * 0.97:.6f}",
+                "priceChangePercent": f"{(_seed(s) % 17) - 8:.2f}",
+                # sıralama deterministik: baştaki semboller en likit
+                "quoteVolume": f"{5e9 / (i + 1):.2f}",
+            })
+        return self._json(out)
+
+    def _book(self, s: str) -> dict:
+        last = self._last(s)
+        return {"symbol": s, "bidPrice": f"{last * 0.99995:.6f}", "askPrice": f"{last * 1.00005:.6f}",
+                "bidQty": "10", "askQty": "10"}
+
+    async def _book_ticker(self, request: Request):
+        if (r := await self._gate(request)) is not None:
+            return r
+        sym = request.query_params.get("symbol")
+        return self._json(self._book(sym) if sym else [self._book(s) for s in self.symbols])
+
+    async def _klines(self, request: Request):
+        if (r := await self._gate(request)) is not None:
+            return r
+        q = request.query_params
+        symbol, interval = q["symbol"], q["interval"]
+        limit = min(1500, int(q.get("limit", 500)))
+        step = INTERVAL_MS[interval]
+        now = int(time.time() * 1000)
+        cur = now - now % step
+        start = q.get("startTime")
+        if start is None:
+            times = [cur - (limit - 1 - i) * step for i in range(limit)]
+        else:
+            first = int(start) + (-int(start)) % step
+            times = list(range(first, cur + 1, step))[:limit]
+        return self._json(("[" + ",".join(_kline_row(symbol, interval, t) for t in times) + "]").encode())
+
+    async def _oi_hist(self, request: Request):
+        if (r := await self._gate(request)) is not None:
+            return r
+        q = request.query_params
+        limit = int(q.get("limit", 30))
+        s = _seed(q["symbol"])
+        now = int(time.time() * 1000)
+        return self._json([
+            {"symbol": q["symbol"], "sumOpenInterest": f"{1e6 + s + 1000 * math.sin(i / 7 + s):.3f}",
+             "timestamp": now - (limit - i) * 300_000}
+            for i in range(limit)
+        ])
+
+    def stats(self) -> dict:
+        return {"requests": sum(self.requests.values()), "by_path": dict(self.requests), "throttled": self.throttled}
+
+    @contextlib.contextmanager
+    def run(self, port: int = 0):
+        """Serve on 127.0.0.1 in a background thread; yields the base URL."""
+        if not port:
+            with socket.socket() as sk:
+                sk.bind(("127.0.0.1", 0))
+                port = sk.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning",
+                                               access_log=False, lifespan="off"))
+        th = threading.Thread(target=server.run, name="fake-binance", daemon=True)
+        th.start()
+        while not server.started:
+            time.sleep(0.01)
+        try:
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.should_exit = True
+            th.join(timeout=5)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fake Binance futures REST server")
+    ap.add_argument("--symbols", type=int, default=100)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--p429", type=float, default=0.0, help="fraction of requests answered with 429")
+    ap.add_argument("--retry-after", type=int, default=1)
+    ap.add_argument("--port", type=int, default=8900)
+    args = ap.parse_args()
+    fake = FakeBinance(args.symbols, args.latency_ms, p429=args.p429, retry_after=args.retry_after)
+    uvicorn.run(fake.app, host="127.0.0.1", port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""API latency as plain ASGI middleware.
+
+Wraps only ``send``: the clock stops at ``http.response.start`` (time to the
+response head), so there is no per-request task or body-stream wrapping as
+with ``@app.middleware("http")``. WebSocket / lifespan scopes pass through.
+"""
+import time
+
+from ..infra.metrics import API_LATENCY
+
+
+class ApiLatency:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = time.perf_counter()
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                # path şablonu (/signals/history) => label kardinalitesi sabit;
+                # route, routing sırasında aynı scope'a yazılır
+                route = scope.get("route")
+                API_LATENCY.labels(
+                    scope["method"], route.path if route is not None else "unmatched", str(message["status"])
+                ).observe(time.perf_counter() - t0)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
@@ -0,0 +1,68 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response
+
+from ...infra.profiling import MODES, profiler
+from ...infra.scheduler.jobs import store
+from ...settings import settings
+
+
+def _check_token(x_admin_token: str | None = Header(default=None)):
+    # token yoksa admin kapalı: profil / stack verisi anonim açılmasın
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="admin endpoints disabled (set ADMIN_TOKEN)")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="invalid admin token")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(_check_token)])
+
+
+@router.get("/timings")
+def timings(sort: str = "total", limit: int = 50):
+    """Per-stage wall times (ms): last refresh cycle + slowest symbols."""
+    per_symbol = store.stage_timings or {}
+    rows = sorted(per_symbol.items(), key=lambda kv: kv[1].get(sort, 0.0), reverse=True)
+    return {
+        "cycle": store.last_stages,
+        "runs": [r for r in list(store.runs)[-10:] if "stages" in r],
+        "symbols": {sym: t for sym, t in rows[:limit]},
+    }
+
+
+@router.post("/profile")
+def arm_profile(cycles: int = 1, mode: str = "cprofile", interval_ms: float = 5.0):
+    """Profile the next `cycles` refresh cycles; fetch the file from /admin/profile/download."""
+    if mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {MODES}")
+    if not 1 <= cycles <= 20:
+        raise HTTPException(status_code=400, detail="cycles must be 1..20")
+    try:
+        profiler.arm(cycles, mode, interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.status()
+
+
+@router.get("/profile")
+def profile_status():
+    return profiler.status()
+
+
+@router.get("/profile/download")
+def profile_download(format: str = "raw", limit: int = 40, sort: str = "cumulative"):
+    """raw: .pstats / collapsed stacks file; text: pstats top-N (cprofile only)."""
+    if profiler.result is None:
+        raise HTTPException(status_code=404, detail="no finished profile (arm one with POST /admin/profile)")
+    if format == "text":
+        try:
+            return PlainTextResponse(profiler.summary(limit, sort))
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"unknown sort key: {sort}")
+    media = "text/plain" if profiler.result_name.endswith(".txt") else "application/octet-stream"
+    return Response(
+        profiler.result,
+        media_type=media,
+        headers={"Content-Disposition": f'attachment; filename="{profiler.result_name}"'},
+    )
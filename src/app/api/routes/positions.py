@@ -1,8 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
+import time
 
-from ...infra.storage.db import list_positions, upsert_position, delete_position
+from ...infra.scheduler.jobs import store
+from ...infra.storage.db import list_positions, list_position_events, upsert_position, delete_position
+from ...settings import settings
+from ...services import position_monitor
 
 router = APIRouter()
 
@@ -10,6 +15,22 @@ class OpenPositionIn(BaseModel):
     symbol: str
     entry_price: float | None = None
     note: str | None = None
+    side: str = "LONG"
+    # boşsa açılış anındaki son sinyal planı kullanılır ve satıra yazılır
+    stop: float | None = None
+    target: float | None = None
+    qty: float | None = None
+
+def _signal_plan(symbol: str):
+    for s in store.signals:
+        if s.symbol == symbol:
+            return s.plan
+    return None
+
+async def _reload_monitor():
+    # bu süreç izliyorsa hemen; diğer worker'larda lider reload_seconds içinde görür
+    if position_monitor.monitor is not None:
+        await position_monitor.monitor.reload()
 
 @router.get("/positions")
 async def get_positions():
@@ -17,11 +38,57 @@ async def get_positions():
 
 @router.post("/positions/open")
 async def open_position(body: OpenPositionIn):
+    side = body.side.upper()
+    if side not in (position_monitor.LONG, position_monitor.SHORT):
+        raise HTTPException(status_code=400, detail="side must be LONG or SHORT")
+    symbol = body.symbol.upper()
+    entry, stop, target = body.entry_price, body.stop, body.target
+    if side == position_monitor.LONG and None in (entry, stop, target):
+        # plan bir kez çözülür: sonraki sinyaller (güncel fiyattan entry) seviyeleri kaydırmasın
+        plan = _signal_plan(symbol)
+        if plan is not None:
+            entry = entry if entry is not None else plan.entry
+            stop = stop if stop is not None else plan.stop
+            target = target if target is not None else plan.target
     opened_at = datetime.utcnow().isoformat()
-    await upsert_position(body.symbol.upper(), opened_at, body.entry_price, body.note)
+    await upsert_position(symbol, opened_at, entry, body.note, side, stop, target, body.qty)
+    await _reload_monitor()
     return {"ok": True}
 
 @router.post("/positions/close")
 async def close_position(symbol: str):
     await delete_position(symbol.upper())
-    return {"ok": True}
\ No newline at end of file
+    await _reload_monitor()
+    return {"ok": True}
+
+@router.get("/positions/live")
+async def positions_live():
+    """Open positions with last mark price, unrealized PnL and breach state.
+
+    The leader answers from its monitor; other workers from the position rows
+    the monitor keeps updated (one poll interval behind).
+    """
+    m = position_monitor.monitor
+    if m is not None:
+        return {"active": True, "source": "monitor", "positions": m.positions(), "stats": m.stats()}
+    return {"active": settings.position_monitor_enabled, "source": "db", "positions": await list_positions()}
+
+@router.get("/positions/events")
+async def position_events(after: int = 0, wait: float = Query(0.0, ge=0.0, le=30.0)):
+    """Stop/target breach events with id > `after`; `wait` > 0 long-polls for the next one."""
+    events = await list_position_events(after)
+    deadline = time.monotonic() + wait
+    while not events and time.monotonic() < deadline:
+        m = position_monitor.monitor
+        left = deadline - time.monotonic()
+        if m is not None:
+            # lider: event yazılınca anında uyanır
+            await m.wait_new_event(left)
+        else:
+            await asyncio.sleep(min(0.25, left))
+        events = await list_position_events(after)
+    return {
+        "active": settings.position_monitor_enabled,
+        "events": events,
+        "last_id": events[-1]["id"] if events else after,
+    }
@@ -1,34 +1,196 @@
-from fastapi import APIRouter
-from ...infra.scheduler.jobs import store
+import asyncio
+import gzip
+import hashlib
+import json
+from collections import Counter
+from dataclasses import dataclass
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
+from ...infra.scheduler.jobs import SignalStore, store
+from ...services.signal_feed import feed
+from ...infra.storage.db import query_signals_history
 
 router = APIRouter()
 
 # Deploy kontrolü için (çıktıda görünmeli)
 BUILD_TAG = "API-SIGNALS-2026-02-26-v7"
 
-@router.get("/signals")
-def signals():
-    sigs = store.signals
+@dataclass
+class _Rendered:
+    version: int
+    warning: str | None
+    etag: str
+    body: bytes
+    gzip_body: bytes
+
+
+_rendered: _Rendered | None = None
+
 
-    buy = sum(1 for s in sigs if str(s.decision) == "AL")
-    sell = sum(1 for s in sigs if str(s.decision) == "SELL")
-    wait = sum(1 for s in sigs if str(s.decision) == "BEKLE")
+def _render(st: SignalStore, changed=None) -> _Rendered:
+    """Serialize + gzip the /signals payload once per snapshot (publish hook)."""
+    global _rendered
+    sigs = st.signals
+
+    counts = Counter(s.decision.value for s in sigs)
     total = len(sigs) or 1
 
     summary = {
-        "buyPct": round(buy * 100 / total, 1),
-        "sellPct": round(sell * 100 / total, 1),
-        "waitPct": round(wait * 100 / total, 1),
+        "buyPct": round(counts["AL"] * 100 / total, 1),
+        "sellPct": round(counts["SELL"] * 100 / total, 1),
+        "waitPct": round(counts["BEKLE"] * 100 / total, 1),
     }
 
-    return {
+    payload = {
         "build": BUILD_TAG,  # ✅ bunu /signals çıktısında göreceksin
         "count": len(sigs),
         "summary": summary,
-        "lastUpdated": store.last_updated,
+        "lastUpdated": st.last_updated,
         "signals": [s.model_dump(mode="json") for s in sigs],  # ✅ datetime-safe
-        "warning": store.last_error,
+        "warning": st.last_error,
+    }
+    # JSONResponse ile aynı encoding
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+    _rendered = _Rendered(
+        version=st.version,
+        warning=st.last_error,
+        etag=digest,
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=6, mtime=0),
+    )
+    return _rendered
+
+
+store.subscribe(_render)
+
+# çok worker'lı modda okuyucu worker'lar /signals'ı lider'in paylaşımlı snapshot'ından sunar
+_shared = None
+
+
+def use_shared(reader):
+    """Serve /signals from a SnapshotReader (None => this process' own store)."""
+    global _shared
+    _shared = reader
+
+
+def rendered() -> _Rendered:
+    """Current payload of the local store, re-rendered if stale."""
+    r = _rendered
+    if r is None or r.version != store.version or r.warning != store.last_error:
+        # hata mesajı publish dışında da değişebilir (refresh hatası, deadline)
+        r = _render(store)
+    return r
+
+
+def _etag_matches(if_none_match: str | None, digest: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag in (digest, digest + "-gz"):
+            return True
+    return False
+
+
+@router.get("/signals")
+def signals(request: Request):
+    r = _shared.current() if _shared is not None else None
+    if r is None:
+        r = rendered()
+
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    headers = {
+        # encoding başına farklı ETag (RFC 9110)
+        "ETag": f'"{r.etag}-gz"' if use_gzip else f'"{r.etag}"',
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
     }
+    if _etag_matches(request.headers.get("if-none-match"), r.etag):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=r.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=r.body, media_type="application/json", headers=headers)
+
+HEARTBEAT_SECONDS = 15
+
+
+@router.get("/signals/stream")
+async def signals_stream():
+    """SSE: snapshot on connect, then per-symbol deltas."""
+    sub = feed.subscribe()
+
+    async def events():
+        try:
+            while True:
+                try:
+                    msg = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # proxy'ler boşta bağlantıyı kesmesin
+                    yield ": ping\n\n"
+                    continue
+                yield f"data: {msg}\n\n"
+        finally:
+            feed.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/signals/ws")
+async def signals_ws(ws: WebSocket):
+    await ws.accept()
+    sub = feed.subscribe()
+
+    async def send():
+        while True:
+            await ws.send_text(await sub.queue.get())
+
+    async def receive():
+        # istemci mesajları yok sayılır; kopunca hemen döner (sonraki publish beklenmez)
+        while (await ws.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        feed.unsubscribe(sub)
+        for t in tasks:
+            t.cancel()
+        # gather değil: iptal edilirsek dışarıya sunucunun CancelledError'ı çıksın
+        await asyncio.wait(tasks)
+        for t in tasks:
+            if not t.cancelled():
+                t.exception()  # kopmada send hatası (WebSocketDisconnect / RuntimeError) beklenir
+
+
+@router.get("/signals/history")
+async def signals_history(
+    symbol: str | None = None,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(200, ge=1, le=1000),
+):
+    cur = None
+    if cursor:
+        # cursor: "<ts>|<id>" (bir önceki sayfanın next_cursor'ı)
+        ts, _, row_id = cursor.rpartition("|")
+        if not ts or not row_id.isdigit():
+            raise HTTPException(status_code=400, detail="invalid cursor")
+        cur = (ts, int(row_id))
+
+    rows = await query_signals_history(symbol.upper() if symbol else None, from_, to, cur, limit)
+    next_cursor = f"{rows[-1]['ts']}|{rows[-1]['id']}" if len(rows) == limit else None
+    return {"count": len(rows), "next_cursor": next_cursor, "signals": rows}
 
 @router.get("/signals/_debug")
 def signals_debug():
@@ -37,5 +199,13 @@ def signals_debug():
         "signals_count": len(store.signals),
         "last_updated": store.last_updated,
         "last_error": store.last_error,
+        "upstream": store.upstream,
+        "caches": store.caches,
+        "scan": store.scan,
+        "runs": list(store.runs)[-10:],
+        "skipped_runs": store.skipped_runs,
+        "eval": store.eval_backend,
+        "feed": feed.stats(),
+        "shared": _shared.stats() if _shared is not None else None,
         "file": __file__,
     }
@@ -0,0 +1,252 @@
+"""Vectorized replay of the live scoring rules over one symbol's history.
+
+Every entry-timeframe bar is evaluated as if it were the open candle right
+before its close, the way ``evaluate_input`` sees it: EMA / RSI run over the
+same rolling candle windows as live (``live_windows``), the 1h / 1d EMAs
+are the closed-candle EMAs peeked with the current price, so no future
+candle is ever used. Open interest and spread are not available historically, so they
+contribute no points.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import BUY, WAIT, atr_series, decision_array, score_array
+from .scoring import DEFAULT_PARAMS, ScoreParams
+
+
+@dataclass
+class Series:
+    """One interval's closed candles as float/int arrays (ascending)."""
+    open_time: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+
+# Canlı değerlendirme EMA/RSI'yi son `window` mum üzerinden (yeniden seed'li) hesaplar
+# (WindowedEMA / WindowedRSI). İkisi de y = a*y + (1-a)*x recurrence'ı: pencere
+# değeri = tam-geçmiş değeri + seed farkının a^(adım) kadar sönmüş hali, yani
+# bar başına O(1). NaN => NotEnoughData.
+
+def _smoothed(x: np.ndarray, period: int, window: int, a: float) -> np.ndarray:
+    """At each t: the recurrence over x[max(0, t - window + 1) : t + 1], seeded with the mean of its first `period` values."""
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < period:
+        return out
+    b = 1 - a
+    full = np.full(n, np.nan)
+    y = float(x[:period].sum()) / period
+    vals = [y]
+    for v in x[period:].tolist():
+        y = a * y + b * v
+        vals.append(y)
+    full[period - 1:] = vals
+    seeds = np.lib.stride_tricks.sliding_window_view(x, period).sum(axis=1) / period
+
+    t = np.arange(period - 1, n)
+    start = np.maximum(0, t - window + 1)
+    end = start + period - 1  # seed'in son indeksi
+    ok = end <= t
+    t, start, end = t[ok], start[ok], end[ok]
+    out[t] = full[t] + a ** (t - end) * (seeds[start] - full[end])
+    return out
+
+
+def _ema_1d(x: np.ndarray, period: int, window: int) -> np.ndarray:
+    return _smoothed(x, period, window, 1 - 2 / (period + 1))
+
+
+def _rsi_1d(x: np.ndarray, period: int, window: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) < period + 1:
+        return out
+    diff = np.diff(x)
+    a = (period - 1) / period
+    # pencerede window mum => window - 1 fark
+    ag = _smoothed(np.maximum(diff, 0.0), period, window - 1, a)
+    al = _smoothed(np.maximum(-diff, 0.0), period, window - 1, a)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = 100 - 100 / (1 + ag / al)
+    out[1:] = np.where(np.isnan(ag), np.nan, np.where(al == 0, 100.0, r))
+    return out
+
+
+def _peek_ema(htf: Series, step_ms: int, e_ot: np.ndarray, price: np.ndarray, period: int, window: int) -> np.ndarray:
+    """Higher-timeframe EMA at each entry bar, with the containing candle still open."""
+    if len(htf.close) == 0:
+        return np.full(price.shape, np.nan)
+    # pencere: window - 1 kapalı mum + fiyatla peek'lenen açık mum
+    closed = _ema_1d(htf.close, period, window - 1)
+    j = np.searchsorted(htf.open_time, e_ot, side="right") - 1
+    jj = np.clip(j, 0, None)
+    # j: entry bar'ı içeren (açık) üst-TF mumu; EMA bir önceki kapalı mumdan peek'lenir
+    ok = (j >= 0) & (htf.open_time[jj] + step_ms > e_ot)
+    prev = np.where(ok & (j >= 1), closed[np.clip(j - 1, 0, None)], np.nan)
+    k = 2 / (period + 1)
+    out = price * k + prev * (1 - k)
+    # tam period mumluk pencere: seed açık mumu da içerir
+    n_closed = np.minimum(jj, window - 1)
+    csum = np.concatenate([[0.0], np.cumsum(htf.close)])
+    seed_open = (csum[jj] - csum[jj - n_closed] + price) / period
+    return np.where(ok & (n_closed == period - 1), seed_open, out)
+
+
+def live_windows(entry_tf: str = "15m") -> tuple[int, int, int]:
+    """(entry, 1h, 1d) candle windows TrendScore is evaluated over live."""
+    from .strategy import TrendScore
+
+    c = TrendScore(entry_tf=entry_tf).requires().candles
+    return c[entry_tf], c["1h"], c["1d"]
+
+
+@dataclass
+class Evaluation:
+    valid: np.ndarray
+    score: np.ndarray
+    decision: np.ndarray
+    stop: np.ndarray
+    target: np.ndarray
+
+
+# ScoreParams'tan bağımsız (pahalı) kısım; parametre taramasında bir kez hesaplanır
+FEATURES = ("close", "high", "low", "daily_ok", "h_ok", "ema_up", "rsi", "atr", "valid")
+
+
+def features(
+    entry: Series,
+    hourly: Series,
+    daily: Series,
+    h_step_ms: int,
+    d_step_ms: int,
+    windows: tuple[int, int, int] | None = None,
+) -> dict[str, np.ndarray]:
+    """`windows`: (entry, 1h, 1d) EMA/RSI windows; default ``live_windows()``."""
+    w_e, w_h, w_d = windows or live_windows()
+    price = entry.close
+    e_ot = entry.open_time
+
+    d_ema50 = _peek_ema(daily, d_step_ms, e_ot, price, 50, w_d)
+    d_ema200 = _peek_ema(daily, d_step_ms, e_ot, price, 200, w_d)
+    h_ema50 = _peek_ema(hourly, h_step_ms, e_ot, price, 50, w_h)
+    e_ema20 = _ema_1d(price, 20, w_e)
+    e_ema50 = _ema_1d(price, 50, w_e)
+    e_rsi = _rsi_1d(price, 14, w_e)
+    e_atr = atr_series(entry.high[None, :], entry.low[None, :], price[None, :], 14)[0]
+
+    valid = ~np.isnan(np.stack([d_ema50, d_ema200, h_ema50, e_ema20, e_ema50, e_rsi, e_atr])).any(axis=0)
+    with np.errstate(invalid="ignore"):
+        return {
+            "close": price,
+            "high": entry.high,
+            "low": entry.low,
+            "daily_ok": (price > d_ema50) & (d_ema50 > d_ema200),
+            "h_ok": price > h_ema50,
+            "ema_up": e_ema20 > e_ema50,
+            "rsi": e_rsi,
+            "atr": e_atr,
+            "valid": valid,
+        }
+
+
+def evaluate_features(f: dict[str, np.ndarray], params: ScoreParams = DEFAULT_PARAMS) -> Evaluation:
+    """Cheap stage: score / decision / plan levels for one parameter set."""
+    # paylaşımlı bellekten float olarak gelebilir
+    daily_ok, h_ok, valid = (np.asarray(f[k], dtype=bool) for k in ("daily_ok", "h_ok", "valid"))
+    score = score_array(daily_ok, h_ok, np.asarray(f["ema_up"], dtype=bool), f["rsi"], p=params)
+    decision = np.where(valid, decision_array(score, daily_ok, h_ok, params), WAIT)
+    return Evaluation(
+        valid=valid,
+        score=np.where(valid, score, 10),
+        decision=decision,
+        stop=f["close"] - params.stop_atr * f["atr"],
+        target=f["close"] + params.target_atr * f["atr"],
+    )
+
+
+def evaluate(
+    entry: Series,
+    hourly: Series,
+    daily: Series,
+    h_step_ms: int,
+    d_step_ms: int,
+    params: ScoreParams = DEFAULT_PARAMS,
+    windows: tuple[int, int, int] | None = None,
+) -> Evaluation:
+    return evaluate_features(features(entry, hourly, daily, h_step_ms, d_step_ms, windows), params)
+
+
+# trade sonuçları
+TARGET, STOP, TIMEOUT = "target", "stop", "timeout"
+
+
+def simulate(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    ev: Evaluation,
+    start: int = 0,
+    max_hold: int = 96,
+    fee_pct: float = 0.08,
+) -> list[tuple]:
+    """Long trades from BUY bars, one position at a time.
+
+    Entry at the signal bar's close; exit at the stop or target price,
+    whichever is touched first (both in one bar => stop), or at the close after
+    `max_hold` bars. Trades still open at the end of data are dropped.
+    Returns (entry_index, exit_index, outcome, r_multiple) tuples; R is net of
+    `fee_pct` (round trip, % of notional).
+    """
+    n = len(close)
+    trades = []
+    free = start
+    for i in np.flatnonzero(ev.decision[start:] == BUY) + start:
+        if i < free:
+            continue
+        px, stop, target = close[i], ev.stop[i], ev.target[i]
+        risk = px - stop
+        if not risk > 0:
+            continue
+        end = i + 1 + max_hold
+        if end > n:
+            break
+        lo = low[i + 1:end] <= stop
+        hi = high[i + 1:end] >= target
+        s_at = int(np.argmax(lo)) if lo.any() else max_hold
+        t_at = int(np.argmax(hi)) if hi.any() else max_hold
+        if s_at == max_hold and t_at == max_hold:
+            j, outcome, exit_px = end - 1, TIMEOUT, close[end - 1]
+        elif s_at <= t_at:
+            j, outcome, exit_px = i + 1 + s_at, STOP, stop
+        else:
+            j, outcome, exit_px = i + 1 + t_at, TARGET, target
+        fee = fee_pct / 100 * (px + exit_px)
+        trades.append((int(i), int(j), outcome, float((exit_px - px - fee) / risk)))
+        free = j + 1
+    return trades
+
+
+def summarize(trades: list[tuple], signals: int, bars: int) -> dict:
+    r = np.array([t[3] for t in trades], dtype=float)
+    wins = sum(1 for t in trades if t[2] == TARGET)
+    losses = sum(1 for t in trades if t[2] == STOP)
+    equity = np.cumsum(r)
+    peak = np.maximum.accumulate(np.concatenate([[0.0], equity]))[1:] if len(r) else r
+    gross_win = float(r[r > 0].sum()) if len(r) else 0.0
+    gross_loss = float(-r[r < 0].sum()) if len(r) else 0.0
+    return {
+        "bars": bars,
+        "buy_signals": signals,
+        "trades": len(trades),
+        "wins": wins,
+        "losses": losses,
+        "timeouts": len(trades) - wins - losses,
+        "hit_rate": round(wins / len(trades), 4) if trades else None,
+        "avg_r": round(float(r.mean()), 4) if len(r) else None,
+        "total_r": round(float(r.sum()), 4),
+        "max_drawdown_r": round(float((peak - equity).max()), 4) if len(r) else 0.0,
+        "profit_factor": round(gross_win / gross_loss, 4) if gross_loss > 0 else None,
+    }
@@ -0,0 +1,198 @@
+"""Vectorized cross-symbol indicator/score engine.
+
+Inputs are 2-D (symbols x bars) float matrices, right-aligned (last column is
+the latest, possibly still-open candle) and left-padded with NaN for symbols
+with shorter histories. Every indicator returns a full (symbols x bars)
+series with NaN wherever the per-symbol reference function in
+``indicators.py`` would raise ``NotEnoughData``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from .scoring import DEFAULT_PARAMS, ScoreParams
+
+# decision kodları (Decision enum ile eşleşir)
+WAIT = 0
+BUY = 1
+SELL = -1
+
+
+def to_matrix(series: Sequence[Sequence[float]], width: int) -> np.ndarray:
+    """Right-align per-symbol series into a NaN-padded (symbols x width) matrix."""
+    out = np.full((len(series), width), np.nan)
+    for i, s in enumerate(series):
+        n = min(len(s), width)
+        if n:
+            out[i, width - n:] = np.asarray(s[len(s) - n:], dtype=float)
+    return out
+
+
+def _positions(x: np.ndarray) -> np.ndarray:
+    # her sembolün kendi serisindeki indeks (padding için -1)
+    valid = ~np.isnan(x)
+    return np.where(valid, np.cumsum(valid, axis=1) - 1, -1)
+
+
+def ema_series(x: np.ndarray, period: int) -> np.ndarray:
+    pos = _positions(x)
+    k = 2 / (period + 1)
+    csum = np.cumsum(np.nan_to_num(x), axis=1)
+    seed = pos == period - 1
+    # bar bazında yürürken sütunlar bitişik olsun diye (bars x symbols)
+    out = np.where(seed, csum / period, np.nan).T.copy()
+    xt = np.ascontiguousarray(x.T)
+    step = (pos >= period).T
+    start = int(np.argmax(seed.any(axis=0))) if seed.any() else x.shape[1]
+    for b in range(start + 1, x.shape[1]):
+        out[b] = np.where(step[b], xt[b] * k + out[b - 1] * (1 - k), out[b])
+    return out.T
+
+
+def rsi_series(x: np.ndarray, period: int = 14) -> np.ndarray:
+    pos = _positions(x)
+    S, B = x.shape
+    diff = np.full(x.shape, np.nan)
+    diff[:, 1:] = x[:, 1:] - x[:, :-1]
+    # pos: bu mumdaki fark sayısı
+    gain = np.where(pos >= 1, np.maximum(np.nan_to_num(diff), 0.0), 0.0)
+    loss = np.where(pos >= 1, np.maximum(-np.nan_to_num(diff), 0.0), 0.0)
+
+    seed = pos == period
+    cg = np.cumsum(gain, axis=1)
+    cl = np.cumsum(loss, axis=1)
+    avg_gain = np.where(seed, cg / period, np.nan).T.copy()
+    avg_loss = np.where(seed, cl / period, np.nan).T.copy()
+    gt, lt = np.ascontiguousarray(gain.T), np.ascontiguousarray(loss.T)
+    step = (pos > period).T
+    start = int(np.argmax(seed.any(axis=0))) if seed.any() else B
+    for b in range(start + 1, B):
+        avg_gain[b] = np.where(step[b], (avg_gain[b - 1] * (period - 1) + gt[b]) / period, avg_gain[b])
+        avg_loss[b] = np.where(step[b], (avg_loss[b - 1] * (period - 1) + lt[b]) / period, avg_loss[b])
+    avg_gain, avg_loss = avg_gain.T, avg_loss.T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        out = 100 - (100 / (1 + rs))
+    out = np.where(avg_loss == 0, 100.0, out)
+    out[np.isnan(avg_gain)] = np.nan
+    return out
+
+
+def atr_series(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    pos = _positions(close)
+    prev = np.full(close.shape, np.nan)
+    prev[:, 1:] = close[:, :-1]
+    tr = np.maximum.reduce([high - low, np.abs(high - prev), np.abs(low - prev)])
+    tr_ok = pos >= 1
+    tr = np.where(tr_ok, tr, 0.0)
+
+    # son `period` TR'nin basit ortalaması (cumsum farkı)
+    csum = np.cumsum(tr, axis=1)
+    window = np.zeros(close.shape)
+    window[:, period:] = csum[:, period:] - csum[:, :-period]
+    window[:, :period] = csum[:, :period]
+    out = np.where(pos >= period, window / period, np.nan)
+    return out
+
+
+def score_array(
+    daily_ok: np.ndarray,
+    h_ok: np.ndarray,
+    ema_up: np.ndarray,
+    rsi: np.ndarray,
+    oi: np.ndarray | float = 0.0,
+    spread: np.ndarray | float = np.nan,
+    p: ScoreParams = DEFAULT_PARAMS,
+) -> np.ndarray:
+    """Vectorized ``scoring.score`` (NaN spread => no spread points)."""
+    with np.errstate(invalid="ignore"):
+        score = np.full(np.shape(rsi), float(p.base_score))
+        score += np.where(daily_ok, p.daily_ok, p.daily_not_ok)
+        score += np.where(h_ok, p.h_ok, p.h_not_ok)
+        score += np.where(ema_up, p.ema_up, p.ema_down)
+        score += np.where(rsi >= p.rsi_bull, p.rsi_bull_pts, np.where(rsi <= p.rsi_bear, p.rsi_bear_pts, 0))
+        score += oi
+        score += np.where(spread <= p.tight_spread_pct, p.tight_spread_pts, 0)
+    return np.clip(score, 0, 100).astype(int)
+
+
+def decision_array(score: np.ndarray, daily_ok: np.ndarray, h_ok: np.ndarray, p: ScoreParams = DEFAULT_PARAMS) -> np.ndarray:
+    return np.where(
+        (score >= p.buy_score) & daily_ok & h_ok, BUY,
+        np.where((score <= p.sell_score) & ~h_ok, SELL, WAIT),
+    )
+
+
+@dataclass
+class BatchResult:
+    valid: np.ndarray        # bool, False => NotEnoughData
+    score: np.ndarray        # int
+    decision: np.ndarray     # WAIT/BUY/SELL
+    daily_ok: np.ndarray     # bool
+    h_ok: np.ndarray         # bool
+    ema_up: np.ndarray       # bool, entry EMA20 > EMA50
+    rsi: np.ndarray
+    atr: np.ndarray
+    entry: np.ndarray
+    stop: np.ndarray
+    target: np.ndarray
+    rr: np.ndarray
+
+
+def score_batch(
+    d_close: np.ndarray,
+    h_close: np.ndarray,
+    e_close: np.ndarray,
+    e_high: np.ndarray,
+    e_low: np.ndarray,
+    oi_score: np.ndarray | None = None,
+    spread_pct: np.ndarray | None = None,
+    params: ScoreParams = DEFAULT_PARAMS,
+) -> BatchResult:
+    """Vectorized version of the scoring in ``MarketService.build_signal_for``."""
+    S = d_close.shape[0]
+    oi = np.zeros(S) if oi_score is None else np.asarray(oi_score, dtype=float)
+    spread = np.full(S, np.nan) if spread_pct is None else np.asarray(spread_pct, dtype=float)
+
+    d_last = d_close[:, -1]
+    d_ema50 = ema_series(d_close, 50)[:, -1]
+    d_ema200 = ema_series(d_close, 200)[:, -1]
+    h_last = h_close[:, -1]
+    h_ema50 = ema_series(h_close, 50)[:, -1]
+    e_last = e_close[:, -1]
+    e_ema20 = ema_series(e_close, 20)[:, -1]
+    e_ema50 = ema_series(e_close, 50)[:, -1]
+    e_rsi = rsi_series(e_close, 14)[:, -1]
+    e_atr = atr_series(e_high, e_low, e_close, 14)[:, -1]
+
+    valid = ~np.isnan(np.stack([d_last, d_ema50, d_ema200, h_last, h_ema50, e_last, e_ema20, e_ema50, e_rsi, e_atr])).any(axis=0)
+
+    with np.errstate(invalid="ignore"):
+        daily_ok = (d_last > d_ema50) & (d_ema50 > d_ema200)
+        h_ok = h_last > h_ema50
+        ema_up = e_ema20 > e_ema50
+
+    score = score_array(daily_ok, h_ok, ema_up, e_rsi, oi, spread, params)
+
+    entry = e_last
+    stop = e_last - params.stop_atr * e_atr
+    target = e_last + params.target_atr * e_atr
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rr = np.where(entry - stop > 0, (target - entry) / (entry - stop), np.nan)
+
+    decision = decision_array(score, daily_ok, h_ok, params)
+
+    # NotEnoughData yolundaki sabit değerler
+    score = np.where(valid, score, 10)
+    decision = np.where(valid, decision, WAIT)
+    daily_ok = valid & daily_ok
+
+    return BatchResult(
+        valid=valid, score=score, decision=decision, daily_ok=daily_ok, h_ok=valid & h_ok,
+        ema_up=valid & ema_up, rsi=e_rsi, atr=e_atr, entry=entry, stop=stop, target=target, rr=rr,
+    )
+
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from array import array
+from typing import Sequence
+
+# kline satırındaki alan sırası (Binance /fapi/v1/klines, 12 alan)
+KLINE_FIELDS = 12
+COLUMNS = ("open_time", "open", "high", "low", "close", "volume", "quote_volume")
+_ROW_INDEX = {"open_time": 0, "open": 1, "high": 2, "low": 3, "close": 4, "volume": 5, "quote_volume": 7}
+
+
+def _empty(name: str) -> array:
+    return array("q") if name == "open_time" else array("d")
+
+
+class Candles:
+    """Columnar candles: one contiguous buffer per field.
+
+    Stored instances hold ``array`` columns and are never mutated after they
+    are published; ``tail()`` hands out memoryview slices over them, so the
+    domain layer reads the data without copying.
+    """
+
+    __slots__ = COLUMNS
+
+    def __init__(self, **cols: Sequence):
+        for name in COLUMNS:
+            setattr(self, name, cols[name] if name in cols else _empty(name))
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence]) -> "Candles":
+        cols = {}
+        for name, i in _ROW_INDEX.items():
+            if name == "open_time":
+                cols[name] = array("q", (int(r[i]) for r in rows))
+            else:
+                cols[name] = array("d", (float(r[i]) for r in rows))
+        return cls(**cols)
+
+    @classmethod
+    def from_tuples(cls, rows: Sequence[Sequence]) -> "Candles":
+        """Rows in COLUMNS order: (open_time, open, high, low, close, volume, quote_volume)."""
+        cols = {}
+        for i, name in enumerate(COLUMNS):
+            cols[name] = array("q" if name == "open_time" else "d", (r[i] for r in rows))
+        return cls(**cols)
+
+    @classmethod
+    def from_json(cls, body: bytes) -> "Candles":
+        """Decode a klines response body straight into columns.
+
+        Kline rows are flat arrays of numbers/number-strings, so stripping the
+        brackets and quotes leaves a flat comma separated token list that can
+        be sliced per column without building a list of lists.
+        """
+        tokens = body.translate(None, b'[]" \n\r\t').split(b",")
+        if tokens == [b""]:
+            return cls()
+        if len(tokens) % KLINE_FIELDS:
+            # beklenmeyen format => yavaş ama güvenli yol
+            return cls.from_rows(json.loads(body))
+        cols = {}
+        for name, i in _ROW_INDEX.items():
+            if name == "open_time":
+                cols[name] = array("q", map(int, tokens[i::KLINE_FIELDS]))
+            else:
+                cols[name] = array("d", map(float, tokens[i::KLINE_FIELDS]))
+        return cls(**cols)
+
+    def tail(self, limit: int) -> "Candles":
+        start = max(0, len(self) - limit)
+        return Candles(**{name: memoryview(getattr(self, name))[start:] for name in COLUMNS})
+
+    def merged(self, new: "Candles", capacity: int) -> "Candles":
+        """Copy-on-write merge: replace the open candle, append newer ones, trim to capacity."""
+        n_old, n_new = len(self), len(new)
+        last = self.open_time[-1] if n_old else None
+        start = 0
+        if last is not None:
+            while start < n_new and new.open_time[start] < last:
+                start += 1
+        if start == n_new:
+            return self
+        keep = n_old
+        if last is not None and new.open_time[start] == last:
+            keep -= 1
+        drop = max(0, keep + (n_new - start) - capacity)
+        old_from = min(drop, keep)
+        new_from = start + (drop - old_from)
+        out = {}
+        for name in COLUMNS:
+            col = getattr(self, name)[old_from:keep]
+            col.extend(getattr(new, name)[new_from:])
+            out[name] = col
+        return Candles(**out)
@@ -1,11 +1,12 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Optional
+from collections import deque
+from itertools import islice
+from typing import List, Optional, Sequence, Tuple
 
 class NotEnoughData(Exception):
     pass
 
-def ema(values: List[float], period: int) -> float:
+def ema(values: Sequence[float], period: int) -> float:
     if len(values) < period:
         raise NotEnoughData(f"Not enough data for EMA({period})")
     k = 2 / (period + 1)
@@ -14,7 +15,7 @@ def ema(values: List[float], period: int) -> float:
         e = (v * k) + (e * (1 - k))
     return e
 
-def rsi(values: List[float], period: int = 14) -> float:
+def rsi(values: Sequence[float], period: int = 14) -> float:
     if len(values) < period + 1:
         raise NotEnoughData(f"Not enough data for RSI({period})")
     gains = 0.0
@@ -38,7 +39,7 @@ def rsi(values: List[float], period: int = 14) -> float:
     rs = avg_gain / avg_loss
     return 100 - (100 / (1 + rs))
 
-def atr(highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> float:
+def atr(highs: Sequence[float], lows: Sequence[float], closes: Sequence[float], period: int = 14) -> float:
     if len(closes) < period + 1 or len(highs) != len(lows) or len(lows) != len(closes):
         raise NotEnoughData(f"Not enough data for ATR({period})")
     trs: List[float] = []
@@ -51,4 +52,331 @@ def atr(highs: List[float], lows: List[float], closes: List[float], period: int
         trs.append(tr)
     if len(trs) < period:
         raise NotEnoughData(f"Not enough data for ATR({period})")
-    return sum(trs[-period:]) / period
\ No newline at end of file
+    return sum(trs[-period:]) / period
+
+# ---------------------------------------------------------------------------
+# Incremental (stateful) indicators
+#
+# update(...) commits one closed candle; peek(...) returns the value as if the
+# given (still-open) candle were the next one, without touching the state.
+# The functions above are the reference implementations for these.
+# ---------------------------------------------------------------------------
+
+class SMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.window: deque = deque(maxlen=period)
+        self.total = 0.0
+
+    def _next_total(self, x: float) -> float:
+        if len(self.window) == self.period:
+            return self.total - self.window[0] + x
+        return self.total + x
+
+    def update(self, x: float):
+        self.total = self._next_total(x)
+        self.window.append(x)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.window) == self.period
+
+    @property
+    def value(self) -> float:
+        if not self.ready:
+            raise NotEnoughData(f"Not enough data for SMA({self.period})")
+        return self.total / self.period
+
+    def peek(self, x: float) -> float:
+        if len(self.window) < self.period - 1:
+            raise NotEnoughData(f"Not enough data for SMA({self.period})")
+        return self._next_total(x) / self.period
+
+    def to_dict(self) -> dict:
+        return {"kind": "sma", "period": self.period, "window": list(self.window)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "SMA":
+        o = cls(d["period"])
+        for x in d["window"]:
+            o.update(x)
+        return o
+
+
+class EMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2 / (period + 1)
+        self.count = 0
+        self.seed = 0.0  # ilk `period` değerin toplamı
+        self.e: Optional[float] = None
+
+    def _next(self, x: float) -> Tuple[int, float, Optional[float]]:
+        count = self.count + 1
+        if count < self.period:
+            return count, self.seed + x, None
+        if count == self.period:
+            seed = self.seed + x
+            return count, seed, seed / self.period
+        return count, self.seed, (x * self.k) + (self.e * (1 - self.k))
+
+    def update(self, x: float):
+        self.count, self.seed, self.e = self._next(x)
+
+    @property
+    def value(self) -> float:
+        if self.e is None:
+            raise NotEnoughData(f"Not enough data for EMA({self.period})")
+        return self.e
+
+    def peek(self, x: float) -> float:
+        e = self._next(x)[2]
+        if e is None:
+            raise NotEnoughData(f"Not enough data for EMA({self.period})")
+        return e
+
+    def to_dict(self) -> dict:
+        return {"kind": "ema", "period": self.period, "count": self.count, "seed": self.seed, "e": self.e}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "EMA":
+        o = cls(d["period"])
+        o.count, o.seed, o.e = d["count"], d["seed"], d["e"]
+        return o
+
+
+class RSI:
+    """Wilder RSI, same seeding as rsi()."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev: Optional[float] = None
+        self.count = 0  # işlenen fark sayısı
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _next(self, x: float) -> Tuple[int, float, float]:
+        if self.prev is None:
+            return 0, 0.0, 0.0
+        diff = x - self.prev
+        gain = max(diff, 0.0)
+        loss = max(-diff, 0.0)
+        p = self.period
+        count = self.count + 1
+        if count < p:
+            # seed aşamasında avg_* ham toplamları tutar
+            return count, self.avg_gain + gain, self.avg_loss + loss
+        if count == p:
+            return count, (self.avg_gain + gain) / p, (self.avg_loss + loss) / p
+        return count, (self.avg_gain * (p - 1) + gain) / p, (self.avg_loss * (p - 1) + loss) / p
+
+    def _value(self, count: int, avg_gain: float, avg_loss: float) -> float:
+        if count < self.period:
+            raise NotEnoughData(f"Not enough data for RSI({self.period})")
+        if avg_loss == 0:
+            return 100.0
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def update(self, x: float):
+        self.count, self.avg_gain, self.avg_loss = self._next(x)
+        self.prev = x
+
+    @property
+    def value(self) -> float:
+        return self._value(self.count, self.avg_gain, self.avg_loss)
+
+    def peek(self, x: float) -> float:
+        return self._value(*self._next(x))
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": "rsi", "period": self.period, "prev": self.prev, "count": self.count,
+            "avg_gain": self.avg_gain, "avg_loss": self.avg_loss,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RSI":
+        o = cls(d["period"])
+        o.prev, o.count, o.avg_gain, o.avg_loss = d["prev"], d["count"], d["avg_gain"], d["avg_loss"]
+        return o
+
+
+class ATR:
+    """Simple mean of the last `period` true ranges, same as atr()."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.trs = SMA(period)
+
+    def _tr(self, high: float, low: float) -> float:
+        pc = self.prev_close
+        return max(high - low, abs(high - pc), abs(low - pc))
+
+    def update(self, high: float, low: float, close: float):
+        if self.prev_close is not None:
+            self.trs.update(self._tr(high, low))
+        self.prev_close = close
+
+    @property
+    def value(self) -> float:
+        if not self.trs.ready:
+            raise NotEnoughData(f"Not enough data for ATR({self.period})")
+        return self.trs.value
+
+    def peek(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            raise NotEnoughData(f"Not enough data for ATR({self.period})")
+        try:
+            return self.trs.peek(self._tr(high, low))
+        except NotEnoughData:
+            raise NotEnoughData(f"Not enough data for ATR({self.period})") from None
+
+    def to_dict(self) -> dict:
+        return {"kind": "atr", "period": self.period, "prev_close": self.prev_close, "trs": self.trs.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ATR":
+        o = cls(d["period"])
+        o.prev_close = d["prev_close"]
+        o.trs = SMA.from_dict(d["trs"])
+        return o
+
+
+# ---------------------------------------------------------------------------
+# Windowed variants. The live path used to recompute ema()/rsi() over the
+# fetched window (220 / 120 / 160 candles), i.e. re-seeded on every rolling
+# window; a plain incremental EMA(200) seeded once drifts away from that.
+# These keep the window semantics exactly and stay O(1) per candle: the
+# windowed value is a^(L-p) * mean(first p) + alpha * sum a^(L-1-j) x_j,
+# so a sliding seed sum and a decaying tail sum are enough.
+# ---------------------------------------------------------------------------
+
+class _SeededFilter:
+    """Seeded exponential filter over the last `window` values (committed + peeked)."""
+
+    def __init__(self, period: int, window: int, alpha: float):
+        if window < period:
+            raise ValueError(f"window ({window}) < period ({period})")
+        self.period = period
+        self.window = window
+        self.alpha = alpha
+        self.a = 1.0 - alpha
+        self.buf: deque = deque()    # son window-1 commit edilmiş değer
+        self.seed = 0.0              # buf[0:period] toplamı
+        self.tail = 0.0              # sum a^(m-1-j) * buf[j], j >= period
+        self._drop_w = self.a ** (window - 1 - period)
+        self._drops = 0
+
+    def update(self, y: float):
+        buf, p = self.buf, self.period
+        buf.append(y)
+        if len(buf) <= p:
+            self.seed += y
+        else:
+            self.tail = self.a * self.tail + y
+        if len(buf) > self.window - 1:
+            # en eski değer düşer, buf[p] (varsa) seed bölgesine geçer
+            if len(buf) > p:
+                moved = buf[p]
+                self.tail -= self._drop_w * moved
+                self.seed += moved
+            self.seed -= buf.popleft()
+            self._drops += 1
+            if self._drops % p == 0:
+                # kayan toplamın yuvarlama hatası birikmesin
+                self.seed = sum(islice(buf, p))
+
+    def peek(self, y: float) -> Optional[float]:
+        m, p = len(self.buf), self.period
+        if m + 1 < p:
+            return None
+        if m + 1 == p:
+            return (self.seed + y) / p
+        return (self.a ** (m + 1 - p)) * self.seed / p + self.alpha * (self.a * self.tail + y)
+
+
+class WindowedEMA:
+    """EMA that equals ema(values[-window:], period), `values` ending with the peeked one."""
+
+    def __init__(self, period: int, window: int):
+        self.period = period
+        self.window = window
+        self.f = _SeededFilter(period, window, 2 / (period + 1))
+
+    def update(self, x: float):
+        self.f.update(x)
+
+    def peek(self, x: float) -> float:
+        e = self.f.peek(x)
+        if e is None:
+            raise NotEnoughData(f"Not enough data for EMA({self.period})")
+        return e
+
+    def to_dict(self) -> dict:
+        return {"kind": "wema", "period": self.period, "window": self.window, "values": list(self.f.buf)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "WindowedEMA":
+        o = cls(d["period"], d["window"])
+        for x in d["values"]:
+            o.update(x)
+        return o
+
+
+class WindowedRSI:
+    """Wilder RSI that equals rsi(values[-window:], period)."""
+
+    def __init__(self, period: int, window: int):
+        self.period = period
+        self.window = window
+        self.prev: Optional[float] = None
+        # window kapanışı => window-1 fark
+        self.gains = _SeededFilter(period, window - 1, 1 / period)
+        self.losses = _SeededFilter(period, window - 1, 1 / period)
+        self.closes: deque = deque(maxlen=window - 1)  # serileştirme için
+
+    def update(self, x: float):
+        if self.prev is not None:
+            diff = x - self.prev
+            self.gains.update(max(diff, 0.0))
+            self.losses.update(max(-diff, 0.0))
+        self.prev = x
+        self.closes.append(x)
+
+    def peek(self, x: float) -> float:
+        if self.prev is None:
+            raise NotEnoughData(f"Not enough data for RSI({self.period})")
+        diff = x - self.prev
+        avg_gain = self.gains.peek(max(diff, 0.0))
+        avg_loss = self.losses.peek(max(-diff, 0.0))
+        if avg_gain is None or avg_loss is None:
+            raise NotEnoughData(f"Not enough data for RSI({self.period})")
+        if avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def to_dict(self) -> dict:
+        return {"kind": "wrsi", "period": self.period, "window": self.window, "closes": list(self.closes)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "WindowedRSI":
+        o = cls(d["period"], d["window"])
+        for x in d["closes"]:
+            o.update(x)
+        return o
+
+
+_KINDS = {"sma": SMA, "ema": EMA, "rsi": RSI, "atr": ATR, "wema": WindowedEMA, "wrsi": WindowedRSI}
+
+
+def indicator_from_dict(d: dict):
+    return _KINDS[d["kind"]].from_dict(d)
+
+
+def make_indicator(kind: str, period: int, window: int | None = None):
+    """`window` given => EMA / RSI with the reference functions' rolling-window semantics."""
+    if window is not None and kind in ("ema", "rsi"):
+        return _KINDS["w" + kind](period, window)
+    return _KINDS[kind](period)
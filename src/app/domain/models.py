@@ -13,6 +13,12 @@ class Plan(BaseModel):
     target: float | None = None
     rr: float | None = None
 
+class StrategyOutcome(BaseModel):
+    decision: Decision
+    score: int
+    plan: Plan | None = None
+    reason: str | None = None
+
 class Signal(BaseModel):
     symbol: str
     decision: Decision
@@ -20,4 +26,6 @@ class Signal(BaseModel):
     daily_trend_ok: bool
     updated_at: datetime
     plan: Plan | None = None
-    reason: str | None = None  # MVP: tek cümle gerekçe
\ No newline at end of file
+    reason: str | None = None  # MVP: tek cümle gerekçe
+    # STRATEGIES birden fazla ise: strateji adı -> sonucu (ana alanlar ilk stratejiden)
+    strategies: dict[str, StrategyOutcome] | None = None
@@ -0,0 +1,116 @@
+"""Scoring / plan / decision rules shared by live evaluation, batch and backtest.
+
+All weights and thresholds live in ``ScoreParams``; scalar helpers are used
+by ``MarketService.build_signal_for``, the vectorized engines (``batch.py``,
+``backtest.py``) apply the same parameters with numpy.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, fields, replace
+
+
+def _coerce(name: str, default, v):
+    if isinstance(default, int):
+        f = float(v)
+        # 72.5 sessizce 72'ye kırpılmasın
+        if not f.is_integer():
+            raise ValueError(f"score param {name} must be an integer, got {v!r}")
+        return int(f)
+    return type(default)(v)
+
+
+@dataclass(frozen=True)
+class ScoreParams:
+    base_score: int = 50
+    # trend / momentum puanları
+    daily_ok: int = 15
+    daily_not_ok: int = -10
+    h_ok: int = 10
+    h_not_ok: int = -8
+    ema_up: int = 8
+    ema_down: int = -8
+    rsi_bull: float = 55.0
+    rsi_bear: float = 45.0
+    rsi_bull_pts: int = 6
+    rsi_bear_pts: int = -6
+    tight_spread_pct: float = 0.05
+    tight_spread_pts: int = 6
+    # plan (ATR katları)
+    stop_atr: float = 1.3
+    target_atr: float = 2.0
+    # karar eşikleri
+    buy_score: int = 70
+    sell_score: int = 35
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ScoreParams":
+        """Partial dicts override the defaults; unknown keys are an error."""
+        unknown = set(d) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"unknown score params: {sorted(unknown)}")
+        default = cls()
+        # tipler default'un tipine çekilir (JSON'dan 70.0 / "70" gelebilir)
+        return replace(default, **{k: _coerce(k, getattr(default, k), v) for k, v in d.items()})
+
+    @classmethod
+    def from_json(cls, s: str | None) -> "ScoreParams":
+        return cls.from_dict(json.loads(s)) if s else cls()
+
+
+DEFAULT_PARAMS = ScoreParams()
+
+
+def oi_points(first: float, last: float) -> int:
+    """Open-interest change over the window => score points."""
+    if first <= 0:
+        return 0
+    change = (last - first) / first
+    if change > 0.02:
+        return 8
+    if change > 0.0:
+        return 4
+    if change < -0.02:
+        return -6
+    return -2
+
+
+def score(
+    daily_ok: bool,
+    h_ok: bool,
+    ema_up: bool,
+    rsi: float,
+    oi_score: int = 0,
+    spread_pct: float | None = None,
+    p: ScoreParams = DEFAULT_PARAMS,
+) -> int:
+    s = p.base_score
+    s += p.daily_ok if daily_ok else p.daily_not_ok
+    s += p.h_ok if h_ok else p.h_not_ok
+    s += p.ema_up if ema_up else p.ema_down
+    s += p.rsi_bull_pts if rsi >= p.rsi_bull else (p.rsi_bear_pts if rsi <= p.rsi_bear else 0)
+    s += oi_score
+    if spread_pct is not None and spread_pct <= p.tight_spread_pct:
+        s += p.tight_spread_pts
+    return max(0, min(100, int(s)))
+
+
+def plan(last: float, atr: float, p: ScoreParams = DEFAULT_PARAMS) -> tuple[float, float, float, float | None]:
+    """(entry, stop, target, rr)"""
+    entry = last
+    stop = last - p.stop_atr * atr
+    target = last + p.target_atr * atr
+    rr = (target - entry) / (entry - stop) if (entry - stop) > 0 else None
+    return entry, stop, target, rr
+
+
+def decide(score_: int, daily_ok: bool, h_ok: bool, p: ScoreParams = DEFAULT_PARAMS) -> str:
+    """Decision value ("AL" / "SELL" / "BEKLE")."""
+    if score_ >= p.buy_score and daily_ok and h_ok:
+        return "AL"
+    if score_ <= p.sell_score and not h_ok:
+        return "SELL"
+    return "BEKLE"
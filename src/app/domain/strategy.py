@@ -0,0 +1,207 @@
+"""Strategy plugins: declared data requirements + evaluation over shared market state.
+
+Each strategy says what it needs (candle lookback per interval, indicators,
+open interest, spread). ``merge`` folds the requirements of every enabled
+strategy into one fetch plan: the longest lookback per interval, the union of
+indicators. MarketService fetches that plan once per symbol; each strategy's
+EMA / RSI run over its own declared lookback (strategies with the same
+lookback share them), so enabling another strategy never shifts the values
+an existing one sees.
+
+Indicator specs are ``(kind, period)`` tuples with kind ``ema`` / ``rsi`` /
+``atr``; their values appear in the state as ``"{kind}{period}"`` (``ema50``,
+``rsi14``) next to ``close``.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from . import scoring
+from .indicators import NotEnoughData
+
+IndicatorSpec = Tuple[str, int]
+INDICATOR_KINDS = ("ema", "rsi", "atr")
+
+
+@dataclass(frozen=True)
+class Requirements:
+    candles: Mapping[str, int] = field(default_factory=dict)                   # interval -> lookback
+    indicators: Mapping[str, frozenset] = field(default_factory=dict)          # interval -> {(kind, period)}
+    oi: bool = False
+    spread: bool = False
+
+    @classmethod
+    def of(cls, candles: Mapping[str, int], indicators: Mapping[str, Iterable[IndicatorSpec]] | None = None,
+           oi: bool = False, spread: bool = False) -> "Requirements":
+        inds = {iv: frozenset(specs) for iv, specs in (indicators or {}).items()}
+        for iv, specs in inds.items():
+            if iv not in candles:
+                raise ValueError(f"indicators on {iv} need a candle lookback for {iv}")
+            for kind, _ in specs:
+                if kind not in INDICATOR_KINDS:
+                    raise ValueError(f"unknown indicator kind: {kind}")
+        return cls(dict(candles), inds, oi, spread)
+
+
+def merge(reqs: Iterable[Requirements]) -> Requirements:
+    """One fetch / compute plan covering every requirement."""
+    candles: Dict[str, int] = {}
+    inds: Dict[str, set] = {}
+    oi = spread = False
+    for r in reqs:
+        for iv, n in r.candles.items():
+            candles[iv] = max(n, candles.get(iv, 0))
+        for iv, specs in r.indicators.items():
+            inds.setdefault(iv, set()).update(specs)
+        oi |= r.oi
+        spread |= r.spread
+    return Requirements(candles, {iv: frozenset(s) for iv, s in inds.items()}, oi, spread)
+
+
+@dataclass
+class MarketState:
+    """Everything the strategies see for one symbol in one evaluation."""
+    symbol: str
+    values: Dict[str, Dict[str, float]]            # interval -> {"close", "ema50", ...}
+    missing: Dict[str, Dict[str, str]] = field(default_factory=dict)  # henüz hesaplanamayanlar
+    spread_pct: float | None = None
+    oi: List[float] | None = None                  # sumOpenInterest, eskiden yeniye
+
+    def get(self, interval: str, key: str) -> float:
+        v = self.values.get(interval, {}).get(key)
+        if v is None:
+            msg = self.missing.get(interval, {}).get(key)
+            raise NotEnoughData(msg or f"Not enough data for {key} ({interval})")
+        return v
+
+
+@dataclass
+class StrategyResult:
+    score: int
+    decision: str                  # "AL" / "SELL" / "BEKLE"
+    plan: Tuple[float, float, float, float | None] | None  # (entry, stop, target, rr)
+    reason: str
+    trend_ok: bool = False
+
+
+class Strategy(ABC):
+    """Plugins are built as ``cls(params, entry_tf)`` (see ``build``)."""
+
+    name = ""
+
+    def __init__(self, params: scoring.ScoreParams = scoring.DEFAULT_PARAMS, entry_tf: str = "15m"):
+        self.p = params
+        self.entry_tf = entry_tf
+
+    @abstractmethod
+    def requires(self) -> Requirements:
+        """Candles / indicators / OI / spread this strategy reads."""
+
+    @abstractmethod
+    def evaluate(self, st: MarketState) -> StrategyResult:
+        """Score, decision and plan from the shared market state."""
+
+
+class TrendScore(Strategy):
+    """The original multi-timeframe trend score (scoring.score / plan / decide)."""
+
+    name = "trend"
+
+    def requires(self) -> Requirements:
+        return Requirements.of(
+            candles={"1d": 220, "1h": 120, self.entry_tf: 160},
+            indicators={
+                "1d": [("ema", 50), ("ema", 200)],
+                "1h": [("ema", 50)],
+                self.entry_tf: [("ema", 20), ("ema", 50), ("rsi", 14), ("atr", 14)],
+            },
+            oi=True,
+            spread=True,
+        )
+
+    def evaluate(self, st: MarketState) -> StrategyResult:
+        e = self.entry_tf
+        d_ema50, d_ema200 = st.get("1d", "ema50"), st.get("1d", "ema200")
+        daily_ok = (st.get("1d", "close") > d_ema50) and (d_ema50 > d_ema200)
+        h_ok = st.get("1h", "close") > st.get("1h", "ema50")
+        ema_up = st.get(e, "ema20") > st.get(e, "ema50")
+        rsi, atr, last = st.get(e, "rsi14"), st.get(e, "atr14"), st.get(e, "close")
+
+        oi_score = 0
+        if st.oi and len(st.oi) >= 5:
+            oi_score = scoring.oi_points(st.oi[0], st.oi[-1])
+
+        p = self.p
+        score = scoring.score(daily_ok, h_ok, ema_up, rsi, oi_score, st.spread_pct, p)
+        spread_str = "-" if st.spread_pct is None else f"{st.spread_pct:.3f}%"
+        reason = (
+            f"1d:{'OK' if daily_ok else 'NO'} "
+            f"1h:{'OK' if h_ok else 'NO'} "
+            f"EMA20/50:{'UP' if ema_up else 'DN'} "
+            f"RSI:{rsi:.1f} "
+            f"OI:{oi_score} "
+            f"Spread:{spread_str}"
+        )
+        return StrategyResult(
+            score=score,
+            decision=scoring.decide(score, daily_ok, h_ok, p),
+            plan=scoring.plan(last, atr, p),
+            reason=reason,
+            trend_ok=daily_ok,
+        )
+
+
+class RsiReversion(Strategy):
+    """Short-term oversold bounce inside a daily uptrend (RSI(7) on the entry timeframe)."""
+
+    name = "rsi_reversion"
+
+    def __init__(self, params: scoring.ScoreParams = scoring.DEFAULT_PARAMS, entry_tf: str = "15m",
+                 oversold: float = 25.0, overbought: float = 80.0, stop_atr: float = 1.0, target_atr: float = 1.5):
+        super().__init__(params, entry_tf)
+        self.oversold = oversold
+        self.overbought = overbought
+        self.stop_atr = stop_atr
+        self.target_atr = target_atr
+
+    def requires(self) -> Requirements:
+        return Requirements.of(
+            candles={"1d": 210, self.entry_tf: 60},
+            indicators={"1d": [("ema", 200)], self.entry_tf: [("rsi", 7), ("atr", 14)]},
+        )
+
+    def evaluate(self, st: MarketState) -> StrategyResult:
+        e = self.entry_tf
+        uptrend = st.get("1d", "close") > st.get("1d", "ema200")
+        rsi, atr, last = st.get(e, "rsi7"), st.get(e, "atr14"), st.get(e, "close")
+        if uptrend and rsi <= self.oversold:
+            score, decision = 75, "AL"
+        elif rsi >= self.overbought:
+            score, decision = 30, "SELL"
+        else:
+            score, decision = 50, "BEKLE"
+        stop, target = last - self.stop_atr * atr, last + self.target_atr * atr
+        rr = (target - last) / (last - stop) if last > stop else None
+        return StrategyResult(
+            score=score,
+            decision=decision,
+            plan=(last, stop, target, rr),
+            reason=f"1d>EMA200:{'OK' if uptrend else 'NO'} RSI7:{rsi:.1f}",
+            trend_ok=uptrend,
+        )
+
+
+STRATEGIES = {TrendScore.name: TrendScore, RsiReversion.name: RsiReversion}
+
+
+def build(names: Iterable[str], params: scoring.ScoreParams = scoring.DEFAULT_PARAMS, entry_tf: str = "15m") -> List[Strategy]:
+    """Strategy instances by name; the first one drives the Signal's main fields."""
+    out: List[Strategy] = []
+    for name in names:
+        cls = STRATEGIES.get(name)
+        if cls is None:
+            raise ValueError(f"unknown strategy: {name} (known: {sorted(STRATEGIES)})")
+        out.append(cls(params, entry_tf))
+    return out or [TrendScore(params, entry_tf)]
@@ -1,53 +1,149 @@
 import asyncio
+import json
 import random
+import time
 import httpx
 from typing import Any
 
+from ...domain.candles import Candles
+from ..metrics import UPSTREAM_LATENCY, UPSTREAM_RESPONSES, UPSTREAM_RETRIES
+from .rate_limit import (
+    PRIO_HIGH, PRIO_LOW, PRIO_NORMAL, BreakerRegistry, WeightLimiter, endpoint_weight,
+)
+
+
+class _EndpointMetrics:
+    """Metric children of one endpoint, bound once (hot path only increments)."""
+
+    __slots__ = ("path", "latency", "codes", "retry_429", "retry_5xx", "retry_transport")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.latency = UPSTREAM_LATENCY.labels(path)
+        self.codes: dict = {}
+        self.retry_429 = UPSTREAM_RETRIES.labels(path, "rate_limit")
+        self.retry_5xx = UPSTREAM_RETRIES.labels(path, "server_error")
+        self.retry_transport = UPSTREAM_RETRIES.labels(path, "transport")
+
+    def response(self, code: int):
+        c = self.codes.get(code)
+        if c is None:
+            c = self.codes[code] = UPSTREAM_RESPONSES.labels(self.path, str(code))
+        c.inc()
+
+
+def _safe_int(v, default: int) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return default
+
+
 class BinanceClient:
-    def __init__(self, base_url: str, max_concurrency: int = 6):
+    def __init__(
+        self,
+        base_url: str,
+        max_concurrency: int = 6,
+        weight_limit_1m: int = 2400,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self._sem = asyncio.Semaphore(max_concurrency)
+        self.limiter = WeightLimiter(weight_limit_1m)
+        self.breakers = BreakerRegistry()
+        self._metrics: dict[str, _EndpointMetrics] = {}
         self._client = httpx.AsyncClient(
             timeout=httpx.Timeout(14.0, connect=9.0),
             headers={"Accept": "application/json", "User-Agent": "trader-bot/1.0"},
+            # record/replay (infra/http/replay.py) burada takılır
+            transport=transport,
         )
 
     async def close(self):
         await self._client.aclose()
 
-    async def _get(self, path: str, params: dict | None = None) -> Any:
+    def budget(self) -> dict:
+        return {**self.limiter.snapshot(), "breakers": self.breakers.snapshot()}
+
+    async def _get(self, path: str, params: dict | None = None, priority: int = PRIO_NORMAL) -> Any:
+        return json.loads(await self._get_raw(path, params, priority))
+
+    async def _get_raw(self, path: str, params: dict | None = None, priority: int = PRIO_NORMAL) -> bytes:
         url = f"{self.base_url}{path}"
-        async with self._sem:
-            last_exc: Exception | None = None
-            # exponential backoff + jitter
-            for i in range(5):
-                try:
+        weight = endpoint_weight(path, params)
+        breaker = self.breakers.get(path)
+        m = self._metrics.get(path)
+        if m is None:
+            m = self._metrics[path] = _EndpointMetrics(path)
+        last_exc: Exception | None = None
+        # exponential backoff + jitter; bekleme sırasında slot tutulmaz
+        for i in range(5):
+            breaker.check(path)
+            await self.limiter.acquire(weight, priority)
+            try:
+                async with self._sem:
+                    t0 = time.perf_counter()
                     r = await self._client.get(url, params=params)
-                    # 429/5xx backoff
-                    if r.status_code in (429, 418) or 500 <= r.status_code <= 599:
-                        raise httpx.HTTPStatusError(f"upstream {r.status_code}", request=r.request, response=r)
+                    m.latency.observe(time.perf_counter() - t0)
+            except httpx.TransportError as e:
+                breaker.failure()
+                m.retry_transport.inc()
+                last_exc = e
+            else:
+                self.limiter.observe(r.headers)
+                m.response(r.status_code)
+                if r.status_code in (429, 418):
+                    m.retry_429.inc()
+                    # rate limit / IP ban: tüm trafiği durdur
+                    retry_after = _safe_int(r.headers.get("retry-after"), default=int(min(60, 2 ** (i + 1))))
+                    self.limiter.pause(retry_after)
+                    last_exc = httpx.HTTPStatusError(f"upstream {r.status_code}", request=r.request, response=r)
+                    continue
+                if 500 <= r.status_code <= 599:
+                    breaker.failure()
+                    m.retry_5xx.inc()
+                    last_exc = httpx.HTTPStatusError(f"upstream {r.status_code}", request=r.request, response=r)
+                else:
+                    # diğer 4xx tekrar denemeyle düzelmez
                     r.raise_for_status()
-                    return r.json()
-                except Exception as e:
-                    last_exc = e
-                    sleep_s = min(6.0, (0.6 * (2 ** i)) + random.random() * 0.25)
-                    await asyncio.sleep(sleep_s)
-            raise last_exc or RuntimeError("unknown upstream error")
-        
+                    breaker.success()
+                    return r.content
+            sleep_s = min(6.0, (0.6 * (2 ** i)) + random.random() * 0.25)
+            await asyncio.sleep(sleep_s)
+        raise last_exc or RuntimeError("unknown upstream error")
+
     async def exchange_info(self) -> dict:
-        return await self._get("/fapi/v1/exchangeInfo")
+        return await self._get("/fapi/v1/exchangeInfo", priority=PRIO_LOW)
+
     async def ping(self) -> dict:
         return await self._get("/fapi/v1/ping")
 
     async def ticker_24h(self) -> list[dict]:
         return await self._get("/fapi/v1/ticker/24hr")
 
-    async def book_ticker(self, symbol: str) -> dict:
-        return await self._get("/fapi/v1/ticker/bookTicker", params={"symbol": symbol})
+    async def book_ticker(self, symbol: str, priority: int = PRIO_HIGH) -> dict:
+        return await self._get("/fapi/v1/ticker/bookTicker", params={"symbol": symbol}, priority=priority)
+
+    async def book_tickers(self) -> list[dict]:
+        # tüm semboller tek çağrıda (weight 5)
+        return await self._get("/fapi/v1/ticker/bookTicker", priority=PRIO_HIGH)
 
-    async def klines(self, symbol: str, interval: str, limit: int = 200) -> list[list[Any]]:
-        # returns list of kline arrays
-        return await self._get("/fapi/v1/klines", params={"symbol": symbol, "interval": interval, "limit": limit})
+    async def klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 200,
+        start_time: int | None = None,
+        priority: int | None = None,
+    ) -> Candles:
+        # body doğrudan kolonlara decode edilir (list of lists kurulmaz)
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            # delta fetch: start_time dahil ve sonrasındaki mumlar
+            params["startTime"] = start_time
+        if priority is None:
+            priority = PRIO_LOW if interval == "1d" else PRIO_NORMAL
+        return Candles.from_json(await self._get_raw("/fapi/v1/klines", params=params, priority=priority))
 
     async def open_interest_hist(self, symbol: str, period: str = "5m", limit: int = 30) -> list[dict]:
         # Futures data endpoint (USDT-M)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+from array import array
+import random
+import traceback
+from typing import Iterable, List
+
+import websockets
+
+from ...domain.candles import Candles
+from ..storage.books import BookStore
+from ..storage.candles import CandleStore
+
+# Binance combined stream limiti bağlantı başına 200 stream
+MAX_STREAMS_PER_CONN = 200
+
+
+def _kline_candle(k: dict) -> Candles:
+    return Candles(
+        open_time=array("q", (k["t"],)),
+        open=array("d", (float(k["o"]),)),
+        high=array("d", (float(k["h"]),)),
+        low=array("d", (float(k["l"]),)),
+        close=array("d", (float(k["c"]),)),
+        volume=array("d", (float(k["v"]),)),
+        quote_volume=array("d", (float(k["q"]),)),
+    )
+
+
+class BinanceStream:
+    """Combined kline + bookTicker WebSocket ingestion into CandleStore/BookStore.
+
+    After every reconnect (and on any kline gap) the affected series are
+    resynced over REST, so the in-memory state never silently skips candles.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        candles: CandleStore,
+        books: BookStore,
+        intervals: Iterable[str],
+    ):
+        self.ws_url = ws_url.rstrip("/")
+        self.candles = candles
+        self.books = books
+        self.intervals = list(dict.fromkeys(intervals))
+        self.symbols: List[str] = []
+        self.connected = 0
+        self.reconnects = 0
+        self.last_error: str | None = None
+        self._tasks: List[asyncio.Task] = []
+        self._resyncs: set = set()
+
+    def _streams(self) -> List[str]:
+        out = []
+        for sym in self.symbols:
+            s = sym.lower()
+            out.extend(f"{s}@kline_{iv}" for iv in self.intervals)
+            out.append(f"{s}@bookTicker")
+        return out
+
+    def set_symbols(self, symbols: Iterable[str]):
+        symbols = sorted(set(symbols))
+        if symbols == self.symbols and self._tasks:
+            return
+        self.symbols = symbols
+        self._restart()
+
+    def _restart(self):
+        for t in self._tasks:
+            t.cancel()
+        streams = self._streams()
+        self._tasks = [
+            asyncio.create_task(self._run(streams[i: i + MAX_STREAMS_PER_CONN]))
+            for i in range(0, len(streams), MAX_STREAMS_PER_CONN)
+        ]
+
+    async def close(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, streams: List[str]):
+        url = f"{self.ws_url}/stream?streams={'/'.join(streams)}"
+        attempt = 0
+        first = True
+        while True:
+            try:
+                async with websockets.connect(url, ping_interval=20, max_queue=1024) as ws:
+                    self.connected += 1
+                    try:
+                        attempt = 0
+                        if not first:
+                            self.reconnects += 1
+                            await self._resync(streams)
+                        first = False
+                        async for msg in ws:
+                            self._on_message(msg)
+                    finally:
+                        self.connected -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.last_error = traceback.format_exc()
+            first = False
+            # exponential backoff + jitter
+            sleep_s = min(30.0, (1.0 * (2 ** attempt)) + random.random())
+            attempt = min(attempt + 1, 5)
+            await asyncio.sleep(sleep_s)
+
+    async def _resync(self, streams: List[str]):
+        keys = []
+        for st in streams:
+            sym, _, kind = st.partition("@")
+            if kind.startswith("kline_"):
+                keys.append((sym.upper(), kind[len("kline_"):]))
+        await asyncio.gather(
+            *(self.candles.refresh(sym, iv) for sym, iv in keys),
+            return_exceptions=True,
+        )
+
+    def _on_message(self, msg):
+        data = json.loads(msg).get("data") or {}
+        ev = data.get("e")
+        if ev == "kline":
+            k = data["k"]
+            sym = data["s"]
+            if not self.candles.apply(sym, k["i"], _kline_candle(k)):
+                # boşluk var => REST ile tamamla
+                t = asyncio.create_task(self.candles.refresh(sym, k["i"]))
+                self._resyncs.add(t)
+                t.add_done_callback(self._resyncs.discard)
+        elif ev == "bookTicker":
+            try:
+                self.books.update(data["s"], float(data["b"]), float(data["a"]))
+            except (KeyError, ValueError):
+                pass
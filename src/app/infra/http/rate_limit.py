@@ -0,0 +1,168 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict
+
+# Öncelikler: küçük sayı önce
+PRIO_HIGH = 0     # açık pozisyon / bookTicker
+PRIO_NORMAL = 1
+PRIO_LOW = 2      # günlük mumlar, exchangeInfo
+
+
+def endpoint_weight(path: str, params: dict | None) -> int:
+    """Request weight of a USD-M futures REST call (Binance docs)."""
+    params = params or {}
+    has_symbol = "symbol" in params
+    if path == "/fapi/v1/klines":
+        limit = int(params.get("limit", 500))
+        if limit < 100:
+            return 1
+        if limit < 500:
+            return 2
+        if limit <= 1000:
+            return 5
+        return 10
+    if path == "/fapi/v1/ticker/bookTicker":
+        return 2 if has_symbol else 5
+    if path == "/fapi/v1/ticker/24hr":
+        return 1 if has_symbol else 40
+    if path == "/fapi/v1/premiumIndex":
+        return 1 if has_symbol else 10
+    if path.startswith("/futures/data/"):
+        # ayrı IP limiti var (1000 istek / 5dk), dakikalık weight'e sayılmaz
+        return 0
+    return 1
+
+
+class WeightLimiter:
+    """Token bucket in request-weight units with priority queued waiters.
+
+    Kept slightly under the exchange limit and re-synced from
+    ``X-MBX-USED-WEIGHT-1M``; ``Retry-After`` pauses all traffic.
+    """
+
+    def __init__(self, limit_per_minute: int = 2400, safety: float = 0.9):
+        self.limit = limit_per_minute
+        self.capacity = limit_per_minute * safety
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.used_weight_1m: int | None = None
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._pump: asyncio.Task | None = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self, weight: int) -> bool:
+        self._refill()
+        if time.monotonic() < self.paused_until or self.tokens < weight:
+            return False
+        self.tokens -= weight
+        return True
+
+    async def acquire(self, weight: int, priority: int = PRIO_NORMAL):
+        if weight <= 0:
+            return
+        if not self._waiters and self._try_take(weight):
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), weight, fut))
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run())
+        await fut
+
+    async def _run(self):
+        while self._waiters:
+            _, _, weight, fut = self._waiters[0]
+            if fut.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._try_take(weight):
+                heapq.heappop(self._waiters)
+                fut.set_result(None)
+                continue
+            wait = max(self.paused_until - time.monotonic(), (weight - self.tokens) / self.rate, 0.01)
+            await asyncio.sleep(wait)
+
+    def observe(self, headers) -> None:
+        used = headers.get("x-mbx-used-weight-1m")
+        if used is None:
+            return
+        try:
+            self.used_weight_1m = int(used)
+        except ValueError:
+            return
+        self._refill()
+        self.tokens = min(self.tokens, self.capacity - self.used_weight_1m)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+    def snapshot(self) -> dict:
+        self._refill()
+        return {
+            "limit_1m": self.limit,
+            "used_weight_1m": self.used_weight_1m,
+            "tokens": round(self.tokens, 1),
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            "queued": sum(1 for w in self._waiters if not w[3].done()),
+        }
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Per-endpoint breaker: opens after `threshold` consecutive failures."""
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def check(self, name: str):
+        if self.state == "open":
+            raise CircuitOpen(f"circuit open: {name}")
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold or self.opened_at is not None:
+            # half-open denemesi de başarısız => tekrar aç
+            self.opened_at = time.monotonic()
+
+
+class BreakerRegistry:
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, path: str) -> CircuitBreaker:
+        b = self._breakers.get(path)
+        if b is None:
+            b = self._breakers[path] = CircuitBreaker(self.threshold, self.cooldown)
+        return b
+
+    def snapshot(self) -> dict:
+        return {p: {"state": b.state, "failures": b.failures} for p, b in self._breakers.items()}
@@ -0,0 +1,201 @@
+"""Record / replay of Binance REST traffic at the httpx transport level.
+
+    BinanceClient(url, transport=RecordingTransport(ResponseArchive("cycle.rec")))
+    BinanceClient(url, transport=ReplayTransport(ResponseArchive("cycle.rec", readonly=True), speed=0))
+
+The archive is a single SQLite file. Bodies are zlib-compressed and
+deduplicated by content hash (exchangeInfo, OI history etc. repeat a lot);
+each request row keeps status, the headers the client reads (weight,
+Retry-After), the upstream latency and a per-key sequence number.
+
+Replay serves the n-th request for a key with the n-th recorded response
+(the last one once exhausted). The key is method + path + sorted query; if
+there is no exact match (e.g. a different klines ``startTime`` because the
+candle store's refresh timing drifted) it falls back to the same request
+without time-window params. Wall clock is not virtualized: only the network
+is replaced.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+# istemcinin okuduğu header'lar; gerisi saklanmaz
+_KEEP_HEADERS = ("content-type", "x-mbx-used-weight-1m", "retry-after")
+# gevşek eşleşmede yok sayılan zaman penceresi parametreleri
+_WINDOW_PARAMS = ("startTime", "endTime")
+
+
+def _key(method: str, url: httpx.URL, loose: bool = False) -> str:
+    params = sorted((k, v) for k, v in url.params.multi_items() if not (loose and k in _WINDOW_PARAMS))
+    return f"{method} {url.path}?" + "&".join(f"{k}={v}" for k, v in params)
+
+
+class ResponseArchive:
+    """Compressed, indexed response store (one SQLite file)."""
+
+    def __init__(self, path: str | Path, level: int = 6, readonly: bool = False):
+        self.path = Path(path)
+        self.level = level
+        self.readonly = readonly
+        if readonly:
+            # replay: yanlış yol sessizce boş arşiv yaratıp her isteğe 404 dönmesin
+            if not self.path.is_file() or self.path.stat().st_size == 0:
+                raise FileNotFoundError(f"replay archive not found or empty: {self.path}")
+            self._db = sqlite3.connect(f"file:{self.path.resolve()}?mode=ro", uri=True)
+            try:
+                n = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            except sqlite3.DatabaseError as e:
+                self._db.close()
+                raise ValueError(f"not a response archive: {self.path} ({e})") from None
+            if not n:
+                self._db.close()
+                raise ValueError(f"replay archive has no responses: {self.path}")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS responses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    loose_key TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    status INTEGER NOT NULL,
+                    headers_json TEXT NOT NULL,
+                    body_hash TEXT NOT NULL,
+                    latency_ms REAL NOT NULL,
+                    recorded_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_responses_key ON responses(key, seq);
+                CREATE INDEX IF NOT EXISTS idx_responses_loose ON responses(loose_key, id);
+                """
+            )
+        self._seq: dict = defaultdict(int)
+        for key, n in self._db.execute("SELECT key, MAX(seq) + 1 FROM responses GROUP BY key"):
+            self._seq[key] = n
+        self._pending = 0
+
+    def add(self, method: str, url: httpx.URL, status: int, headers: httpx.Headers, body: bytes, latency_ms: float):
+        key = _key(method, url)
+        h = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._db.execute("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)", (h, zlib.compress(body, self.level)))
+        kept = {k: headers[k] for k in _KEEP_HEADERS if k in headers}
+        self._db.execute(
+            """
+            INSERT INTO responses (key, loose_key, seq, status, headers_json, body_hash, latency_ms, recorded_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (key, _key(method, url, loose=True), self._seq[key], status, json.dumps(kept), h, latency_ms, time.time()),
+        )
+        self._seq[key] += 1
+        self._pending += 1
+        if self._pending >= 200:
+            self.commit()
+
+    def commit(self):
+        if not self.readonly:
+            self._db.commit()
+        self._pending = 0
+
+    def load(self) -> tuple[dict, dict]:
+        """key / loose_key -> rows in recording order; row = (status, headers, body, latency_ms)."""
+        blobs = {h: zlib.decompress(d) for h, d in self._db.execute("SELECT hash, data FROM blobs")}
+        exact: dict = defaultdict(list)
+        loose: dict = defaultdict(list)
+        for key, lkey, status, hj, h, lat in self._db.execute(
+            "SELECT key, loose_key, status, headers_json, body_hash, latency_ms FROM responses ORDER BY id"
+        ):
+            row = (status, json.loads(hj), blobs[h], lat)
+            exact[key].append(row)
+            loose[lkey].append(row)
+        return dict(exact), dict(loose)
+
+    def stats(self) -> dict:
+        n, lat = self._db.execute("SELECT COUNT(*), COALESCE(SUM(latency_ms), 0) FROM responses").fetchone()
+        blobs, raw = self._db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+        return {"path": str(self.path), "responses": n, "unique_bodies": blobs, "stored_bytes": raw,
+                "recorded_latency_s": round(lat / 1000, 3)}
+
+    def close(self):
+        self.commit()
+        self._db.close()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass-through transport that archives every response with its latency."""
+
+    def __init__(self, archive: ResponseArchive, inner: httpx.AsyncBaseTransport | None = None):
+        self.archive = archive
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.perf_counter()
+        resp = await self.inner.handle_async_request(request)
+        body = await resp.aread()
+        latency_ms = (time.perf_counter() - t0) * 1000
+        self.archive.add(request.method, request.url, resp.status_code, resp.headers, body, latency_ms)
+        # aread() gövdeyi açtı: encoding/uzunluk header'ları artık geçersiz
+        headers = [(k, v) for k, v in resp.headers.multi_items() if k.lower() not in ("content-encoding", "content-length")]
+        return httpx.Response(resp.status_code, headers=headers, content=body, request=request,
+                              extensions=resp.extensions)
+
+    async def aclose(self):
+        await self.inner.aclose()
+        self.archive.close()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves archived responses; `speed` 1.0 = recorded latency, 0 = no delay, N = N x faster."""
+
+    def __init__(self, archive: ResponseArchive, speed: float = 0.0):
+        self.archive = archive
+        self.speed = speed
+        self._exact, self._loose = archive.load()
+        self._pos: dict = defaultdict(int)
+        self.hits = 0
+        self.loose_hits = 0
+        self.misses = 0
+
+    def _next(self, table: dict, key: str):
+        rows = table.get(key)
+        if not rows:
+            return None
+        i = self._pos[(id(table), key)]
+        self._pos[(id(table), key)] = i + 1
+        return rows[min(i, len(rows) - 1)]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        row = self._next(self._exact, _key(request.method, request.url))
+        if row is not None:
+            self.hits += 1
+        else:
+            row = self._next(self._loose, _key(request.method, request.url, loose=True))
+            if row is None:
+                self.misses += 1
+                body = json.dumps({"code": -1, "msg": f"not recorded: {request.url.path}"}).encode()
+                return httpx.Response(404, content=body, request=request)
+            self.loose_hits += 1
+        status, headers, body, latency_ms = row
+        if self.speed > 0:
+            await asyncio.sleep(latency_ms / 1000 / self.speed)
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "loose_hits": self.loose_hits, "misses": self.misses, "speed": self.speed}
+
+    async def aclose(self):
+        self.archive.close()
@@ -0,0 +1,289 @@
+"""Minimal Prometheus-style metrics (text exposition format 0.0.4).
+
+Metric families and their label children are created up front (or once per
+new label combination); the hot path only does ``child.inc()`` /
+``child.observe()``, i.e. a float add and a bisect into a fixed bucket list.
+Pull-time values (limiter weight, cache stats) are read through callbacks
+when /metrics is scraped.
+"""
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+# saniye; upstream / SQLite / API gecikmeleri için
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# refresh cycle süreleri
+CYCLE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    if v != v:
+        return "NaN"
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+class _Value:
+    __slots__ = ("value", "fn")
+
+    def __init__(self):
+        self.value = 0.0
+        self.fn: Callable[[], float] | None = None
+
+    def inc(self, n: float = 1.0):
+        self.value += n
+
+    def set(self, v: float):
+        self.value = v
+
+    def set_function(self, fn: Callable[[], float]):
+        self.fn = fn
+
+    def get(self) -> float:
+        if self.fn is not None:
+            try:
+                return float(self.fn() or 0.0)
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # son hücre: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float):
+        self.counts[bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+
+
+class _Family(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new(self):
+        """A fresh child for one label combination."""
+
+    def labels(self, *values: str):
+        """Child for one label combination; call sites should keep the result."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: expected labels {self.labelnames}")
+            child = self._children[values] = self._new()
+        return child
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Exposition lines (HELP / TYPE + samples)."""
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def _new(self):
+        return _Value()
+
+    def inc(self, n: float = 1.0):
+        self.labels().inc(n)
+
+    def render(self) -> List[str]:
+        out = self._header()
+        for values, child in self._children.items():
+            out.append(f"{self.name}{_labels(self.labelnames, values)} {_fmt(child.get())}")
+        return out
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, v: float):
+        self.labels().set(v)
+
+    def set_function(self, fn: Callable[[], float]):
+        self.labels().set_function(fn)
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, v: float):
+        self.labels().observe(v)
+
+    def render(self) -> List[str]:
+        out = self._header()
+        for values, child in self._children.items():
+            acc = 0
+            for bound, n in zip(self.buckets + (float("inf"),), child.counts):
+                acc += n
+                le = 'le="' + _fmt(bound) + '"'
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {acc}")
+            lbl = _labels(self.labelnames, values)
+            out.append(f"{self.name}_sum{lbl} {_fmt(child.sum)}")
+            out.append(f"{self.name}_count{lbl} {child.count}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+
+    def _add(self, fam: _Family) -> _Family:
+        existing = self._families.get(fam.name)
+        if existing is not None:
+            return existing
+        self._families[fam.name] = fam
+        return fam
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for fam in self._families.values():
+            if fam._children:
+                lines.extend(fam.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# -------- metrik aileleri (uygulama genelinde tek sefer) --------
+REFRESH_DURATION = REGISTRY.histogram(
+    "trader_refresh_duration_seconds", "Signal refresh cycle duration", ("status",), CYCLE_BUCKETS
+)
+REFRESH_SKIPPED = REGISTRY.counter("trader_refresh_skipped_total", "Refresh ticks skipped because a run was still active")
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "trader_upstream_request_duration_seconds", "Binance REST request latency", ("endpoint",)
+)
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    "trader_upstream_responses_total", "Binance REST responses by status code", ("endpoint", "code")
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "trader_upstream_retries_total", "Binance REST retries by reason", ("endpoint", "reason")
+)
+UPSTREAM_WEIGHT = REGISTRY.gauge("trader_upstream_used_weight_1m", "Last X-MBX-USED-WEIGHT-1M seen")
+UPSTREAM_TOKENS = REGISTRY.gauge("trader_upstream_weight_tokens", "Local request-weight bucket level")
+
+CACHE_LOOKUPS = REGISTRY.counter("trader_cache_lookups_total", "AsyncCache lookups by result", ("cache", "result"))
+CACHE_ENTRIES = REGISTRY.gauge("trader_cache_entries", "AsyncCache entry count", ("cache",))
+
+SQLITE_WRITE = REGISTRY.histogram("trader_sqlite_write_duration_seconds", "SQLite write latency", ("op",))
+
+STAGE_DURATION = REGISTRY.histogram(
+    "trader_stage_duration_seconds", "Wall time per evaluation / refresh stage", ("scope", "stage")
+)
+
+API_LATENCY = REGISTRY.histogram(
+    "trader_http_request_duration_seconds", "API request latency", ("method", "route", "status")
+)
+
+
+def bind_client(client) -> None:
+    """Pull-time gauges from the BinanceClient weight limiter."""
+    UPSTREAM_WEIGHT.set_function(lambda: client.limiter.used_weight_1m)
+    UPSTREAM_TOKENS.set_function(lambda: client.limiter.tokens)
+
+
+def bind_caches(caches: dict) -> None:
+    """name -> AsyncCache; counters are read from the cache at scrape time."""
+    for name, cache in caches.items():
+        for result, attr in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses"), ("coalesced", "coalesced")):
+            CACHE_LOOKUPS.labels(name, result).set_function(lambda c=cache, a=attr: getattr(c, a))
+        CACHE_ENTRIES.labels(name).set_function(lambda c=cache: c.stats()["entries"])
+
+
+class _StageChildren(dict):
+    """stage -> STAGE_DURATION child for one scope; a stage's child is created on first use."""
+
+    def __init__(self, scope: str):
+        super().__init__()
+        self.scope = scope
+
+    def __missing__(self, stage: str) -> _HistogramChild:
+        child = self[stage] = STAGE_DURATION.labels(self.scope, stage)
+        return child
+
+
+_STAGE_CHILDREN: Dict[str, _StageChildren] = {}
+
+
+def stage_children(scope: str) -> Dict[str, _HistogramChild]:
+    """Cached STAGE_DURATION children of one scope (mark/observe without a labels() lookup)."""
+    children = _STAGE_CHILDREN.get(scope)
+    if children is None:
+        children = _STAGE_CHILDREN[scope] = _StageChildren(scope)
+    return children
+
+
+class Spans:
+    """Sequential stage timer: ``mark(stage)`` closes the stage started at the previous mark.
+
+    Times are wall clock, so under asyncio.gather they include waiting for
+    other coroutines (i.e. what the stage actually cost in latency).
+    """
+
+    __slots__ = ("scope", "stages", "_t0", "_last", "_children")
+
+    def __init__(self, scope: str):
+        self.scope = scope
+        self.stages: Dict[str, float] = {}
+        self._children = stage_children(scope)
+        self._t0 = self._last = time.perf_counter()
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        dt = now - self._last
+        self._last = now
+        self.stages[stage] = self.stages.get(stage, 0.0) + dt
+        self._children[stage].observe(dt)
+
+    def done(self) -> Dict[str, float]:
+        """Stage -> milliseconds (plus 'total')."""
+        out = {k: round(v * 1000, 3) for k, v in self.stages.items()}
+        out["total"] = round((time.perf_counter() - self._t0) * 1000, 3)
+        return out
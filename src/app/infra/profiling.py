@@ -0,0 +1,187 @@
+"""On-demand profiling of the next N refresh cycles.
+
+``profiler.arm(cycles, mode)`` is called from the admin endpoint; run_refresh
+(and, with EVAL_MODE=event, every evaluating EventEvaluator tick) brackets each
+cycle with ``begin_cycle`` / ``end_cycle`` and the profiler is only active
+while an armed cycle runs. Only the fetcher process runs cycles
+(``enabled``); shared-snapshot readers refuse to arm. Everything on the event loop during
+that window is captured (stream handlers, API requests too), which is what a
+cycle really costs.
+
+- ``cprofile``: deterministic, result is a pstats file (``python -m pstats``,
+  snakeviz, ...).
+- ``sample``: a thread samples the loop thread's stack every `interval_ms`;
+  result is collapsed stacks (``flamegraph.pl`` / speedscope input). Much
+  lower overhead, suitable for production.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+MODES = ("cprofile", "sample")
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, thread_id: int, interval_s: float, max_depth: int = 128):
+        super().__init__(name="refresh-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_evt = threading.Event()
+        self._active = threading.Event()
+
+    def run(self):
+        while True:
+            # cycle'lar arasında duraklatılmış: örnek alınmaz
+            self._active.wait()
+            if self._stop_evt.wait(self.interval_s):
+                break
+            if not self._active.is_set():
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                co = frame.f_code
+                names.append(f"{co.co_name} ({os.path.basename(co.co_filename)}:{co.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def pause(self):
+        self._active.clear()
+
+    def resume(self):
+        self._active.set()
+
+    def stop(self):
+        self._stop_evt.set()
+        self._active.set()
+        self.join()
+
+
+class RefreshProfiler:
+    def __init__(self):
+        # refresh cycle'ını bu süreç mi çalıştırıyor (main._start_fetcher açar)
+        self.enabled = False
+        self.mode: str | None = None
+        self.remaining = 0
+        self.cycles = 0
+        self.interval_ms = 5.0
+        self._prof: cProfile.Profile | None = None
+        self._sampler: _Sampler | None = None
+        self._started: float | None = None
+        self.profiled_s = 0.0
+        self.samples = 0
+        self.result: bytes | None = None
+        self.result_name: str | None = None
+        self.finished_at: str | None = None
+
+    @property
+    def armed(self) -> bool:
+        return self.remaining > 0
+
+    def arm(self, cycles: int, mode: str = "cprofile", interval_ms: float = 5.0):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if not self.enabled:
+            raise RuntimeError("this worker runs no refresh cycles (shared-snapshot reader); profile the leader")
+        if self.armed:
+            raise RuntimeError("profiler already armed")
+        self.mode = mode
+        self.remaining = self.cycles = max(1, int(cycles))
+        self.interval_ms = max(0.5, float(interval_ms))
+        self.profiled_s = 0.0
+        self.samples = 0
+        self.result = self.result_name = self.finished_at = None
+
+    def begin_cycle(self):
+        if not self.armed:
+            return
+        if self.mode == "cprofile":
+            if self._prof is None:
+                self._prof = cProfile.Profile()
+            self._prof.enable()
+        else:
+            if self._sampler is None:
+                self._sampler = _Sampler(threading.get_ident(), self.interval_ms / 1000.0)
+                self._sampler.start()
+            self._sampler.resume()
+        self._started = time.perf_counter()
+
+    def end_cycle(self):
+        if not self.armed or self._started is None:
+            return
+        if self._prof is not None:
+            self._prof.disable()
+        if self._sampler is not None:
+            self._sampler.pause()
+        self.profiled_s += time.perf_counter() - self._started
+        self._started = None
+        self.remaining -= 1
+        if self.remaining == 0:
+            self._finish()
+
+    def _finish(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        if self._prof is not None:
+            # dump_stats ile aynı format (pstats.Stats(path) okur)
+            self._prof.create_stats()
+            self.result = marshal.dumps(self._prof.stats)
+            self.result_name = f"refresh-{stamp}.pstats"
+            self._prof = None
+        elif self._sampler is not None:
+            self._sampler.stop()
+            self.samples = self._sampler.samples
+            lines = [f"{stack} {n}" for stack, n in self._sampler.stacks.most_common()]
+            self.result = ("\n".join(lines) + "\n").encode()
+            self.result_name = f"refresh-{stamp}.collapsed.txt"
+            self._sampler = None
+        self.finished_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    def summary(self, limit: int = 40, sort: str = "cumulative") -> str:
+        """Text top-N of a finished cProfile capture."""
+        if not self.result or not (self.result_name or "").endswith(".pstats"):
+            return ""
+        out = io.StringIO()
+        st = pstats.Stats(_StatsSource(marshal.loads(self.result)), stream=out)
+        st.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def status(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "armed": self.armed,
+            "cycles": self.cycles,
+            "remaining": self.remaining,
+            "profiled_s": round(self.profiled_s, 3),
+            "samples": self._sampler.samples if self._sampler else self.samples,
+            "result": self.result_name,
+            "result_bytes": len(self.result) if self.result else 0,
+            "finished_at": self.finished_at,
+        }
+
+
+class _StatsSource:
+    """pstats.Stats kaynağı: create_stats() yapılmış profil gibi davranır."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+profiler = RefreshProfiler()
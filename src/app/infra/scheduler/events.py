@@ -0,0 +1,178 @@
+import asyncio
+import time
+import traceback
+import zlib
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from .jobs import evaluate_symbols, persist_snapshot, store
+from ..profiling import profiler
+from ..storage.candles import INTERVAL_MS
+from ...services.market_service import MarketService
+
+
+class EventEvaluator:
+    """Re-evaluates single symbols on entry-TF candle closes and price/spread moves.
+
+    Each symbol's candle-close trigger is shifted by a stable per-symbol
+    offset inside `stagger_seconds`, so the universe does not fire at :00.
+    """
+
+    def __init__(
+        self,
+        market: MarketService,
+        stagger_seconds: float = 20.0,
+        price_move_pct: float = 0.5,
+        poll_seconds: float = 5.0,
+        tick_seconds: float = 1.0,
+    ):
+        self.market = market
+        self.step = INTERVAL_MS[market.entry_tf] / 1000
+        self.stagger_seconds = stagger_seconds
+        self.price_move_pct = price_move_pct
+        self.poll_seconds = poll_seconds
+        self.tick_seconds = tick_seconds
+        self._due: Dict[str, float] = {}
+        # son değerlendirmedeki (mid, spread_yüksek_mi)
+        self._ref: Dict[str, Tuple[float, bool]] = {}
+        self._polled_at = 0.0
+        self._task: asyncio.Task | None = None
+        self.evaluations = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def _offset(self, symbol: str) -> float:
+        return self.stagger_seconds * (zlib.crc32(symbol.encode()) % 1000) / 1000
+
+    def _next_due(self, symbol: str, now: float) -> float:
+        boundary = (now // self.step) * self.step
+        due = boundary + self._offset(symbol)
+        return due if due > now else due + self.step
+
+    async def ensure(self, universe: List[str]) -> List[str]:
+        """Follow `universe`: evaluate newcomers once, drop symbols that left it."""
+        live = set(universe)
+        tracked = {s.symbol for s in store.signals}
+        new = [s for s in universe if s not in tracked]
+        signals = []
+        if new:
+            snapshot = await self.market.prefetch(new)
+            signals = await evaluate_symbols(self.market, new, snapshot)
+        # await sonrası güncel liste (tick'ler arada upsert etmiş olabilir)
+        prev = {s.symbol: s for s in store.signals}
+        fresh = {s.symbol: s for s in signals}
+        dropped = [s for s in prev if s not in live]
+        if not fresh and not dropped:
+            return []
+        store.signals = [fresh.get(s) or prev[s] for s in universe if s in fresh or s in prev]
+        for sym in dropped:
+            self._due.pop(sym, None)
+            self._ref.pop(sym, None)
+            self.market.stage_timings.pop(sym, None)
+        for sym in fresh:
+            book = self._book(sym)
+            if book is not None:
+                self._ref[sym] = book
+        store.last_updated = datetime.utcnow().isoformat()
+        await persist_snapshot(changed=signals)
+        return new
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            try:
+                await self._tick()
+            except Exception:
+                store.last_error = "event evaluator error:\n" + traceback.format_exc()
+
+    async def _poll_books(self, symbols: List[str], now: float):
+        if all(self.market.books.get(s) is not None for s in symbols):
+            return  # stream canlı
+        if now - self._polled_at < self.poll_seconds:
+            return
+        self._polled_at = now
+        try:
+            rows = await self.market.client.book_tickers()
+        except Exception:
+            return
+        wanted = set(symbols)
+        for row in rows:
+            sym = row.get("symbol")
+            if sym in wanted:
+                try:
+                    self.market.books.update(sym, float(row["bidPrice"]), float(row["askPrice"]))
+                except (KeyError, ValueError):
+                    pass
+
+    def _book(self, symbol: str) -> Tuple[float, bool] | None:
+        bt = self.market.books.get(symbol)
+        if bt is None or bt.bid <= 0 or bt.ask <= 0:
+            return None
+        mid = (bt.bid + bt.ask) / 2
+        return mid, ((bt.ask - bt.bid) / mid * 100.0) > self.market.max_spread_pct
+
+    def _price_triggered(self, symbol: str) -> bool:
+        cur = self._book(symbol)
+        ref = self._ref.get(symbol)
+        if cur is None or ref is None:
+            return False
+        moved = abs(cur[0] / ref[0] - 1) * 100 >= self.price_move_pct
+        return moved or cur[1] != ref[1]
+
+    async def _tick(self):
+        now = time.time()
+        symbols = [s.symbol for s in store.signals]
+        if not symbols:
+            return
+        await self._poll_books(symbols, now)
+
+        closed: List[str] = []
+        moved: List[str] = []
+        for sym in symbols:
+            due = self._due.get(sym)
+            if due is None:
+                self._due[sym] = self._next_due(sym, now)
+                if self._book(sym) is not None:
+                    self._ref.setdefault(sym, self._book(sym))
+            elif now >= due:
+                closed.append(sym)
+                self._due[sym] = self._next_due(sym, now)
+            elif self._price_triggered(sym):
+                moved.append(sym)
+        if not closed and not moved:
+            return
+        # değerlendiren tick = bir refresh cycle'ı (POST /admin/profile)
+        profiler.begin_cycle()
+        try:
+            await self._evaluate(closed, moved, now)
+        finally:
+            profiler.end_cycle()
+
+    async def _evaluate(self, closed: List[str], moved: List[str], now: float):
+        # kapanan mum henüz store'da yoksa delta ile çek (stream varsa zaten gelmiştir)
+        open_ms = int((now // self.step) * self.step * 1000)
+        await asyncio.gather(
+            *(self.market.candles.ensure(s, self.market.entry_tf, open_ms) for s in closed),
+            return_exceptions=True,
+        )
+
+        due_syms = closed + moved
+        snapshot = await self.market.prefetch(due_syms)
+        signals = await evaluate_symbols(self.market, due_syms, snapshot)
+        live = {s.symbol for s in store.signals}
+        # bu arada universe'den çıkanlar ne yayınlanır ne history'e yazılır
+        published = [sig for sig in signals if sig.symbol in live]
+        for sig in published:
+            store.upsert(sig)
+            book = self._book(sig.symbol)
+            if book is not None:
+                self._ref[sig.symbol] = book
+        self.evaluations += len(due_syms)
+        if published:
+            await persist_snapshot(changed=published)
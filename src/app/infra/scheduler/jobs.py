@@ -1,14 +1,27 @@
 import asyncio
 import json
+import time
 import traceback
-from typing import List
-from datetime import datetime
+from collections import deque
+from typing import Callable, List
+from datetime import datetime, timedelta
 
 from fastapi.encoders import jsonable_encoder
 
 from ...domain.models import Signal
 from ...services.market_service import MarketService
-from ..storage.db import save_signals_snapshot, load_latest_signals_snapshot
+from ..storage.db import (
+    save_signals_snapshot,
+    load_latest_signals_snapshot,
+    save_signals_history,
+    compact_signals_history,
+    save_candles,
+    load_recent_candles,
+    prune_candles,
+)
+from ...domain.candles import Candles
+from ..metrics import REFRESH_DURATION, REFRESH_SKIPPED, Spans
+from ..profiling import profiler
 
 
 class SignalStore:
@@ -17,6 +30,46 @@ class SignalStore:
         self.signals: List[Signal] = []
         self.last_error: str | None = None
         self.last_updated: str | None = None
+        self.upstream: dict | None = None  # Binance weight budget / breaker durumu
+        self.caches: dict | None = None
+        self.eval_backend: dict | None = None
+        self.scan: dict | None = None  # scanner modu istatistikleri
+        # son refresh run'ları (süre / durum)
+        self.runs: deque = deque(maxlen=50)
+        self.skipped_runs = 0
+        self.last_stages: dict | None = None  # son refresh'in aşama süreleri (ms)
+        self.stage_timings: dict | None = None  # symbol -> aşama süreleri (MarketService side-table)
+        # her yeni snapshot'ta artar; dinleyiciler (pre-serialized /signals vb.) publish'te çağrılır
+        self.version = 0
+        self._listeners: List[Callable[["SignalStore", List[Signal] | None], None]] = []
+
+    def subscribe(self, fn: Callable[["SignalStore", List[Signal] | None], None]):
+        self._listeners.append(fn)
+
+    def publish(self, changed: List[Signal] | None = None):
+        """Bump the version and notify listeners; `changed` None => full snapshot."""
+        self.version += 1
+        for fn in self._listeners:
+            try:
+                fn(self, changed)
+            except Exception:
+                self.last_error = "signal publish error:\n" + traceback.format_exc()
+
+    def upsert(self, signal: Signal):
+        """Replace one symbol's signal in place (event-driven evaluation)."""
+        for i, s in enumerate(self.signals):
+            if s.symbol == signal.symbol:
+                self.signals[i] = signal
+                break
+        else:
+            self.signals.append(signal)
+        self.last_updated = datetime.utcnow().isoformat()
+
+    def record_run(self, started_at: str, duration_ms: float, status: str, stages: dict | None = None):
+        run = {"started_at": started_at, "duration_ms": round(duration_ms, 1), "status": status}
+        if stages:
+            run["stages"] = stages
+        self.runs.append(run)
 
 
 store = SignalStore()
@@ -32,44 +85,201 @@ async def hydrate_from_db():
         store.signals = sigs
         store.last_updated = data.get("last_updated")
         store.last_error = data.get("warning")
+        store.publish()
     except Exception:
         store.last_error = "DB hydrate error:\n" + traceback.format_exc()
 
 
+def hydrate_from_shared(body: bytes):
+    """Load the leader's /signals payload into this worker's store (read-only workers)."""
+    try:
+        data = json.loads(body)
+        store.signals = [Signal(**s) for s in data.get("signals", [])]
+        store.last_updated = data.get("lastUpdated")
+        store.last_error = data.get("warning")
+        store.publish()
+    except Exception:
+        store.last_error = "shared snapshot hydrate error:\n" + traceback.format_exc()
+
+
+async def evaluate_symbols(market: MarketService, symbols: List[str], snapshot=None) -> List[Signal]:
+    # fetch'ler eşzamanlı, hesaplama tek batch halinde market.backend'de
+    results = await market.evaluate_many(symbols, snapshot)
+
+    signals: List[Signal] = []
+    for sym, res in zip(symbols, results):
+        if isinstance(res, Exception):
+            signals.append(Signal(
+                symbol=sym,
+                decision="BEKLE",
+                score=10,
+                daily_trend_ok=False,
+                updated_at=datetime.utcnow(),
+                plan=None,
+                reason=f"signal error: {type(res).__name__}",
+            ))
+        else:
+            signals.append(res)
+    return signals
+
+
+def _history_row(s: Signal) -> tuple:
+    p = s.plan
+    return (
+        s.symbol,
+        s.updated_at.isoformat(),
+        s.decision.value,
+        s.score,
+        int(s.daily_trend_ok),
+        p.entry if p else None,
+        p.stop if p else None,
+        p.target if p else None,
+        p.rr if p else None,
+        s.reason,
+    )
+
+
+async def persist_snapshot(changed: List[Signal] | None = None, sp: Spans | None = None):
+    """Save the latest snapshot blob (hydrate) and append history rows.
+
+    `changed`: only these signals go to history (event mode); default all.
+    """
+    store.publish(changed)
+    if sp:
+        sp.mark("publish")
+    payload = {
+        "last_updated": store.last_updated,
+        "warning": store.last_error,
+        "signals": [s.model_dump(mode="json") for s in store.signals],
+    }
+
+    encoded = jsonable_encoder(payload)
+    await save_signals_snapshot(store.last_updated, json.dumps(encoded))
+    if sp:
+        sp.mark("snapshot_write")
+    await save_signals_history([_history_row(s) for s in (store.signals if changed is None else changed)])
+    if sp:
+        sp.mark("history_write")
+
+
+async def compact_history(retention_days: int, downsample_after_hours: int, snapshot_keep: int):
+    try:
+        now = datetime.utcnow()
+        await compact_signals_history(
+            (now - timedelta(days=retention_days)).isoformat(),
+            (now - timedelta(hours=downsample_after_hours)).isoformat(),
+            snapshot_keep,
+        )
+    except Exception:
+        store.last_error = "compact_history error:\n" + traceback.format_exc()
+
+
 async def refresh_signals(market: MarketService):
+    sp = Spans("refresh")
     try:
-        symbols = await market.get_top_symbols()
-
-        tasks = [market.build_signal_for(s) for s in symbols]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        signals: List[Signal] = []
-        for sym, res in zip(symbols, results):
-            if isinstance(res, Exception):
-                signals.append(Signal(
-                    symbol=sym,
-                    decision="BEKLE",
-                    score=10,
-                    daily_trend_ok=False,
-                    updated_at=datetime.utcnow(),
-                    plan=None,
-                    reason=f"signal error: {type(res).__name__}",
-                ))
-            else:
-                signals.append(res)
-
-        store.signals = signals
+        scanner = market.scanner
+        if scanner is not None:
+            # iki aşamalı tarama: tüm universe ön filtre, bu cycle'ın shard'ı derin analiz
+            universe, symbols = await scanner.next_batch()
+        else:
+            symbols = await market.get_top_symbols()
+            universe = symbols
+        market.watch(universe)
+        sp.mark("universe")
+        snapshot = await market.prefetch(symbols)
+        sp.mark("prefetch")
+
+        signals = await evaluate_symbols(market, symbols, snapshot)
+        sp.mark("evaluate")
+        # universe dışına çıkanların süreleri side-table'dan düşer
+        live = set(universe)
+        for sym in [s for s in market.stage_timings if s not in live]:
+            del market.stage_timings[sym]
+
+        if scanner is not None:
+            # diğer adaylar son analizlerini korur; adaylıktan düşenler çıkar
+            fresh = {s.symbol: s for s in signals}
+            prev = {s.symbol: s for s in store.signals}
+            store.signals = [fresh.get(sym) or prev[sym] for sym in universe if sym in fresh or sym in prev]
+            store.scan = scanner.stats()
+        else:
+            store.signals = signals
         store.last_error = None
         store.last_updated = datetime.utcnow().isoformat()
+        store.upstream = market.client.budget()
+        store.caches = market.cache_stats()
+        store.eval_backend = market.backend.stats() if market.backend else None
+        store.stage_timings = market.stage_timings
 
-        payload = {
-            "last_updated": store.last_updated,
-            "warning": store.last_error,
-            "signals": [s.model_dump(mode="json") for s in store.signals],
-        }
-
-        encoded = jsonable_encoder(payload)
-        await save_signals_snapshot(store.last_updated, json.dumps(encoded))
+        await persist_snapshot(changed=signals if scanner is not None else None, sp=sp)
 
     except Exception:
         store.last_error = "refresh_signals error:\n" + traceback.format_exc()
+    finally:
+        store.last_stages = sp.done()
+
+
+async def refresh_universe(market: MarketService) -> List[str]:
+    """Event mode: re-rank the universe and re-subscribe the stream; no evaluation."""
+    scanner = market.scanner
+    if scanner is not None:
+        # sadece ön filtre (tek ticker isteği); derin analiz EventEvaluator'da
+        scanner.candidates = await scanner.prefilter()
+        universe = [c.symbol for c in scanner.candidates]
+    else:
+        universe = await market.get_top_symbols()
+    market.watch(universe)
+    return universe
+
+
+async def warm_start_candles(market: MarketService, max_age_days: int = 7):
+    """Load closed candles from SQLite so only the gap since shutdown is fetched."""
+    try:
+        since_ms = int((time.time() - max_age_days * 86400) * 1000)
+        for interval, window in market.windows.items():
+            per_symbol = await load_recent_candles(interval, window, since_ms)
+            for symbol, rows in per_symbol.items():
+                market.candles.seed(symbol, interval, Candles.from_tuples(rows), window)
+    except Exception:
+        store.last_error = "candle warm start error:\n" + traceback.format_exc()
+
+
+async def flush_candles(market: MarketService, retention_days: int | None = None):
+    try:
+        rows, marks = market.candles.unpersisted()
+        await save_candles(rows)
+        market.candles.mark_persisted(marks)
+        if retention_days:
+            await prune_candles(int((time.time() - retention_days * 86400) * 1000))
+    except Exception:
+        store.last_error = "flush_candles error:\n" + traceback.format_exc()
+
+
+_refresh_lock = asyncio.Lock()
+
+
+async def run_refresh(market: MarketService, deadline: float | None = None):
+    """refresh_signals with overlap protection, a deadline and run timing."""
+    if _refresh_lock.locked():
+        # önceki run hâlâ sürüyor => bu tick atlanır
+        store.skipped_runs += 1
+        REFRESH_SKIPPED.inc()
+        return
+    async with _refresh_lock:
+        started_at = datetime.utcnow().isoformat()
+        t0 = time.perf_counter()
+        status = "ok"
+        store.last_stages = None
+        profiler.begin_cycle()
+        try:
+            await asyncio.wait_for(refresh_signals(market), timeout=deadline)
+        except asyncio.TimeoutError:
+            status = "timeout"
+            store.last_error = f"refresh_signals deadline aşıldı ({deadline}s)"
+        finally:
+            profiler.end_cycle()
+        if store.last_error and status == "ok":
+            status = "error"
+        elapsed = time.perf_counter() - t0
+        store.record_run(started_at, elapsed * 1000, status, store.last_stages)
+        REFRESH_DURATION.labels(status).observe(elapsed)
@@ -1,17 +1,79 @@
-import asyncio
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
-from .jobs import refresh_signals
+import asyncio
+import traceback
+
+from .jobs import run_refresh, refresh_universe, compact_history, flush_candles, store
+from ..metrics import REFRESH_SKIPPED
+from ...settings import settings
 from ...services.market_service import MarketService
 
-def start_scheduler(market: MarketService, seconds: int):
-    sched = BackgroundScheduler()
+def start_scheduler(market: MarketService, seconds: int, jitter: int | None = None, deadline: float | None = None,
+                    evaluator=None):
+    """`evaluator` (EventEvaluator) verilirse periyodik job sadece universe'i yeniler."""
+    # uvicorn'un event loop'unda çalışır: httpx bağlantıları ve semaphore aynı loop'ta kalır
+    sched = AsyncIOScheduler()
+
+    async def tick():
+        await run_refresh(market, deadline=deadline)
+
+    async def universe_tick():
+        # semboller kendi mum kapanışlarında değerlendirilir; burada sadece
+        # watch + yeni gelenlerin ilk değerlendirmesi
+        try:
+            universe = await refresh_universe(market)
+            await asyncio.wait_for(evaluator.ensure(universe), timeout=deadline)
+            store.upstream = market.client.budget()
+            store.caches = market.cache_stats()
+            store.scan = market.scanner.stats() if market.scanner else None
+        except asyncio.TimeoutError:
+            store.last_error = f"refresh_universe deadline aşıldı ({deadline}s)"
+        except Exception:
+            store.last_error = "refresh_universe error:\n" + traceback.format_exc()
+
+    sched.add_job(
+        tick if evaluator is None else universe_tick,
+        IntervalTrigger(seconds=seconds, jitter=jitter),
+        id="refresh_signals" if evaluator is None else "refresh_universe",
+        replace_existing=True,
+        max_instances=1,     # üst üste binen run yok
+        coalesce=True,       # kaçırılan tick'ler tek run'a indirgenir
+        misfire_grace_time=seconds,
+    )
+    # signal history retention / downsampling
+    sched.add_job(
+        compact_history,
+        IntervalTrigger(seconds=settings.history_compact_seconds),
+        kwargs={
+            "retention_days": settings.history_retention_days,
+            "downsample_after_hours": settings.history_downsample_hours,
+            "snapshot_keep": settings.snapshot_keep,
+        },
+        id="compact_history",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+    if settings.candle_cache_enabled:
+        # kapalı mumları diske yaz (warm start için)
+        sched.add_job(
+            flush_candles,
+            IntervalTrigger(seconds=settings.candle_flush_seconds),
+            args=[market],
+            kwargs={"retention_days": settings.candle_retention_days},
+            id="flush_candles",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
 
-    def tick():
-        # APScheduler sync çalışır; async job'u loop'ta koşturuyoruz
-        asyncio.run(refresh_signals(market))
+    def on_skipped(event):
+        store.skipped_runs += 1
+        REFRESH_SKIPPED.inc()
 
-    sched.add_job(tick, IntervalTrigger(seconds=seconds), id="refresh_signals", replace_existing=True)
+    sched.add_listener(on_skipped, EVENT_JOB_MAX_INSTANCES)
     sched.start()
-    return sched
\ No newline at end of file
+    return sched
@@ -0,0 +1,176 @@
+"""Single fetcher + many API workers: leader lock and a shared /signals snapshot.
+
+With ``uvicorn --workers N`` every worker runs ``startup()``. One of them
+takes an exclusive ``flock`` on ``leader.lock`` and becomes the fetcher
+(BinanceClient, scheduler, SQLite writes); the rest only serve reads. The
+lock is released by the kernel when the leader dies, so a follower that
+retries it takes over.
+
+The leader publishes the pre-rendered /signals payload (plain + gzip, ETag,
+warning) as ``signals.snap``: written to a temp file, then ``os.replace``d,
+then the version is bumped in the 8-byte ``signals.ver`` file that every
+worker keeps mmap'ed. Checking for a new version is one ``unpack_from`` on
+that mapping; a new version is picked up by mmap'ing the new file, and
+responses are served as memoryviews into it (no per-request copy).
+"""
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+_MAGIC = b"TBSNAP01"
+# magic, version, warning_len, body_len, gzip_len, etag
+_HEADER = struct.Struct("<8sQIII24s")
+_VERSION = struct.Struct("<Q")
+
+
+@dataclass
+class SharedView:
+    """Same fields as the route's rendered payload; buffers point into the mmap."""
+    version: int
+    warning: str | None
+    etag: str
+    body: memoryview
+    gzip_body: memoryview
+
+
+class LeaderLock:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd: int | None = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+def _open_counter(path: Path, writable: bool) -> mmap.mmap | None:
+    if writable:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _VERSION.size:
+                os.ftruncate(fd, _VERSION.size)
+            return mmap.mmap(fd, _VERSION.size)
+        finally:
+            os.close(fd)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        if os.fstat(fd).st_size < _VERSION.size:
+            return None
+        return mmap.mmap(fd, _VERSION.size, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+
+class SnapshotWriter:
+    """Leader side; `write()` is a no-op when the payload (ETag) did not change."""
+
+    def __init__(self, directory: str | Path):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.dir / "signals.snap"
+        self._counter = _open_counter(self.dir / "signals.ver", writable=True)
+        # failover sonrası da versiyon monoton artsın
+        self.version = _VERSION.unpack_from(self._counter, 0)[0]
+        self._etag: str | None = None
+        self._warning: str | None = None
+        self.writes = 0
+
+    def write(self, rendered) -> bool:
+        if rendered is None or (rendered.etag == self._etag and rendered.warning == self._warning):
+            return False
+        self.version += 1
+        warning = (rendered.warning or "").encode()
+        header = _HEADER.pack(_MAGIC, self.version, len(warning), len(rendered.body), len(rendered.gzip_body),
+                              rendered.etag.encode()[:24].ljust(24))
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(warning)
+            f.write(rendered.body)
+            f.write(rendered.gzip_body)
+        os.replace(tmp, self.path)
+        # dosya yerinde, sonra sayaç: okuyucu hiçbir zaman yarım dosya görmez
+        _VERSION.pack_into(self._counter, 0, self.version)
+        self._etag, self._warning = rendered.etag, rendered.warning
+        self.writes += 1
+        return True
+
+    def close(self):
+        self._counter.close()
+
+
+class SnapshotReader:
+    """Worker side; `current()` costs one mmap read unless a new version landed."""
+
+    def __init__(self, directory: str | Path):
+        self.dir = Path(directory)
+        self.path = self.dir / "signals.snap"
+        self._counter: mmap.mmap | None = None
+        self._seen = 0
+        self._view: SharedView | None = None
+        self.loads = 0
+
+    def version(self) -> int:
+        if self._counter is None:
+            self._counter = _open_counter(self.dir / "signals.ver", writable=False)
+            if self._counter is None:
+                return 0
+        return _VERSION.unpack_from(self._counter, 0)[0]
+
+    def _load(self) -> SharedView | None:
+        try:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        magic, version, wl, bl, gl, etag = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC:
+            return None
+        buf = memoryview(mm)
+        lo = _HEADER.size
+        warning = bytes(buf[lo:lo + wl]).decode() or None
+        lo += wl
+        # eski mmap'ler, üzerlerindeki memoryview'lar (yanıt gönderiliyor olabilir) bitince GC ile kapanır
+        return SharedView(version, warning, etag.decode().strip(), buf[lo:lo + bl], buf[lo + bl:lo + bl + gl])
+
+    def current(self) -> SharedView | None:
+        ver = self.version()
+        if ver and ver != self._seen:
+            view = self._load()
+            if view is not None:
+                self._view = view
+                self._seen = ver
+                self.loads += 1
+        return self._view
+
+    def stats(self) -> dict:
+        return {"version": self._seen, "loads": self.loads}
@@ -0,0 +1,35 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+
+@dataclass
+class BookTicker:
+    bid: float
+    ask: float
+    ts: float  # time.time() of last update
+
+
+class BookStore:
+    """Latest best bid/ask per symbol (stream or bulk REST fed)."""
+
+    def __init__(self, max_age_seconds: float = 60.0):
+        self.max_age_seconds = max_age_seconds
+        self._books: Dict[str, BookTicker] = {}
+        # her update'te senkron çağrılır (position monitor); hızlı kalmalı
+        self._listeners: List[Callable[[str, float, float, float], None]] = []
+
+    def subscribe(self, fn: Callable[[str, float, float, float], None]):
+        self._listeners.append(fn)
+
+    def update(self, symbol: str, bid: float, ask: float):
+        ts = time.time()
+        self._books[symbol] = BookTicker(bid, ask, ts)
+        for fn in self._listeners:
+            fn(symbol, bid, ask, ts)
+
+    def get(self, symbol: str) -> BookTicker | None:
+        bt = self._books.get(symbol)
+        if bt is None or (time.time() - bt.ts) > self.max_age_seconds:
+            return None
+        return bt
@@ -1,26 +1,140 @@
+import asyncio
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, Tuple
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
 
+Loader = Callable[[], Awaitable[Any]]
 
-@dataclass
-class TTLCache:
-    ttl_seconds: int
-    _store: Dict[str, Tuple[float, Any]]
 
-    def __init__(self, ttl_seconds: int):
+class AsyncCache:
+    """Async TTL cache with single-flight loads, LRU bound and stale-while-revalidate.
+
+    - fresh (age < ttl): served from memory
+    - stale (age < ttl + stale_seconds): old value served immediately,
+      one background refresh started
+    - otherwise: concurrent misses for the same key share one upstream load
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        stale_seconds: float = 0.0,
+        max_entries: int = 1024,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ):
         self.ttl_seconds = ttl_seconds
-        self._store = {}
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        # key -> (fetched_at, value, size); sıra = LRU
+        self._store: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._bytes = 0
+        self._swept_at = time.monotonic()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0  # aynı anahtara eşzamanlı miss'ler tek yüklemeye bağlandı
+        self.evictions = 0
+        self.errors = 0
 
-    def get(self, key: str):
+    def _age(self, fetched_at: float) -> float:
+        return time.monotonic() - fetched_at
+
+    async def get_or_load(self, key: Hashable, loader: Loader) -> Any:
         item = self._store.get(key)
-        if not item:
-            return None
-        exp, val = item
-        if time.time() > exp:
-            self._store.pop(key, None)
+        if item is not None:
+            fetched_at, value, _ = item
+            age = self._age(fetched_at)
+            if age < self.ttl_seconds:
+                self.hits += 1
+                self._store.move_to_end(key)
+                return value
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                self._store.move_to_end(key)
+                self._load(key, loader)
+                return value
+            self._remove(key)
+
+        if key in self._inflight:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        # shield: bir çağıranın iptali ortak yüklemeyi iptal etmesin
+        return await asyncio.shield(self._load(key, loader))
+
+    def _load(self, key: Hashable, loader: Loader) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(_consume_exception)
+        return task
+
+    async def _run(self, key: Hashable, loader: Loader) -> Any:
+        try:
+            value = await loader()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self.set(key, value)
+        return value
+
+    def get(self, key: Hashable) -> Any:
+        item = self._store.get(key)
+        if item is None or self._age(item[0]) >= self.ttl_seconds + self.stale_seconds:
             return None
-        return val
+        return item[1]
+
+    def set(self, key: Hashable, value: Any):
+        self._remove(key)
+        size = self.sizeof(value) if self.sizeof else 0
+        self._store[key] = (time.monotonic(), value, size)
+        self._bytes += size
+        self._evict()
+
+    def _remove(self, key: Hashable):
+        item = self._store.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+
+    def _evict(self):
+        # önce süresi tamamen dolmuşlar (en fazla ttl'de bir tarama), sonra LRU
+        horizon = self.ttl_seconds + self.stale_seconds
+        if self._age(self._swept_at) >= self.ttl_seconds or len(self._store) > self.max_entries:
+            self._swept_at = time.monotonic()
+            for key in [k for k, (t, _, _) in self._store.items() if self._age(t) >= horizon]:
+                self._remove(key)
+                self.evictions += 1
+        while self._store and (
+            len(self._store) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._store.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._store),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else None,
+        }
+
 
-    def set(self, key: str, value: Any):
-        self._store[key] = (time.time() + self.ttl_seconds, value)
\ No newline at end of file
+def _consume_exception(task: asyncio.Task):
+    # arka plan yenilemesi hata verirse "never retrieved" uyarısı çıkmasın
+    if not task.cancelled():
+        task.exception()
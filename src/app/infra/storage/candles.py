@@ -0,0 +1,184 @@
+import asyncio
+import time
+from typing import Any, Dict
+
+from ...domain.candles import Candles
+from ..http.rate_limit import endpoint_weight
+
+# Binance kline interval -> milisaniye
+INTERVAL_MS: Dict[str, int] = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "3d": 3 * 86_400_000,
+    "1w": 7 * 86_400_000,
+}
+
+
+class CandleSeries:
+    """Ring buffer of columnar candles for one (symbol, interval).
+
+    All candles except the last one are closed; the last one is the
+    still-open candle and gets replaced on every delta fetch.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.candles = Candles()
+        self.synced_at = 0.0
+        # diske yazılmış son kapalı mumun open_time'ı
+        self.persisted_ot: int | None = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def last_open_time(self) -> int | None:
+        return self.candles.open_time[-1] if len(self.candles) else None
+
+    def merge(self, new: Candles):
+        # copy-on-write: daha önce verilen view'lar geçerli kalır
+        self.candles = self.candles.merged(new, self.capacity)
+
+    def tail(self, limit: int) -> Candles:
+        return self.candles.tail(limit)
+
+
+class CandleStore:
+    """Per-(symbol, interval) candle store with delta fetching.
+
+    The first request downloads the full window; afterwards only candles
+    newer than the last one we hold are fetched (``startTime``), which keeps
+    the kline request at the lowest weight bracket.
+    """
+
+    def __init__(self, client: Any, refresh_seconds: Dict[str, int] | None = None, default_refresh: int = 60):
+        self.client = client
+        self.refresh_seconds = dict(refresh_seconds or {})
+        self.default_refresh = default_refresh
+        self._series: Dict[tuple, CandleSeries] = {}
+
+    def series(self, symbol: str, interval: str) -> CandleSeries | None:
+        return self._series.get((symbol, interval))
+
+    def _fresh(self, s: CandleSeries, interval: str) -> bool:
+        ttl = self.refresh_seconds.get(interval, self.default_refresh)
+        return (time.time() - s.synced_at) < ttl
+
+    def apply(self, symbol: str, interval: str, candle: Candles) -> bool:
+        """Merge one streamed candle. Returns False on a gap (REST resync needed)."""
+        s = self._series.get((symbol, interval))
+        if s is None or not len(s.candles):
+            # pencereyi henüz REST ile doldurmadık
+            return True
+        last = s.last_open_time
+        ot = candle.open_time[0]
+        step = INTERVAL_MS.get(interval)
+        if step and ot > last + step:
+            s.synced_at = 0.0
+            return False
+        s.merge(candle)
+        s.synced_at = time.time()
+        return True
+
+    def seed(self, symbol: str, interval: str, candles: Candles, capacity: int):
+        """Warm start from the on-disk cache; the gap is fetched on the next get()."""
+        s = CandleSeries(capacity)
+        s.merge(candles)
+        s.persisted_ot = s.last_open_time
+        self._series[(symbol, interval)] = s
+
+    def unpersisted(self) -> tuple[list, dict]:
+        """Closed candles not yet written to disk, plus marks for mark_persisted()."""
+        rows, marks = [], {}
+        for (symbol, interval), s in self._series.items():
+            c = s.candles
+            ot = c.open_time
+            closed = len(c) - 1
+            i = closed
+            while i > 0 and (s.persisted_ot is None or ot[i - 1] > s.persisted_ot):
+                i -= 1
+            if i >= closed:
+                continue
+            for j in range(i, closed):
+                rows.append((
+                    symbol, interval, ot[j], c.open[j], c.high[j], c.low[j], c.close[j],
+                    c.volume[j], c.quote_volume[j],
+                ))
+            marks[(symbol, interval)] = ot[closed - 1]
+        return rows, marks
+
+    def mark_persisted(self, marks: dict):
+        for key, ot in marks.items():
+            s = self._series.get(key)
+            if s is not None and (s.persisted_ot is None or ot > s.persisted_ot):
+                s.persisted_ot = ot
+
+    def fetch_weight(self, symbol: str, interval: str, limit: int) -> int:
+        """Estimated request weight of the next get() (0 when still fresh)."""
+        s = self._series.get((symbol, interval))
+        if s is not None and len(s.candles) and s.capacity >= limit:
+            if self._fresh(s, interval):
+                return 0
+            step = INTERVAL_MS.get(interval)
+            if step:
+                missing = max(0, (int(time.time() * 1000) - s.last_open_time) // step) + 1
+                if missing < s.capacity:
+                    return endpoint_weight("/fapi/v1/klines", {"limit": missing + 1})
+        return endpoint_weight("/fapi/v1/klines", {"limit": limit})
+
+    async def refresh(self, symbol: str, interval: str):
+        s = self._series.get((symbol, interval))
+        if s is None:
+            return
+        async with s.lock:
+            await self._sync(s, symbol, interval)
+
+    async def ensure(self, symbol: str, interval: str, open_time: int):
+        """Make sure the candle opening at `open_time` is present (after a candle close)."""
+        s = self._series.get((symbol, interval))
+        if s is None or (s.last_open_time or 0) >= open_time:
+            return
+        async with s.lock:
+            if (s.last_open_time or 0) < open_time:
+                await self._sync(s, symbol, interval)
+
+    async def get(self, symbol: str, interval: str, limit: int) -> Candles:
+        key = (symbol, interval)
+        s = self._series.get(key)
+        if s is None or s.capacity < limit:
+            s = CandleSeries(limit)
+            self._series[key] = s
+
+        async with s.lock:
+            if len(s.candles) and self._fresh(s, interval):
+                return s.tail(limit)
+            await self._sync(s, symbol, interval)
+            return s.tail(limit)
+
+    async def _sync(self, s: CandleSeries, symbol: str, interval: str):
+        step = INTERVAL_MS.get(interval)
+        last = s.last_open_time
+
+        missing = None
+        if last is not None and step:
+            now_ms = int(time.time() * 1000)
+            # son (açık) mum dahil kaç mum eksik
+            missing = max(0, (now_ms - last) // step) + 1
+
+        if missing is None or missing >= s.capacity:
+            fetched = await self.client.klines(symbol, interval, limit=s.capacity)
+            s.candles = Candles()
+        else:
+            # +1: saat kayması / tam sınırda kapanış için pay
+            fetched = await self.client.klines(symbol, interval, limit=missing + 1, start_time=last)
+
+        s.merge(fetched)
+        s.synced_at = time.time()
@@ -1,11 +1,34 @@
+import functools
+import json
+import time
 import aiosqlite
 from pathlib import Path
 
+from ..metrics import SQLITE_WRITE
+
 DB_PATH = Path("data/app.db")
 
+
+def _timed(op: str):
+    """Record write latency in trader_sqlite_write_duration_seconds{op=...}."""
+    child = SQLITE_WRITE.labels(op)
+
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - t0)
+        return wrapper
+    return deco
+
 async def init_db():
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     async with aiosqlite.connect(DB_PATH) as db:
+        # WAL: okuyucular (API) yazıcıyı (refresh) beklemez; ayar dosyada kalıcı
+        await db.execute("PRAGMA journal_mode=WAL")
         await db.execute("""
         CREATE TABLE IF NOT EXISTS signals_snapshot (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -18,11 +41,78 @@ async def init_db():
             symbol TEXT PRIMARY KEY,
             opened_at TEXT NOT NULL,
             entry_price REAL,
-            note TEXT
+            note TEXT,
+            side TEXT NOT NULL DEFAULT 'LONG',
+            stop REAL,
+            target REAL,
+            qty REAL
+        );
+        """)
+        # eski şema: position monitor kolonları sonradan eklendi
+        cur = await db.execute("PRAGMA table_info(positions)")
+        have = {r[1] for r in await cur.fetchall()}
+        for col, ddl in (("side", "TEXT NOT NULL DEFAULT 'LONG'"), ("stop", "REAL"), ("target", "REAL"), ("qty", "REAL"),
+                         # lider monitor'ün son fiyatı / breach durumu (tüm worker'lar okur)
+                         ("mark", "REAL"), ("pnl_pct", "REAL"), ("pnl", "REAL"), ("quote_at", "REAL"),
+                         ("breached", "TEXT")):
+            if col not in have:
+                await db.execute(f"ALTER TABLE positions ADD COLUMN {col} {ddl}")
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS position_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            opened_at TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            side TEXT NOT NULL,
+            price REAL NOT NULL,
+            level REAL NOT NULL,
+            entry REAL,
+            pnl_pct REAL,
+            ts TEXT NOT NULL,
+            detect_ms REAL
+        );
+        """)
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS signals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            decision TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            daily_trend_ok INTEGER NOT NULL,
+            entry REAL,
+            stop REAL,
+            target REAL,
+            rr REAL,
+            reason TEXT
+        );
+        """)
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_signals_symbol_ts ON signals(symbol, ts)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals(ts)")
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS candles (
+            symbol TEXT NOT NULL,
+            interval TEXT NOT NULL,
+            open_time INTEGER NOT NULL,
+            open REAL NOT NULL,
+            high REAL NOT NULL,
+            low REAL NOT NULL,
+            close REAL NOT NULL,
+            volume REAL NOT NULL,
+            quote_volume REAL NOT NULL,
+            PRIMARY KEY (symbol, interval, open_time)
+        ) WITHOUT ROWID;
+        """)
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS indicator_state (
+            key TEXT PRIMARY KEY,
+            state_json TEXT NOT NULL,
+            updated_at TEXT NOT NULL
         );
         """)
         await db.commit()
 
+@_timed("signals_snapshot")
 async def save_signals_snapshot(created_at_iso: str, payload_json: str):
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute(
@@ -39,21 +129,180 @@ async def load_latest_signals_snapshot() -> str | None:
         row = await cur.fetchone()
         return row[0] if row else None
 
-async def upsert_position(symbol: str, opened_at_iso: str, entry_price: float | None, note: str | None):
+@_timed("signals_history")
+async def save_signals_history(rows: list[tuple]):
+    """rows: (symbol, ts, decision, score, daily_trend_ok, entry, stop, target, rr, reason)"""
+    if not rows:
+        return
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.execute("PRAGMA synchronous=NORMAL")
+        # tek transaction, çok satırlı insert
+        await db.executemany(
+            """
+            INSERT INTO signals(symbol, ts, decision, score, daily_trend_ok, entry, stop, target, rr, reason)
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        await db.commit()
+
+async def query_signals_history(
+    symbol: str | None,
+    ts_from: str | None,
+    ts_to: str | None,
+    cursor: tuple[str, int] | None,
+    limit: int,
+) -> list[dict]:
+    where, args = [], []
+    if symbol:
+        where.append("symbol = ?")
+        args.append(symbol)
+    if ts_from:
+        where.append("ts >= ?")
+        args.append(ts_from)
+    if ts_to:
+        where.append("ts < ?")
+        args.append(ts_to)
+    if cursor:
+        # keyset pagination: (ts, id) son görülen satırdan eski olanlar
+        where.append("(ts < ? OR (ts = ? AND id < ?))")
+        args.extend([cursor[0], cursor[0], cursor[1]])
+    sql = "SELECT id, symbol, ts, decision, score, daily_trend_ok, entry, stop, target, rr, reason FROM signals"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+    args.append(limit)
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute(sql, args)
+        rows = await cur.fetchall()
+        return [
+            {
+                "id": r[0], "symbol": r[1], "ts": r[2], "decision": r[3], "score": r[4],
+                "daily_trend_ok": bool(r[5]),
+                "plan": None if r[6] is None else {"entry": r[6], "stop": r[7], "target": r[8], "rr": r[9]},
+                "reason": r[10],
+            }
+            for r in rows
+        ]
+
+@_timed("compact_history")
+async def compact_signals_history(retention_before_iso: str, downsample_before_iso: str, snapshot_keep: int):
+    async with aiosqlite.connect(DB_PATH) as db:
+        # retention
+        await db.execute("DELETE FROM signals WHERE ts < ?", (retention_before_iso,))
+        # downsampling: eski satırlarda sembol başına saatte 1 satır (saatin son satırı)
+        await db.execute(
+            """
+            DELETE FROM signals
+            WHERE ts < ? AND id NOT IN (
+                SELECT MAX(id) FROM signals WHERE ts < ? GROUP BY symbol, substr(ts, 1, 13)
+            )
+            """,
+            (downsample_before_iso, downsample_before_iso),
+        )
+        # snapshot blob'ları: sadece hydrate için son N tanesi gerekli
+        await db.execute(
+            "DELETE FROM signals_snapshot WHERE id <= (SELECT MAX(id) FROM signals_snapshot) - ?",
+            (snapshot_keep,),
+        )
+        await db.commit()
+
+@_timed("candles")
+async def save_candles(rows: list[tuple]):
+    """rows: (symbol, interval, open_time, open, high, low, close, volume, quote_volume), closed only"""
+    if not rows:
+        return
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.execute("PRAGMA synchronous=NORMAL")
+        await db.executemany(
+            """
+            INSERT OR REPLACE INTO candles(symbol, interval, open_time, open, high, low, close, volume, quote_volume)
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        await db.commit()
+
+async def load_recent_candles(interval: str, limit: int, since_ms: int) -> dict[str, list[tuple]]:
+    """Last `limit` closed candles per symbol (ascending), for symbols updated after `since_ms`."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute(
+            """
+            SELECT symbol, open_time, open, high, low, close, volume, quote_volume FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY open_time DESC) AS rn
+                FROM candles
+                WHERE interval = ? AND symbol IN (
+                    SELECT DISTINCT symbol FROM candles WHERE interval = ? AND open_time >= ?
+                )
+            )
+            WHERE rn <= ?
+            ORDER BY symbol, open_time
+            """,
+            (interval, interval, since_ms, limit),
+        )
+        out: dict[str, list[tuple]] = {}
+        for r in await cur.fetchall():
+            out.setdefault(r[0], []).append(r[1:])
+        return out
+
+@_timed("prune_candles")
+async def prune_candles(before_ms: int):
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.execute("DELETE FROM candles WHERE open_time < ?", (before_ms,))
+        await db.commit()
+
+@_timed("indicator_state")
+async def save_indicator_state(updated_at_iso: str, state: dict):
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.executemany(
+            """
+            INSERT INTO indicator_state(key, state_json, updated_at)
+            VALUES(?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+              state_json=excluded.state_json,
+              updated_at=excluded.updated_at
+            """,
+            [(k, json.dumps(v), updated_at_iso) for k, v in state.items()],
+        )
+        await db.commit()
+
+async def load_indicator_state() -> dict:
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute("SELECT key, state_json FROM indicator_state")
+        rows = await cur.fetchall()
+        return {r[0]: json.loads(r[1]) for r in rows}
+
+@_timed("positions")
+async def upsert_position(
+    symbol: str,
+    opened_at_iso: str,
+    entry_price: float | None,
+    note: str | None,
+    side: str = "LONG",
+    stop: float | None = None,
+    target: float | None = None,
+    qty: float | None = None,
+):
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute(
             """
-            INSERT INTO positions(symbol, opened_at, entry_price, note)
-            VALUES(?, ?, ?, ?)
+            INSERT INTO positions(symbol, opened_at, entry_price, note, side, stop, target, qty)
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(symbol) DO UPDATE SET
               opened_at=excluded.opened_at,
               entry_price=excluded.entry_price,
-              note=excluded.note
+              note=excluded.note,
+              side=excluded.side,
+              stop=excluded.stop,
+              target=excluded.target,
+              qty=excluded.qty,
+              mark=NULL, pnl_pct=NULL, pnl=NULL, quote_at=NULL, breached=NULL
             """,
-            (symbol, opened_at_iso, entry_price, note),
+            (symbol, opened_at_iso, entry_price, note, side, stop, target, qty),
         )
         await db.commit()
 
+@_timed("positions")
 async def delete_position(symbol: str):
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute("DELETE FROM positions WHERE symbol=?", (symbol,))
@@ -61,9 +310,54 @@ async def delete_position(symbol: str):
 
 async def list_positions():
     async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute("SELECT symbol, opened_at, entry_price, note FROM positions ORDER BY opened_at DESC")
+        cur = await db.execute(
+            """
+            SELECT symbol, opened_at, entry_price, note, side, stop, target, qty,
+                   mark, pnl_pct, pnl, quote_at, breached
+            FROM positions ORDER BY opened_at DESC
+            """
+        )
         rows = await cur.fetchall()
         return [
-            {"symbol": r[0], "opened_at": r[1], "entry_price": r[2], "note": r[3]}
+            {"symbol": r[0], "opened_at": r[1], "entry_price": r[2], "note": r[3],
+             "side": r[4], "stop": r[5], "target": r[6], "qty": r[7],
+             "mark": r[8], "pnl_pct": r[9], "pnl": r[10], "quote_at": r[11], "breached": r[12]}
             for r in rows
-        ]
\ No newline at end of file
+        ]
+
+@_timed("position_marks")
+async def update_position_marks(rows: list[tuple]):
+    """rows: (mark, pnl_pct, pnl, quote_at, symbol, opened_at); yeniden açılmış pozisyona yazmaz."""
+    if not rows:
+        return
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.executemany(
+            "UPDATE positions SET mark=?, pnl_pct=?, pnl=?, quote_at=? WHERE symbol=? AND opened_at=?",
+            rows,
+        )
+        await db.commit()
+
+_EVENT_COLS = ("symbol", "opened_at", "kind", "side", "price", "level", "entry", "pnl_pct", "ts", "detect_ms")
+
+@_timed("position_events")
+async def insert_position_event(ev: dict) -> int:
+    """Stores a breach event and marks the position breached (one transaction); returns the event id."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute(
+            f"INSERT INTO position_events ({', '.join(_EVENT_COLS)}) VALUES ({', '.join('?' * len(_EVENT_COLS))})",
+            tuple(ev[c] for c in _EVENT_COLS),
+        )
+        await db.execute(
+            "UPDATE positions SET breached=? WHERE symbol=? AND opened_at=? AND breached IS NULL",
+            (ev["kind"], ev["symbol"], ev["opened_at"]),
+        )
+        await db.commit()
+        return cur.lastrowid
+
+async def list_position_events(after: int = 0, limit: int = 500) -> list[dict]:
+    async with aiosqlite.connect(DB_PATH) as db:
+        cur = await db.execute(
+            f"SELECT id, {', '.join(_EVENT_COLS)} FROM position_events WHERE id > ? ORDER BY id LIMIT ?",
+            (after, limit),
+        )
+        return [dict(zip(("id",) + _EVENT_COLS, r)) for r in await cur.fetchall()]
\ No newline at end of file
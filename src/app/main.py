@@ -1,12 +1,33 @@
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
 from fastapi import FastAPI
 
 from .settings import settings
 from .infra.http.binance_client import BinanceClient
+from .infra.http.binance_stream import BinanceStream
 from .services.market_service import MarketService
+from .services.scanner import UniverseScanner
+from .services import position_monitor
+from .services.position_monitor import PositionMonitor
+from .domain.scoring import ScoreParams
+from .domain.strategy import build as build_strategies
+from .services.eval_backend import make_backend
 from .infra.scheduler.runner import start_scheduler
+from .infra.scheduler.events import EventEvaluator
 from .api.routes.health import router as health_router
+from .api.routes import signals as signals_routes
 from .api.routes.signals import router as signals_router
 from .api.routes.positions import router as positions_router
+from .api.routes.metrics import router as metrics_router
+from .api.routes.admin import router as admin_router
+from .api.latency import ApiLatency
+from .infra.metrics import bind_caches, bind_client
+from .infra.profiling import profiler
+from .infra.shared_snapshot import LeaderLock, SnapshotReader, SnapshotWriter
 
 app = FastAPI(title="Futures Trader Bot API")
 
@@ -14,40 +35,204 @@ app = FastAPI(title="Futures Trader Bot API")
 app.include_router(health_router)
 app.include_router(signals_router)
 app.include_router(positions_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+# yanıt başlığına kadar geçen süre (BaseHTTPMiddleware değil: istek başına task/stream sarmalama yok)
+app.add_middleware(ApiLatency)
 
 # Global objects
 client: BinanceClient | None = None
+stream: BinanceStream | None = None
+market: MarketService | None = None
+evaluator: EventEvaluator | None = None
 scheduler = None
 
+# çok worker'lı mod (SHARED_SNAPSHOT=1)
+leader_lock: LeaderLock | None = None
+snapshot_writer: SnapshotWriter | None = None
+background: list[asyncio.Task] = []
+
+
 @app.on_event("startup")
 async def startup():
     from .infra.storage.db import init_db
-    from .infra.scheduler.jobs import hydrate_from_db
+    from .infra.scheduler.jobs import hydrate_from_db, store
+    from .services.signal_feed import feed
+    # snapshot/delta push (SSE + WebSocket)
+    store.subscribe(feed.on_publish)
+    if settings.binance_replay_path:
+        _use_replay_db()
     await init_db()
     await hydrate_from_db()
-    global client, scheduler
-    client = BinanceClient(settings.binance_base_url, max_concurrency=settings.max_concurrency)
+
+    if settings.shared_snapshot:
+        global leader_lock
+        leader_lock = LeaderLock(Path(settings.shared_dir) / "leader.lock")
+        if not leader_lock.try_acquire():
+            # okuyucu worker: Binance'e gitmez, lider'in snapshot'ını sunar
+            reader = SnapshotReader(settings.shared_dir)
+            signals_routes.use_shared(reader)
+            background.append(asyncio.create_task(_follow(reader)))
+            return
+    await _start_fetcher()
+
+
+def _use_replay_db():
+    """BINANCE_REPLAY: snapshots, history, indicator state and candles go to a replay DB, not the live one."""
+    from .infra.storage import db
+    path = Path(settings.replay_db_path) if settings.replay_db_path else Path(tempfile.mkdtemp(prefix="replay-")) / "app.db"
+    if path.resolve() == db.DB_PATH.resolve():
+        raise RuntimeError(f"REPLAY_DB must not be the live database ({db.DB_PATH})")
+    db.DB_PATH = path
+
+
+async def _follow(reader: SnapshotReader):
+    """Reader worker: mirror new snapshot versions into the local store; take over if the leader dies."""
+    from .infra.scheduler.jobs import hydrate_from_shared
+    seen = 0
+    next_try = time.monotonic() + settings.leader_retry_seconds
+    while True:
+        view = reader.current()
+        if view is not None and view.version != seen:
+            seen = view.version
+            # SSE/WS feed ve _debug için (versiyon başına bir kez)
+            hydrate_from_shared(bytes(view.body))
+        if time.monotonic() >= next_try:
+            next_try = time.monotonic() + settings.leader_retry_seconds
+            if leader_lock.try_acquire():
+                signals_routes.use_shared(None)
+                await _start_fetcher()
+                return
+        await asyncio.sleep(settings.snapshot_poll_seconds)
+
+
+async def _mirror_snapshot():
+    """Leader: also publish warning-only changes (refresh errors do not go through store.publish)."""
+    while True:
+        await asyncio.sleep(settings.snapshot_poll_seconds)
+        snapshot_writer.write(signals_routes.rendered())
+
+
+async def _start_fetcher():
+    from .infra.storage.db import load_indicator_state
+    from .infra.scheduler.jobs import store
+    global client, stream, market, evaluator, scheduler, snapshot_writer
+    # refresh cycle'ları bu süreçte: /admin/profile burada kurulabilir
+    profiler.enabled = True
+    if leader_lock is not None:
+        snapshot_writer = SnapshotWriter(settings.shared_dir)
+        store.subscribe(lambda st, changed: snapshot_writer.write(signals_routes.rendered()))
+        snapshot_writer.write(signals_routes.rendered())
+        background.append(asyncio.create_task(_mirror_snapshot()))
+    transport = None
+    if settings.binance_replay_path:
+        from .infra.http.replay import ReplayTransport, ResponseArchive
+        transport = ReplayTransport(ResponseArchive(settings.binance_replay_path, readonly=True),
+                                    speed=settings.replay_speed)
+    elif settings.binance_record_path:
+        from .infra.http.replay import RecordingTransport, ResponseArchive
+        transport = RecordingTransport(ResponseArchive(settings.binance_record_path))
+    client = BinanceClient(
+        settings.binance_base_url,
+        max_concurrency=settings.max_concurrency,
+        weight_limit_1m=settings.weight_limit_1m,
+        transport=transport,
+    )
     wl = [s.strip().upper() for s in settings.symbol_whitelist_csv.split(",") if s.strip()]
+    score_params = ScoreParams.from_json(settings.score_params_json)
+    entry_tf = "15m"
     market = MarketService(
         client,
         top_n=settings.top_n,
-        entry_tf="15m",
+        entry_tf=entry_tf,
         max_spread_pct=0.12,
         whitelist=wl,
         min_quote_volume_24h=settings.min_quote_volume_24h,
+        score_params=score_params,
+        strategies=build_strategies(
+            [s.strip() for s in settings.strategies_csv.split(",") if s.strip()], score_params, entry_tf
+        ),
     )
+    bind_client(client)
+    bind_caches(market.caches())
+    # restart sonrası indikatörler kaldığı yerden devam etsin
+    market.load_indicator_state(await load_indicator_state())
+    if settings.candle_cache_enabled:
+        # diskteki kapalı mumlar: ilk refresh sadece aradaki boşluğu çeker
+        from .infra.scheduler.jobs import warm_start_candles
+        await warm_start_candles(market)
+    if settings.eval_backend != "inline":
+        # indikatör/strateji hesabı event loop dışında (yüklenen state worker'lara dağıtılır)
+        market.backend = make_backend(settings.eval_backend, market, settings.eval_workers)
+        await market.backend.start()
+    if settings.scan_enabled:
+        market.scanner = UniverseScanner(
+            market,
+            candidates=settings.scan_candidates,
+            deep_per_cycle=settings.scan_deep_per_cycle,
+            weight_budget=settings.scan_weight_budget,
+            min_quote_volume_24h=settings.min_quote_volume_24h,
+        )
+    if settings.stream_enabled:
+        stream = BinanceStream(settings.binance_ws_url, market.candles, market.books, market.intervals)
+        market.stream = stream
+
+    if settings.position_monitor_enabled:
+        # açık pozisyonlar: stream/REST fiyatıyla saniye altı stop/target kontrolü
+        position_monitor.monitor = PositionMonitor(market, poll_seconds=settings.position_poll_seconds)
+        position_monitor.monitor.start()
 
     # İlk snapshot hemen gelsin diye 1 kere çalıştır
-    from .infra.scheduler.jobs import refresh_signals
-    await refresh_signals(market)
+    from .infra.scheduler.jobs import run_refresh
+    deadline = settings.refresh_deadline_seconds or settings.refresh_seconds
+    await run_refresh(market, deadline=deadline)
 
-    # Sonra periyodik refresh
-    scheduler = start_scheduler(market, seconds=settings.refresh_seconds)
+    # event modunda semboller kendi mum kapanışlarında güncellenir; periyodik job
+    # sadece universe'i yeniler (watch + yeni sembollerin ilk değerlendirmesi)
+    event_mode = settings.eval_mode == "event"
+    if event_mode:
+        evaluator = EventEvaluator(
+            market,
+            stagger_seconds=settings.eval_stagger_seconds,
+            price_move_pct=settings.eval_price_move_pct,
+            poll_seconds=settings.eval_poll_seconds,
+        )
+        evaluator.start()
+
+    # Sonra periyodik refresh (aynı event loop üzerinde)
+    scheduler = start_scheduler(
+        market,
+        seconds=settings.universe_refresh_seconds if event_mode else settings.refresh_seconds,
+        jitter=settings.refresh_jitter_seconds,
+        deadline=deadline,
+        evaluator=evaluator if event_mode else None,
+    )
 
 @app.on_event("shutdown")
 async def shutdown():
-    global client, scheduler
+    from .infra.storage.db import save_indicator_state
+    global client, stream, market, evaluator, scheduler
+    for task in background:
+        task.cancel()
     if scheduler:
         scheduler.shutdown(wait=False)
+    if evaluator:
+        await evaluator.stop()
+    if position_monitor.monitor:
+        await position_monitor.monitor.stop()
+    if market and market.backend:
+        # process backend: worker'lardaki indikatör state'i kaydedilmeden önce geri alınır
+        await market.backend.close()
+    if market:
+        await save_indicator_state(datetime.utcnow().isoformat(), market.export_indicator_state())
+        if settings.candle_cache_enabled:
+            from .infra.scheduler.jobs import flush_candles
+            await flush_candles(market)
+    if stream:
+        await stream.close()
     if client:
-        await client.close()
\ No newline at end of file
+        await client.close()
+    if snapshot_writer:
+        snapshot_writer.close()
+    if leader_lock:
+        leader_lock.release()
\ No newline at end of file
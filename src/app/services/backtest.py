@@ -0,0 +1,204 @@
+"""Offline backtest of the live scoring rules over the local candle store.
+
+    python -m src.app.services.backtest --tf 15m --from 2025-10-01 --workers 8
+    python -m src.app.services.backtest --fetch 400 --symbols BTCUSDT ETHUSDT
+
+Candles come from the SQLite ``candles`` table (filled by the live candle
+cache, or by ``--fetch``). Symbols run in parallel in a process pool; each
+worker reads its own symbol from SQLite so no arrays cross process borders.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ..domain.backtest import Series, evaluate, live_windows, simulate, summarize
+from ..domain.batch import BUY
+from ..domain.scoring import ScoreParams
+from ..infra.storage.candles import INTERVAL_MS
+from ..infra.storage.db import DB_PATH
+
+
+def _iso_ms(v: str | None) -> int | None:
+    if not v:
+        return None
+    dt = datetime.fromisoformat(v)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def list_symbols(interval: str, db_path: str = str(DB_PATH)) -> list[str]:
+    with sqlite3.connect(db_path) as db:
+        return [r[0] for r in db.execute("SELECT DISTINCT symbol FROM candles WHERE interval = ? ORDER BY symbol", (interval,))]
+
+
+def load_series(db: sqlite3.Connection, symbol: str, interval: str, ts_to: int | None) -> Series:
+    rows = db.execute(
+        """
+        SELECT open_time, high, low, close FROM candles
+        WHERE symbol = ? AND interval = ? AND open_time <= ?
+        ORDER BY open_time
+        """,
+        (symbol, interval, ts_to if ts_to is not None else 2**62),
+    ).fetchall()
+    a = np.array(rows, dtype=float).reshape(-1, 4)
+    return Series(open_time=a[:, 0].astype(np.int64), high=a[:, 1], low=a[:, 2], close=a[:, 3])
+
+
+def backtest_symbol(
+    symbol: str,
+    entry_tf: str = "15m",
+    ts_from: int | None = None,
+    ts_to: int | None = None,
+    max_hold: int = 96,
+    fee_pct: float = 0.08,
+    db_path: str = str(DB_PATH),
+    params: dict | None = None,
+) -> dict:
+    """Per-symbol job (runs inside a pool worker)."""
+    with sqlite3.connect(db_path) as db:
+        entry = load_series(db, symbol, entry_tf, ts_to)
+        hourly = load_series(db, symbol, "1h", ts_to)
+        daily = load_series(db, symbol, "1d", ts_to)
+    if len(entry.close) == 0:
+        return {"symbol": symbol, "error": "no data"}
+
+    ev = evaluate(entry, hourly, daily, INTERVAL_MS["1h"], INTERVAL_MS["1d"], ScoreParams.from_dict(params or {}),
+                  live_windows(entry_tf))
+    # ts_from öncesi sadece indikatör ısınması
+    start = int(np.searchsorted(entry.open_time, ts_from)) if ts_from is not None else 0
+    trades = simulate(entry.high, entry.low, entry.close, ev, start=start, max_hold=max_hold, fee_pct=fee_pct)
+    out = summarize(trades, signals=int((ev.decision[start:] == BUY).sum()), bars=len(entry.close) - start)
+    out["symbol"] = symbol
+    out["r"] = [t[3] for t in trades]
+    return out
+
+
+def _job(kw: dict) -> dict:
+    try:
+        return backtest_symbol(**kw)
+    except Exception as e:
+        return {"symbol": kw["symbol"], "error": f"{type(e).__name__}: {e}"}
+
+
+def run_backtest(
+    symbols: list[str],
+    entry_tf: str = "15m",
+    ts_from: int | None = None,
+    ts_to: int | None = None,
+    max_hold: int = 96,
+    fee_pct: float = 0.08,
+    workers: int | None = None,
+    db_path: str = str(DB_PATH),
+    params: dict | None = None,
+) -> dict:
+    jobs = [
+        dict(symbol=s, entry_tf=entry_tf, ts_from=ts_from, ts_to=ts_to, max_hold=max_hold, fee_pct=fee_pct,
+             db_path=db_path, params=params)
+        for s in symbols
+    ]
+    t0 = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_job(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_job, jobs))
+
+    # tüm sembollerin trade'leri sembol sırasıyla tek equity eğrisinde
+    all_r = [r for res in results for r in res.pop("r", [])]
+    wins = sum(res.get("wins", 0) for res in results)
+    losses = sum(res.get("losses", 0) for res in results)
+    total = summarize([(0, 0, None, r) for r in all_r], 0, 0)
+    total.update(
+        symbols=len(symbols),
+        wins=wins,
+        losses=losses,
+        timeouts=len(all_r) - wins - losses,
+        hit_rate=round(wins / len(all_r), 4) if all_r else None,
+        buy_signals=sum(res.get("buy_signals", 0) for res in results),
+        bars=sum(res.get("bars", 0) for res in results),
+        elapsed_s=round(time.perf_counter() - t0, 3),
+    )
+    return {"total": total, "symbols": results}
+
+
+async def fetch_history(symbols: list[str], entry_tf: str, days: int):
+    """Download closed klines into the candles table (only step that needs network)."""
+    from ..settings import settings
+    from ..infra.http.binance_client import BinanceClient
+    from ..infra.storage.db import init_db, save_candles
+
+    await init_db()
+    client = BinanceClient(settings.binance_base_url, weight_limit_1m=settings.weight_limit_1m)
+    now_ms = int(time.time() * 1000)
+    try:
+        for symbol in symbols:
+            for interval in ("1d", "1h", entry_tf):
+                step = INTERVAL_MS[interval]
+                # 1d/1h: EMA200/EMA50 ısınması için ek geçmiş
+                since = now_ms - days * 86_400_000 - 210 * step
+                while since < now_ms:
+                    c = await client.klines(symbol, interval, limit=1500, start_time=since)
+                    closed = [j for j in range(len(c)) if c.open_time[j] + step <= now_ms]
+                    await save_candles([
+                        (symbol, interval, c.open_time[j], c.open[j], c.high[j], c.low[j], c.close[j],
+                         c.volume[j], c.quote_volume[j])
+                        for j in closed
+                    ])
+                    if len(c) < 1500:
+                        break
+                    since = c.open_time[-1] + step
+    finally:
+        await client.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backtest the live scoring rules on local candles")
+    ap.add_argument("--symbols", nargs="*", help="default: every symbol in the candle store")
+    ap.add_argument("--tf", default="15m", help="entry timeframe")
+    ap.add_argument("--from", dest="ts_from", help="ISO date, trades start here (earlier data = warm-up)")
+    ap.add_argument("--to", dest="ts_to", help="ISO date")
+    ap.add_argument("--max-hold", type=int, default=96, help="bars before a time exit")
+    ap.add_argument("--fee", type=float, default=0.08, help="round-trip fee, percent")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--db", default=str(DB_PATH))
+    ap.add_argument("--params", help="ScoreParams overrides as JSON (same format as SCORE_PARAMS)")
+    ap.add_argument("--fetch", type=int, metavar="DAYS", help="download DAYS of history first")
+    ap.add_argument("--per-symbol", action="store_true", help="include per-symbol rows")
+    args = ap.parse_args()
+
+    symbols = [s.upper() for s in args.symbols] if args.symbols else None
+    if args.fetch:
+        if not symbols:
+            ap.error("--fetch needs --symbols")
+        asyncio.run(fetch_history(symbols, args.tf, args.fetch))
+    symbols = symbols or list_symbols(args.tf, args.db)
+
+    report = run_backtest(
+        symbols,
+        entry_tf=args.tf,
+        ts_from=_iso_ms(args.ts_from),
+        ts_to=_iso_ms(args.ts_to),
+        max_hold=args.max_hold,
+        fee_pct=args.fee,
+        workers=args.workers,
+        db_path=args.db,
+        params=json.loads(args.params) if args.params else None,
+    )
+    if not args.per_symbol:
+        report.pop("symbols")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""Where the CPU part of a refresh (indicators + strategies) runs.
+
+    EVAL_BACKEND=inline    # event loop üzerinde (varsayılan)
+    EVAL_BACKEND=thread    # ThreadPoolExecutor(EVAL_WORKERS)
+    EVAL_BACKEND=process   # EVAL_WORKERS kalıcı worker süreci
+
+Fetching stays on the event loop either way; ``MarketService.evaluate_many``
+hands the fetched ``EvalInput`` batch to ``run()`` and gets one
+``(Signal or exception, stage ms)`` per input back.
+
+The process backend pins every symbol to one worker (crc32 of the symbol),
+so the incremental indicator state lives in that worker across cycles.
+Candle columns (open_time / high / low / close) are copied into a
+per-worker shared-memory segment; only the small per-symbol metadata
+(offsets, spread, OI) is pickled over the pipe. Each worker answers its
+whole chunk with one message. A worker that dies is restarted (its symbols
+rebuild state from the candle window) and that batch is computed inline.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+from abc import ABC, abstractmethod
+import os
+import time
+import traceback
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List
+
+from ..domain.candles import Candles
+from ..infra.metrics import Spans, stage_children
+from .market_service import EvalInput, MarketService, _SeriesIndicators, eval_plan, evaluate_input
+
+BACKENDS = ("inline", "thread", "process")
+# paylaşımlı bellekteki kolonlar (hepsi 8 byte: int64 / float64)
+_COLUMNS = (("open_time", "q"), ("high", "d"), ("low", "d"), ("close", "d"))
+
+
+def _shard(symbol: str, n: int) -> int:
+    return zlib.crc32(symbol.encode()) % n
+
+
+class _Backend(ABC):
+    kind = ""
+
+    def __init__(self, market: MarketService, workers: int = 1):
+        self.market = market
+        self.workers = max(1, workers)
+        self.batches = 0
+        self.symbols = 0
+        self.last_batch_ms: float | None = None
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def run(self, inputs: List[EvalInput]) -> list:
+        t0 = time.perf_counter()
+        try:
+            return await self._run(inputs)
+        finally:
+            self.batches += 1
+            self.symbols += len(inputs)
+            self.last_batch_ms = round((time.perf_counter() - t0) * 1000, 3)
+
+    @abstractmethod
+    async def _run(self, inputs: List[EvalInput]) -> list:
+        """One (Signal or exception, stage ms) per input, same order."""
+
+    def stats(self) -> dict:
+        return {"kind": self.kind, "workers": self.workers, "batches": self.batches, "symbols": self.symbols,
+                "last_batch_ms": self.last_batch_ms}
+
+
+class InlineBackend(_Backend):
+    kind = "inline"
+
+    async def _run(self, inputs):
+        return [self.market.compute(inp) for inp in inputs]
+
+
+class ThreadBackend(_Backend):
+    """Chunks by symbol shard; trackers are per (symbol, interval, window) so threads never share one."""
+
+    kind = "thread"
+
+    def __init__(self, market: MarketService, workers: int = 2):
+        super().__init__(market, workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="eval")
+
+    def _chunk(self, inputs: List[EvalInput]) -> list:
+        return [self.market.compute(inp) for inp in inputs]
+
+    async def _run(self, inputs):
+        loop = asyncio.get_running_loop()
+        chunks: Dict[int, list] = {}
+        for i, inp in enumerate(inputs):
+            chunks.setdefault(_shard(inp.symbol, self.workers), []).append(i)
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(self._pool, self._chunk, [inputs[i] for i in idx]) for idx in chunks.values()
+        ))
+        out: list = [None] * len(inputs)
+        for idx, res in zip(chunks.values(), parts):
+            for i, r in zip(idx, res):
+                out[i] = r
+        return out
+
+    async def close(self):
+        self._pool.shutdown(wait=True)
+
+
+# -------- process backend: worker tarafı --------
+
+def _worker_main(conn, strategies, state: dict):
+    """Worker loop: ("eval", shm_name, meta) / ("export",) / ("stop",)."""
+    windows, specs = eval_plan(strategies)
+    trackers: Dict[tuple, _SeriesIndicators] = {}
+
+    def track(symbol: str, interval: str, window: int) -> _SeriesIndicators:
+        t = trackers.get((symbol, interval, window))
+        if t is None:
+            t = trackers[(symbol, interval, window)] = _SeriesIndicators(interval, specs[(interval, window)], window)
+        return t
+
+    for key, d in state.items():
+        try:
+            sym, iv, w = key.split("|")
+            track(sym, iv, int(w)).load(d)
+        except Exception:
+            continue
+
+    conn.send("ready")
+    shm: shared_memory.SharedMemory | None = None
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        op = msg[0]
+        if op == "stop":
+            break
+        if op == "export":
+            conn.send({f"{sym}|{iv}|{w}": t.to_dict() for (sym, iv, w), t in trackers.items()})
+            continue
+        _, shm_name, meta = msg
+        if shm is None or shm.name != shm_name:
+            if shm is not None:
+                shm.close()
+            # sahibi ana süreç; resource_tracker ortak, unlink'i ana süreç yapar
+            shm = shared_memory.SharedMemory(name=shm_name)
+        views: list = []
+        out = []
+        for symbol, now, spread_pct, oi, ivs in meta:
+            candles = {}
+            for iv, off, n in ivs:
+                cols = {}
+                for name, fmt in _COLUMNS:
+                    v = shm.buf[off:off + 8 * n].cast(fmt)
+                    views.append(v)
+                    cols[name] = v
+                    off += 8 * n
+                candles[iv] = Candles(**cols)
+            sp = Spans("symbol")
+            try:
+                res = evaluate_input(EvalInput(symbol, now, candles, spread_pct, oi), strategies, windows, track, sp)
+            except Exception as e:
+                res = RuntimeError(f"{type(e).__name__}: {e}")
+            stages = sp.done()
+            stages.pop("total")
+            out.append((res, stages))
+        candles = cols = None
+        for v in views:
+            v.release()
+        conn.send(out)
+    if shm is not None:
+        shm.close()
+    conn.close()
+
+
+# -------- process backend: ana süreç --------
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.proc = None
+        self.conn = None
+        self.shm: shared_memory.SharedMemory | None = None
+        self.lock = asyncio.Lock()
+
+    def call(self, msg):
+        self.conn.send(msg)
+        return self.conn.recv()
+
+    def ensure_shm(self, size: int) -> shared_memory.SharedMemory:
+        if self.shm is None or self.shm.size < size:
+            self.drop_shm()
+            # büyürken pay bırak: her cycle yeniden açılmasın
+            self.shm = shared_memory.SharedMemory(create=True, size=max(size + size // 2, 1 << 16))
+        return self.shm
+
+    def drop_shm(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class ProcessBackend(_Backend):
+    kind = "process"
+
+    def __init__(self, market: MarketService, workers: int = 2):
+        super().__init__(market, workers)
+        self._ctx = mp.get_context("spawn")
+        self._workers = [_Worker(i) for i in range(self.workers)]
+        self.restarts = 0
+        self.fallbacks = 0
+        self.last_error: str | None = None
+
+    def _spawn(self, w: _Worker, state: dict):
+        parent, child = self._ctx.Pipe()
+        w.proc = self._ctx.Process(target=_worker_main, args=(child, self.market.strategies, state),
+                                   name=f"eval-{w.index}", daemon=True)
+        w.proc.start()
+        child.close()
+        w.conn = parent
+
+    async def start(self):
+        # restart sonrası yüklenen indikatör state'i shard'lara dağıtılır
+        state = self.market.export_indicator_state()
+        parts: List[dict] = [{} for _ in self._workers]
+        for key, d in state.items():
+            parts[_shard(key.partition("|")[0], self.workers)][key] = d
+        for w, part in zip(self._workers, parts):
+            self._spawn(w, part)
+        # import + state yükleme ilk refresh'e yansımasın
+        for w in self._workers:
+            await asyncio.to_thread(w.conn.recv)
+
+    @staticmethod
+    def _pack(w: _Worker, inputs: List[EvalInput]) -> tuple:
+        size = sum(8 * len(_COLUMNS) * len(c) for inp in inputs for c in inp.candles.values())
+        shm = w.ensure_shm(size)
+        buf = shm.buf
+        off = 0
+        meta = []
+        for inp in inputs:
+            ivs = []
+            for iv, c in inp.candles.items():
+                n = len(c)
+                ivs.append((iv, off, n))
+                for name, _ in _COLUMNS:
+                    buf[off:off + 8 * n] = memoryview(getattr(c, name)).cast("B")
+                    off += 8 * n
+            meta.append((inp.symbol, inp.now, inp.spread_pct, inp.oi, ivs))
+        return shm.name, meta
+
+    @staticmethod
+    async def _drain(call: asyncio.Future):
+        """Wait out an in-flight reply, ignoring further cancellations."""
+        while not call.done():
+            try:
+                await asyncio.shield(call)
+            except asyncio.CancelledError:
+                continue
+            except Exception:
+                break
+
+    async def _run_worker(self, w: _Worker, inputs: List[EvalInput]) -> list:
+        async with w.lock:
+            try:
+                name, meta = self._pack(w, inputs)
+                call = asyncio.ensure_future(asyncio.to_thread(w.call, ("eval", name, meta)))
+                try:
+                    out = await asyncio.shield(call)
+                except asyncio.CancelledError:
+                    # deadline iptali: cevap okunmadan lock bırakılırsa sonraki batch shm'i
+                    # ezer ve pipe'ta iki okuyucu olur => cevap lock altında tüketilir
+                    await self._drain(call)
+                    raise
+            except (EOFError, OSError, BrokenPipeError):
+                # worker öldü: yeniden başlat (state pencereden kurulur), bu batch ana süreçte
+                self.last_error = traceback.format_exc()
+                self.restarts += 1
+                self.fallbacks += 1
+                if w.proc is not None:
+                    w.proc.kill()
+                self._spawn(w, {})
+                await asyncio.to_thread(w.conn.recv)
+                return [self.market.compute(inp) for inp in inputs]
+        children = stage_children("symbol")
+        for _, stages in out:
+            for stage, ms in stages.items():
+                children[stage].observe(ms / 1000)
+        return out
+
+    async def _run(self, inputs):
+        chunks: Dict[int, list] = {}
+        for i, inp in enumerate(inputs):
+            chunks.setdefault(_shard(inp.symbol, self.workers), []).append(i)
+        parts = await asyncio.gather(*(
+            self._run_worker(self._workers[k], [inputs[i] for i in idx]) for k, idx in chunks.items()
+        ))
+        out: list = [None] * len(inputs)
+        for idx, res in zip(chunks.values(), parts):
+            for i, r in zip(idx, res):
+                out[i] = r
+        return out
+
+    async def collect_state(self):
+        """Pull the workers' indicator state into the market (persisted on shutdown)."""
+        state: dict = {}
+        for w in self._workers:
+            async with w.lock:
+                try:
+                    state.update(await asyncio.to_thread(w.call, ("export",)))
+                except (EOFError, OSError):
+                    pass
+        self.market.load_indicator_state(state)
+
+    async def close(self):
+        await self.collect_state()
+        for w in self._workers:
+            try:
+                w.conn.send(("stop",))
+            except (OSError, AttributeError):
+                pass
+        for w in self._workers:
+            if w.proc is not None:
+                await asyncio.to_thread(w.proc.join, 5)
+                if w.proc.is_alive():
+                    w.proc.kill()
+            w.drop_shm()
+
+    def stats(self) -> dict:
+        out = super().stats()
+        out.update(
+            restarts=self.restarts,
+            fallbacks=self.fallbacks,
+            alive=sum(1 for w in self._workers if w.proc is not None and w.proc.is_alive()),
+            shm_bytes=sum(w.shm.size for w in self._workers if w.shm is not None),
+            last_error=self.last_error,
+        )
+        return out
+
+
+def make_backend(kind: str, market: MarketService, workers: int = 0) -> _Backend:
+    workers = workers or os.cpu_count() or 1
+    if kind == "thread":
+        return ThreadBackend(market, workers)
+    if kind == "process":
+        return ProcessBackend(market, workers)
+    if kind != "inline":
+        raise ValueError(f"EVAL_BACKEND must be one of {BACKENDS}")
+    return InlineBackend(market)
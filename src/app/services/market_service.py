@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Tuple
 
-from ..domain.models import Signal, Decision, Plan
-from ..domain.indicators import ema, rsi, atr, NotEnoughData
+from ..domain import scoring
+from ..domain.candles import Candles
+from ..domain.models import Signal, Decision, Plan, StrategyOutcome
+from ..domain.strategy import MarketState, Strategy, StrategyResult, TrendScore, merge as merge_requirements
+from ..domain.indicators import ATR, NotEnoughData, indicator_from_dict, make_indicator
 from ..infra.http.binance_client import BinanceClient
-from ..infra.storage.cache import TTLCache
+from ..infra.metrics import Spans
+from ..infra.storage.books import BookStore
+from ..infra.storage.cache import AsyncCache
+from ..infra.storage.candles import CandleStore, INTERVAL_MS
 
 # Deploy doğrulama için
 SERVICE_VERSION = "MS-2026-02-26-v3"
@@ -19,13 +28,125 @@ def _safe_float(v, default=0.0):
         return default
 
 
-def _parse_klines(kl: list[list]):
-    closes, highs, lows = [], [], []
-    for row in kl:
-        closes.append(float(row[4]))
-        highs.append(float(row[2]))
-        lows.append(float(row[3]))
-    return closes, highs, lows
+@dataclass
+class MarketSnapshot:
+    """Per-cycle bulk market data shared by every symbol's evaluation."""
+    books: Dict[str, Tuple[float, float]] = field(default_factory=dict)  # symbol -> (bid, ask)
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class EvalInput:
+    """Fetched inputs of one symbol; everything the CPU part (`evaluate_input`) needs."""
+    symbol: str
+    now: datetime
+    candles: Dict[str, Candles]
+    spread_pct: float | None = None
+    oi: List[float] | None = None
+
+
+def eval_plan(strategies: List[Strategy]) -> Tuple[List[Dict[str, int]], Dict[Tuple[str, int], frozenset]]:
+    """Per-strategy candle windows + indicator specs per (interval, window) tracker.
+
+    Every strategy sees its indicators over its own declared window, so adding a
+    strategy with a longer lookback never changes another one's values; strategies
+    that declare the same (interval, window) share one tracker.
+    """
+    windows: List[Dict[str, int]] = []
+    specs: Dict[Tuple[str, int], set] = {}
+    for s in strategies:
+        req = s.requires()
+        windows.append(dict(req.candles))
+        for iv, n in req.candles.items():
+            specs.setdefault((iv, n), set()).update(req.indicators.get(iv, ()))
+    return windows, {k: frozenset(v) for k, v in specs.items()}
+
+
+class _SeriesIndicators:
+    """Incremental indicators over the closed candles of one (symbol, interval, window).
+
+    Closed candles are pushed once; the open (last) candle is only peeked,
+    so revising it on every refresh never corrupts the state.
+    """
+
+    def __init__(self, interval: str, specs=(), window: int | None = None):
+        self.interval = interval
+        # window: EMA/RSI referans fonksiyonlar gibi son `window` mum üzerinden (yeniden seed'li)
+        self.window = window
+        # ("ema", 50) / ("rsi", 14) / ("atr", 14) -> değer anahtarı "ema50" / "rsi14" / "atr14"
+        self.specs = tuple(sorted(set(specs)))
+        self.missing: Dict[str, str] = {}
+        self._reset()
+
+    def _reset(self):
+        self.inds = {f"{kind}{p}": make_indicator(kind, p, self.window) for kind, p in self.specs}
+        self.last_ot: int | None = None
+
+    def _push(self, h: float, l: float, c: float, ot: int):
+        for ind in self.inds.values():
+            if isinstance(ind, ATR):
+                ind.update(h, l, c)
+            else:
+                ind.update(c)
+        self.last_ot = ot
+
+    def sync(self, candles: Candles):
+        ot = candles.open_time
+        closed = len(candles) - 1
+        start = 0
+        if self.last_ot is not None:
+            # genelde sadece son 0-1 mum yeni: sondan geriye tara
+            start = closed
+            while start > 0 and ot[start - 1] > self.last_ot:
+                start -= 1
+            step = INTERVAL_MS.get(self.interval)
+            if start < closed and step and ot[start] != self.last_ot + step:
+                # pencere kaydı / boşluk => baştan kur
+                self._reset()
+                start = 0
+        hi, lo, cl = candles.high, candles.low, candles.close
+        for i in range(start, closed):
+            self._push(hi[i], lo[i], cl[i], ot[i])
+
+    def peek(self, candles: Candles) -> dict:
+        """Ready values; the rest go to `self.missing` (a strategy may not need them)."""
+        h, l, c = candles.high[-1], candles.low[-1], candles.close[-1]
+        out = {"close": c}
+        missing = {}
+        for key, ind in self.inds.items():
+            try:
+                out[key] = ind.peek(h, l, c) if isinstance(ind, ATR) else ind.peek(c)
+            except NotEnoughData as ne:
+                missing[key] = str(ne)
+        self.missing = missing
+        return out
+
+    def values(self, candles: Candles) -> dict:
+        if not len(candles):
+            raise NotEnoughData(f"No {self.interval} candles")
+        self.sync(candles)
+        return self.peek(candles)
+
+    def to_dict(self) -> dict:
+        # keys: değer anahtarları ("ema50"); windowed indikatörlerin kind'ı "wema"/"wrsi" olduğu için ayrı
+        return {"last_ot": self.last_ot, "keys": list(self.inds), "inds": [i.to_dict() for i in self.inds.values()]}
+
+    def load(self, d: dict):
+        if "inds" in d:
+            dumped = d["inds"]
+        else:
+            # eski format: emas + tek rsi/atr
+            dumped = list(d["emas"]) + [x for x in (d.get("rsi"), d.get("atr")) if x]
+        keys = d.get("keys") or [f"{x['kind']}{x['period']}" for x in dumped]
+        inds = {k: indicator_from_dict(x) for k, x in zip(keys, dumped)}
+        if set(inds) != set(self.inds) or any(
+            type(inds[k]) is not type(v) or getattr(inds[k], "window", None) != getattr(v, "window", None)
+            for k, v in self.inds.items()
+        ):
+            # indikatör seti / pencere değişti (ya da eski tam-geçmiş EMA state'i) => pencereden yeniden kurulur
+            return
+        self.inds = {k: inds[k] for k in self.inds}
+        self.last_ot = d["last_ot"]
 
 
 class MarketService:
@@ -37,6 +158,8 @@ class MarketService:
         max_spread_pct: float = 0.12,
         whitelist: list[str] | None = None,
         min_quote_volume_24h: float = 0.0,
+        score_params: scoring.ScoreParams | None = None,
+        strategies: List[Strategy] | None = None,
     ):
         self.whitelist = whitelist or []
         self.min_quote_volume_24h = min_quote_volume_24h
@@ -44,16 +167,98 @@ class MarketService:
         self.top_n = top_n
         self.entry_tf = entry_tf
         self.max_spread_pct = max_spread_pct
+        # skor ağırlıkları / eşikler (SCORE_PARAMS ile override)
+        self.score_params = score_params or scoring.DEFAULT_PARAMS
+        # ilk strateji Signal'in ana alanlarını belirler, diğerleri Signal.strategies'e
+        self.strategies = strategies or [TrendScore(self.score_params, entry_tf)]
+        # tüm stratejilerin ihtiyaçları tek fetch planına: interval başına en uzun pencere
+        self.requirements = merge_requirements(s.requires() for s in self.strategies)
+
+        # interval -> çekilen pencere (mum sayısı)
+        self.windows = dict(self.requirements.candles)
+        # indikatörler ise her stratejinin kendi penceresinde: (interval, window) -> specs
+        self.strategy_windows, self.tracker_specs = eval_plan(self.strategies)
+
+        # kapalı mumlar bellekte kalır, sadece yeni/açık mumlar çekilir
+        self.candles = CandleStore(
+            client,
+            refresh_seconds={
+                "1d": 3600,       # 1 saat
+                "1h": 180,        # 3 dk
+                entry_tf: 60,     # 1 dk
+            },
+        )
+        self.books = BookStore()
+        # exchangeInfo nadiren değişir; ticker/OI kısa TTL + stale-while-revalidate
+        self._info_cache = AsyncCache(ttl_seconds=6 * 3600, stale_seconds=24 * 3600, max_entries=1)
+        self._info_seen: dict | None = None
+        self._allowed: frozenset = frozenset()
+        self.universe_version = 0
+        self._ticker_cache = AsyncCache(ttl_seconds=60, stale_seconds=120, max_entries=1)
+        self._oi_cache = AsyncCache(ttl_seconds=60, stale_seconds=240, max_entries=1024)
+        self._indicators: dict[tuple, _SeriesIndicators] = {}
+        # opsiyonel WebSocket ingestion (main.py bağlar)
+        self.stream = None
+        self._watched: List[str] = []
+        self.pinned: set = set()
+        # opsiyonel iki aşamalı tarayıcı (SCAN_MODE, main.py bağlar)
+        self.scanner = None
+        # hesaplama backend'i (EVAL_BACKEND, main.py bağlar); None => event loop üzerinde
+        self.backend = None
+        # debug side-table: symbol -> son değerlendirmenin aşama süreleri (ms)
+        self.stage_timings: Dict[str, dict] = {}
+
+    @property
+    def intervals(self) -> List[str]:
+        return list(self.windows)
+
+    def watch(self, symbols: List[str]):
+        self._watched = list(symbols)
+        if self.stream is not None:
+            self.stream.set_symbols(self._watched + sorted(self.pinned))
+
+    def pin(self, symbols):
+        """Symbols the stream follows regardless of the universe (open positions)."""
+        pinned = set(symbols)
+        if pinned != self.pinned:
+            self.pinned = pinned
+            self.watch(self._watched)
+
+    def _track(self, symbol: str, interval: str, window: int) -> _SeriesIndicators:
+        key = (symbol, interval, window)
+        t = self._indicators.get(key)
+        if t is None:
+            t = _SeriesIndicators(interval, self.tracker_specs[(interval, window)], window)
+            self._indicators[key] = t
+        return t
+
+    def export_indicator_state(self) -> dict:
+        return {f"{sym}|{iv}|{w}": t.to_dict() for (sym, iv, w), t in self._indicators.items()}
+
+    def load_indicator_state(self, state: dict):
+        for key, d in state.items():
+            try:
+                # eski "SYM|iv" anahtarları (pencere yok) => pencereden yeniden kurulur
+                sym, iv, w = key.split("|")
+                self._track(sym, iv, int(w)).load(d)
+            except Exception:
+                # bozuk/eski state ya da artık kullanılmayan pencere
+                continue
 
-        self._cache_1d = TTLCache(3600)   # 1 saat
-        self._cache_1h = TTLCache(180)    # 3 dk
-        self._cache_entry = TTLCache(60)  # 1 dk
+    def caches(self) -> Dict[str, AsyncCache]:
+        return {
+            "exchange_info": self._info_cache,
+            "ticker_24h": self._ticker_cache,
+            "open_interest": self._oi_cache,
+        }
 
-    async def get_top_symbols(self) -> List[str]:
-        if self.whitelist:
-            return self.whitelist[: self.top_n]
+    def cache_stats(self) -> dict:
+        return {name: c.stats() for name, c in self.caches().items()}
 
-        info = await self.client.exchange_info()
+    async def _allowed_symbols(self) -> frozenset:
+        info = await self._info_cache.get_or_load("exchange_info", self.client.exchange_info)
+        if info is self._info_seen:
+            return self._allowed
         allowed = set()
         for s in info.get("symbols", []):
             if s.get("quoteAsset") != "USDT":
@@ -63,9 +268,45 @@ class MarketService:
             if s.get("status") != "TRADING":
                 continue
             allowed.add(s.get("symbol"))
+        allowed = frozenset(allowed)
+        # yeni exchangeInfo geldi: sadece küme değiştiyse versiyonu artır
+        if allowed != self._allowed:
+            self.universe_version += 1
+        self._info_seen = info
+        self._allowed = allowed
+        return allowed
+
+    async def prefetch(self, symbols: List[str]) -> MarketSnapshot:
+        """One bulk bookTicker call per cycle instead of one call per symbol."""
+        snap = MarketSnapshot()
+        books = {s: self.books.get(s) for s in symbols}
+        if all(bt is not None for bt in books.values()):
+            # stream canlı: ağ çağrısı yok
+            snap.books = {s: (bt.bid, bt.ask) for s, bt in books.items()}
+            return snap
+        try:
+            rows = await self.client.book_tickers()
+        except Exception:
+            # tekil bookTicker'a düşülür
+            return snap
+        wanted = set(symbols)
+        for row in rows:
+            sym = row.get("symbol")
+            if sym in wanted:
+                snap.books[sym] = (_safe_float(row.get("bidPrice")), _safe_float(row.get("askPrice")))
+        return snap
+
+    async def tickers(self) -> List[dict]:
+        """24h tickers of tradable USDT perpetuals (one bulk call, cached)."""
+        allowed = await self._allowed_symbols()
+        tickers = await self._ticker_cache.get_or_load("ticker_24h", self.client.ticker_24h)
+        return [t for t in tickers if t.get("symbol") in allowed]
 
-        tickers = await self.client.ticker_24h()
-        usdt = [t for t in tickers if t.get("symbol") in allowed]
+    async def get_top_symbols(self) -> List[str]:
+        if self.whitelist:
+            return self.whitelist[: self.top_n]
+
+        usdt = await self.tickers()
 
         if self.min_quote_volume_24h > 0:
             usdt = [
@@ -76,57 +317,108 @@ class MarketService:
         usdt.sort(key=lambda x: _safe_float(x.get("quoteVolume")), reverse=True)
         return [t["symbol"] for t in usdt[: self.top_n]]
 
-    async def build_signal_for(self, symbol: str) -> Signal:
+    async def build_signal_for(self, symbol: str, snapshot: MarketSnapshot | None = None) -> Signal:
+        sp = Spans("symbol")
+        try:
+            inp = await self._gather(symbol, snapshot, sp)
+            if isinstance(inp, Signal):
+                return inp
+            return evaluate_input(inp, self.strategies, self.strategy_windows, self._track, sp)
+        finally:
+            self.stage_timings[symbol] = sp.done()
+
+    async def evaluate_many(self, symbols: List[str], snapshot: MarketSnapshot | None = None) -> list:
+        """Fetch every symbol concurrently, then compute them in one batch on `self.backend`.
+
+        Returns a Signal or an exception per symbol (same order as `symbols`).
+        """
+        spans = {s: Spans("symbol") for s in symbols}
+        gathered = await asyncio.gather(*(self._gather(s, snapshot, spans[s]) for s in symbols),
+                                        return_exceptions=True)
+        for s in symbols:
+            self.stage_timings[s] = spans[s].done()
+        pending = [g for g in gathered if isinstance(g, EvalInput)]
+        computed: dict = {}
+        if pending:
+            try:
+                if self.backend is None:
+                    outs = [self.compute(inp) for inp in pending]
+                else:
+                    outs = await self.backend.run(pending)
+            except Exception as e:
+                outs = [(e, {})] * len(pending)
+            for i, inp in enumerate(pending):
+                item = outs[i] if i < len(outs) else None
+                if not (isinstance(item, tuple) and len(item) == 2):
+                    # backend eksik/bozuk cevap döndü => sadece bu sembol hata alır
+                    item = (RuntimeError(f"eval backend returned no result for {inp.symbol}"), {})
+                res, stages = item
+                computed[inp.symbol] = res
+                t = self.stage_timings[inp.symbol]
+                for stage, ms in stages.items():
+                    t[stage] = ms
+                    t["total"] = round(t["total"] + ms, 3)
+        return [computed[s] if isinstance(g, EvalInput) else g for s, g in zip(symbols, gathered)]
+
+    def compute(self, inp: EvalInput) -> tuple:
+        """(Signal or exception, stage ms) on this process' indicator state."""
+        sp = Spans("symbol")
+        try:
+            res = evaluate_input(inp, self.strategies, self.strategy_windows, self._track, sp)
+        except Exception as e:
+            res = e
+        stages = sp.done()
+        stages.pop("total")
+        return res, stages
+
+    async def _gather(self, symbol: str, snapshot: MarketSnapshot | None, sp: Spans) -> Signal | EvalInput:
+        """I/O part: book, candles, OI. A Signal is returned when the symbol is rejected early."""
         now = datetime.utcnow()
 
         # -------- spread (opsiyonel) --------
         spread_pct: float | None = None
+        if self.requirements.spread:
+            try:
+                live = self.books.get(symbol)
+                if snapshot is not None and symbol in snapshot.books:
+                    bid, ask = snapshot.books[symbol]
+                elif live is not None:
+                    bid, ask = live.bid, live.ask
+                else:
+                    bt = await self.client.book_ticker(symbol)
+                    bid = _safe_float(bt.get("bidPrice"))
+                    ask = _safe_float(bt.get("askPrice"))
+                if bid <= 0 or ask <= 0:
+                    raise ValueError("bookTicker bid/ask invalid")
+
+                mid = (bid + ask) / 2
+                spread_pct = ((ask - bid) / mid * 100.0) if mid > 0 else None
+
+                if spread_pct is not None and spread_pct > self.max_spread_pct:
+                    return Signal(
+                        symbol=symbol,
+                        decision=Decision.WAIT,
+                        score=15,
+                        daily_trend_ok=False,
+                        updated_at=now,
+                        plan=None,
+                        reason=f"Spread yüksek ({spread_pct:.3f}%) | {SERVICE_VERSION}",
+                    )
+            except Exception:
+                # bookTicker fail => spread ölçemedik ama devam
+                spread_pct = None
+            finally:
+                sp.mark("book")
+
+        # -------- klines (incremental candle store, birleşik plan) --------
+        candles: Dict[str, Candles] = {}
         try:
-            bt = await self.client.book_ticker(symbol)
-            bid = _safe_float(bt.get("bidPrice"))
-            ask = _safe_float(bt.get("askPrice"))
-            if bid <= 0 or ask <= 0:
-                raise ValueError("bookTicker bid/ask invalid")
-
-            mid = (bid + ask) / 2
-            spread_pct = ((ask - bid) / mid * 100.0) if mid > 0 else None
-
-            if spread_pct is not None and spread_pct > self.max_spread_pct:
-                return Signal(
-                    symbol=symbol,
-                    decision=Decision.WAIT,
-                    score=15,
-                    daily_trend_ok=False,
-                    updated_at=now,
-                    plan=None,
-                    reason=f"Spread yüksek ({spread_pct:.3f}%) | {SERVICE_VERSION}",
-                )
-        except Exception:
-            # bookTicker fail => spread ölçemedik ama devam
-            spread_pct = None
-
-        # -------- klines (TTL cache) --------
-        try:
-            k1 = f"{symbol}:1d:220"
-            k2 = f"{symbol}:1h:120"
-            k3 = f"{symbol}:{self.entry_tf}:160"
-
-            d1 = self._cache_1d.get(k1)
-            if d1 is None:
-                d1 = await self.client.klines(symbol, "1d", limit=220)
-                self._cache_1d.set(k1, d1)
-
-            h1 = self._cache_1h.get(k2)
-            if h1 is None:
-                h1 = await self.client.klines(symbol, "1h", limit=120)
-                self._cache_1h.set(k2, h1)
-
-            en = self._cache_entry.get(k3)
-            if en is None:
-                en = await self.client.klines(symbol, self.entry_tf, limit=160)
-                self._cache_entry.set(k3, en)
+            for iv, n in self.windows.items():
+                candles[iv] = await self.candles.get(symbol, iv, n)
+                sp.mark("klines_entry" if iv == self.entry_tf else f"klines_{iv}")
 
         except Exception as e:
+            sp.mark("klines_error")
             return Signal(
                 symbol=symbol,
                 decision=Decision.WAIT,
@@ -137,112 +429,116 @@ class MarketService:
                 reason=f"Veri çekilemedi: {e} | {SERVICE_VERSION}",
             )
 
-        # -------- indicators --------
-        try:
-            d_close, d_high, d_low = _parse_klines(d1)
-            h_close, h_high, h_low = _parse_klines(h1)
-            e_close, e_high, e_low = _parse_klines(en)
+        # -------- Open Interest --------
+        oi_series: List[float] | None = None
+        if self.requirements.oi:
+            try:
+                oi = await self._oi_cache.get_or_load(
+                    symbol, lambda: self.client.open_interest_hist(symbol, period="5m", limit=30)
+                )
+                oi_series = [float(r["sumOpenInterest"]) for r in oi or ()]
+            except Exception:
+                oi_series = None
+            sp.mark("oi")
 
-            d_ema50 = ema(d_close, 50)
-            d_ema200 = ema(d_close, 200)
-            daily_ok = (d_close[-1] > d_ema50) and (d_ema50 > d_ema200)
+        return EvalInput(symbol, now, candles, spread_pct, oi_series)
 
-            h_ema50 = ema(h_close, 50)
-            h_ok = (h_close[-1] > h_ema50)
 
-            e_ema20 = ema(e_close, 20)
-            e_ema50 = ema(e_close, 50)
-            e_rsi = rsi(e_close, 14)
-            e_atr = atr(e_high, e_low, e_close, 14)
+def evaluate_input(inp: EvalInput, strategies: List[Strategy], windows: List[Dict[str, int]], track,
+                   sp: Spans) -> Signal:
+    """CPU part: incremental indicators + strategies.
 
-            last = e_close[-1]
+    `windows`: each strategy's interval -> window (``eval_plan``);
+    `track(symbol, interval, window)` owns the state.
+    """
+    symbol, now = inp.symbol, inp.now
+    # -------- indicators (her (interval, pencere) bir kez, aynı pencereyi kullananlar paylaşır) --------
+    try:
+        values, missing = {}, {}
+        for strat_windows in windows:
+            for iv, w in strat_windows.items():
+                c = inp.candles.get(iv)
+                if (iv, w) in values or c is None:
+                    continue
+                t = track(symbol, iv, w)
+                values[(iv, w)] = t.values(c)
+                missing[(iv, w)] = t.missing
+        sp.mark("indicators")
+
+    except NotEnoughData as ne:
+        sp.mark("indicators")
+        return Signal(
+            symbol=symbol,
+            decision=Decision.WAIT,
+            score=10,
+            daily_trend_ok=False,
+            updated_at=now,
+            plan=None,
+            reason=f"{ne} | {SERVICE_VERSION}",
+        )
+    except Exception as e:
+        sp.mark("indicators")
+        return Signal(
+            symbol=symbol,
+            decision=Decision.WAIT,
+            score=10,
+            daily_trend_ok=False,
+            updated_at=now,
+            plan=None,
+            reason=f"Parse/Calc hata: {e} | {SERVICE_VERSION}",
+        )
 
+    # -------- strategies --------
+    results: List[Tuple[str, StrategyResult | str]] = []
+    for strat, strat_windows in zip(strategies, windows):
+        keys = [(iv, w) for iv, w in strat_windows.items() if (iv, w) in values]
+        state = MarketState(symbol, {iv: values[(iv, w)] for iv, w in keys},
+                            {iv: missing[(iv, w)] for iv, w in keys}, inp.spread_pct, inp.oi)
+        try:
+            results.append((strat.name, strat.evaluate(state)))
         except NotEnoughData as ne:
-            return Signal(
-                symbol=symbol,
-                decision=Decision.WAIT,
-                score=10,
-                daily_trend_ok=False,
-                updated_at=now,
-                plan=None,
-                reason=f"{ne} | {SERVICE_VERSION}",
-            )
+            results.append((strat.name, str(ne)))
         except Exception as e:
-            return Signal(
-                symbol=symbol,
-                decision=Decision.WAIT,
-                score=10,
-                daily_trend_ok=False,
-                updated_at=now,
-                plan=None,
-                reason=f"Parse/Calc hata: {e} | {SERVICE_VERSION}",
-            )
+            results.append((strat.name, f"Parse/Calc hata: {e}"))
+    sp.mark("score")
+
+    signal = _to_signal(symbol, now, results[0][1])
+    if len(results) > 1:
+        signal.strategies = {name: _outcome(r) for name, r in results}
+    return signal
+
+
+def _plan(r: StrategyResult) -> Plan | None:
+    if r.plan is None:
+        return None
+    entry, stop, target, rr = r.plan
+    return Plan(entry=entry, stop=stop, target=target, rr=rr)
 
-        # -------- Open Interest --------
-        oi_score = 0
-        try:
-            oi = await self.client.open_interest_hist(symbol, period="5m", limit=30)
-            if oi and len(oi) >= 5:
-                first = float(oi[0]["sumOpenInterest"])
-                last_oi = float(oi[-1]["sumOpenInterest"])
-                if first > 0:
-                    change = (last_oi - first) / first
-                    if change > 0.02:
-                        oi_score = 8
-                    elif change > 0.0:
-                        oi_score = 4
-                    elif change < -0.02:
-                        oi_score = -6
-                    else:
-                        oi_score = -2
-        except Exception:
-            oi_score = 0
-
-        # -------- scoring --------
-        score = 50
-        score += 15 if daily_ok else -10
-        score += 10 if h_ok else -8
-        score += 8 if e_ema20 > e_ema50 else -8
-        score += 6 if e_rsi >= 55 else (-6 if e_rsi <= 45 else 0)
-        score += oi_score
-
-        if spread_pct is not None and spread_pct <= 0.05:
-            score += 6
-
-        score = max(0, min(100, int(score)))
-
-        # -------- plan --------
-        entry = last
-        stop = last - 1.3 * e_atr
-        target = last + 2.0 * e_atr
-        rr = (target - entry) / (entry - stop) if (entry - stop) > 0 else None
-
-        plan = Plan(entry=entry, stop=stop, target=target, rr=rr)
-
-        # -------- decision --------
-        if score >= 70 and daily_ok and h_ok:
-            decision = Decision.BUY
-        elif score <= 35 and (not h_ok):
-            decision = Decision.SELL
-        else:
-            decision = Decision.WAIT
-
-        spread_str = "-" if spread_pct is None else f"{spread_pct:.3f}%"
-        reason = (
-            f"1d:{'OK' if daily_ok else 'NO'} "
-            f"1h:{'OK' if h_ok else 'NO'} "
-            f"EMA20/50:{'UP' if e_ema20 > e_ema50 else 'DN'} "
-            f"RSI:{e_rsi:.1f} "
-            f"OI:{oi_score} "
-            f"Spread:{spread_str} | {SERVICE_VERSION}"
-        )
 
+def _to_signal(symbol: str, now: datetime, r: StrategyResult | str) -> Signal:
+    if isinstance(r, str):
+        # birincil strateji değerlendirilemedi (veri yetersiz / hata)
         return Signal(
             symbol=symbol,
-            decision=decision,
-            score=score,
-            daily_trend_ok=daily_ok,
+            decision=Decision.WAIT,
+            score=10,
+            daily_trend_ok=False,
             updated_at=now,
-            plan=plan,
-            reason=reason,
+            plan=None,
+            reason=f"{r} | {SERVICE_VERSION}",
         )
+    return Signal(
+        symbol=symbol,
+        decision=Decision(r.decision),
+        score=r.score,
+        daily_trend_ok=r.trend_ok,
+        updated_at=now,
+        plan=_plan(r),
+        reason=f"{r.reason} | {SERVICE_VERSION}",
+    )
+
+
+def _outcome(r: StrategyResult | str) -> StrategyOutcome:
+    if isinstance(r, str):
+        return StrategyOutcome(decision=Decision.WAIT, score=10, plan=None, reason=r)
+    return StrategyOutcome(decision=Decision(r.decision), score=r.score, plan=_plan(r), reason=r.reason)
@@ -0,0 +1,213 @@
+"""Parameter sweep over ``ScoreParams`` on the local candle store.
+
+    python -m src.app.services.optimize --from 2025-10-01 \
+        --grid buy_score=65,70,75 stop_atr=1.0,1.3,1.6 target_atr=1.5,2.0,3.0
+    python -m src.app.services.optimize --grid ... --random 200 --objective avg_r
+
+Indicators do not depend on the parameters, so they are computed once per
+symbol and packed into one shared-memory block; pool workers attach to it
+and every parameter combination only reruns scoring + trade simulation.
+The best rows carry an ``env`` string ready for ``SCORE_PARAMS``.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..domain.backtest import FEATURES, STOP, TARGET, evaluate_features, features, live_windows, simulate, summarize
+from ..domain.batch import BUY
+from ..domain.scoring import ScoreParams
+from ..infra.storage.candles import INTERVAL_MS
+from ..infra.storage.db import DB_PATH
+from .backtest import _iso_ms, list_symbols, load_series
+
+OBJECTIVES = ("total_r", "avg_r", "profit_factor", "hit_rate")
+
+
+def parse_grid(specs: list[str]) -> dict[str, list]:
+    """["buy_score=65,70", ...] -> {"buy_score": [65, 70], ...}"""
+    types = {f.name: type(getattr(ScoreParams(), f.name)) for f in fields(ScoreParams)}
+    grid = {}
+    for spec in specs:
+        key, _, values = spec.partition("=")
+        key = key.strip()
+        if key not in types:
+            raise ValueError(f"unknown score param: {key}")
+        grid[key] = [types[key](v) for v in values.split(",") if v.strip()]
+    return grid
+
+
+def combinations(grid: dict[str, list], random_n: int | None = None, seed: int = 0) -> list[dict]:
+    keys = list(grid)
+    combos = [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+    if random_n and random_n < len(combos):
+        # random search: gridden tekrarsız örnek
+        combos = random.Random(seed).sample(combos, random_n)
+    return combos
+
+
+def _symbol_features(kw: dict):
+    with sqlite3.connect(kw["db_path"]) as db:
+        entry = load_series(db, kw["symbol"], kw["entry_tf"], kw["ts_to"])
+        hourly = load_series(db, kw["symbol"], "1h", kw["ts_to"])
+        daily = load_series(db, kw["symbol"], "1d", kw["ts_to"])
+    if len(entry.close) == 0:
+        return kw["symbol"], 0, None
+    start = int(np.searchsorted(entry.open_time, kw["ts_from"])) if kw["ts_from"] is not None else 0
+    f = features(entry, hourly, daily, INTERVAL_MS["1h"], INTERVAL_MS["1d"], live_windows(kw["entry_tf"]))
+    return kw["symbol"], start, np.stack([np.asarray(f[k], dtype=float) for k in FEATURES])
+
+
+class SharedFeatures:
+    """All symbols' feature rows in one (len(FEATURES) x total_bars) float64 block."""
+
+    def __init__(self, per_symbol: list[tuple]):
+        per_symbol = [x for x in per_symbol if x[2] is not None]
+        self.symbols = [x[0] for x in per_symbol]
+        self.starts = [x[1] for x in per_symbol]
+        sizes = [x[2].shape[1] for x in per_symbol]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(int).tolist()
+        self.shape = (len(FEATURES), self.offsets[-1])
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(self.shape)) * 8))
+        arr = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        for (_, _, a), lo in zip(per_symbol, self.offsets):
+            arr[:, lo:lo + a.shape[1]] = a
+
+    def meta(self) -> dict:
+        return {"name": self.shm.name, "shape": self.shape, "offsets": self.offsets, "starts": self.starts}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# worker tarafı: initializer ile bir kez attach
+_shared: dict = {}
+
+
+def _attach(meta: dict):
+    # sahibi ana süreç; pool worker'ları (fork ve spawn) ana sürecin resource_tracker'ını
+    # paylaşır: burada unregister edilirse ana süreçteki unlink KeyError verir
+    shm = shared_memory.SharedMemory(name=meta["name"])
+    arr = np.ndarray(tuple(meta["shape"]), dtype=np.float64, buffer=shm.buf)
+    _shared.update(shm=shm, arr=arr, offsets=meta["offsets"], starts=meta["starts"])
+
+
+def _score_combo(job: dict) -> dict:
+    params = ScoreParams.from_dict(job["params"])
+    arr, offsets, starts = _shared["arr"], _shared["offsets"], _shared["starts"]
+    rows = {k: i for i, k in enumerate(FEATURES)}
+    r: list[float] = []
+    wins = losses = signals = 0
+    for s, start in enumerate(starts):
+        lo, hi = offsets[s], offsets[s + 1]
+        f = {k: arr[i, lo:hi] for k, i in rows.items()}
+        ev = evaluate_features(f, params)
+        trades = simulate(f["high"], f["low"], f["close"], ev, start=start, max_hold=job["max_hold"], fee_pct=job["fee_pct"])
+        r.extend(t[3] for t in trades)
+        wins += sum(1 for t in trades if t[2] == TARGET)
+        losses += sum(1 for t in trades if t[2] == STOP)
+        signals += int((ev.decision[start:] == BUY).sum())
+    out = summarize([(0, 0, None, x) for x in r], signals, 0)
+    out.update(wins=wins, losses=losses, timeouts=len(r) - wins - losses, hit_rate=round(wins / len(r), 4) if r else None)
+    out.pop("bars")
+    out["params"] = job["params"]
+    return out
+
+
+def sweep(
+    combos: list[dict],
+    symbols: list[str],
+    entry_tf: str = "15m",
+    ts_from: int | None = None,
+    ts_to: int | None = None,
+    max_hold: int = 96,
+    fee_pct: float = 0.08,
+    workers: int | None = None,
+    db_path: str = str(DB_PATH),
+    objective: str = "total_r",
+    min_trades: int = 30,
+) -> dict:
+    t0 = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    feat_jobs = [dict(symbol=s, entry_tf=entry_tf, ts_from=ts_from, ts_to=ts_to, db_path=db_path) for s in symbols]
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(feat_jobs)))) as pool:
+        per_symbol = list(pool.map(_symbol_features, feat_jobs))
+    t_feat = time.perf_counter() - t0
+
+    shared = SharedFeatures(per_symbol)
+    try:
+        jobs = [dict(params=c, max_hold=max_hold, fee_pct=fee_pct) for c in combos]
+        with ProcessPoolExecutor(max_workers=max(1, workers), initializer=_attach, initargs=(shared.meta(),)) as pool:
+            results = list(pool.map(_score_combo, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    finally:
+        shared.close()
+
+    ok = [r for r in results if r["trades"] >= min_trades and r[objective] is not None]
+    ok.sort(key=lambda r: r[objective], reverse=True)
+    for rank, r in enumerate(ok, 1):
+        r["rank"] = rank
+        r["env"] = "SCORE_PARAMS='" + json.dumps(r["params"], separators=(",", ":")) + "'"
+    return {
+        "objective": objective,
+        "symbols": len(shared.symbols),
+        "evaluated": len(results),
+        "ranked": len(ok),
+        "features_s": round(t_feat, 3),
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+        "results": ok,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ScoreParams grid / random search on local candles")
+    ap.add_argument("--grid", nargs="+", required=True, metavar="PARAM=V1,V2", help="values per ScoreParams field")
+    ap.add_argument("--random", type=int, help="sample N combinations instead of the full grid")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--objective", choices=OBJECTIVES, default="total_r")
+    ap.add_argument("--min-trades", type=int, default=30)
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--symbols", nargs="*", help="default: every symbol in the candle store")
+    ap.add_argument("--tf", default="15m", help="entry timeframe")
+    ap.add_argument("--from", dest="ts_from", help="ISO date, trades start here (earlier data = warm-up)")
+    ap.add_argument("--to", dest="ts_to", help="ISO date")
+    ap.add_argument("--max-hold", type=int, default=96)
+    ap.add_argument("--fee", type=float, default=0.08, help="round-trip fee, percent")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--db", default=str(DB_PATH))
+    args = ap.parse_args()
+
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as e:
+        ap.error(str(e))
+    symbols = [s.upper() for s in args.symbols] if args.symbols else list_symbols(args.tf, args.db)
+    report = sweep(
+        combinations(grid, args.random, args.seed),
+        symbols,
+        entry_tf=args.tf,
+        ts_from=_iso_ms(args.ts_from),
+        ts_to=_iso_ms(args.ts_to),
+        max_hold=args.max_hold,
+        fee_pct=args.fee,
+        workers=args.workers,
+        db_path=args.db,
+        objective=args.objective,
+        min_trades=args.min_trades,
+    )
+    report["results"] = report["results"][: args.top]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
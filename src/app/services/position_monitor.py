@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from ..infra.storage.db import insert_position_event, list_positions, update_position_marks
+from .market_service import MarketService, _safe_float
+
+LONG = "LONG"
+SHORT = "SHORT"
+STOP = "STOP"
+TARGET = "TARGET"
+
+
+@dataclass
+class Position:
+    symbol: str
+    side: str
+    entry: float | None
+    stop: float | None
+    target: float | None
+    qty: float | None
+    opened_at: str
+    mark: float | None = None        # long: bid, short: ask (çıkış fiyatı)
+    pnl_pct: float | None = None
+    pnl: float | None = None         # qty varsa quote cinsinden
+    quote_at: float | None = None
+    breached: str | None = None      # ilk tetiklenen seviye (bir kez event)
+
+
+@dataclass
+class BreachEvent:
+    id: int          # position_events.id (DB'ye yazılınca atanır)
+    symbol: str
+    opened_at: str
+    kind: str
+    side: str
+    price: float
+    level: float
+    entry: float | None
+    pnl_pct: float | None
+    ts: str
+    detect_ms: float  # fiyat güncellemesinden tespite geçen süre
+
+
+@dataclass
+class _Source:
+    stream_quotes: int = 0
+    rest_polls: int = 0
+    rest_errors: int = 0
+    last_error: str | None = None
+
+
+class PositionMonitor:
+    """Open positions vs. live quotes, with stop / target breach events.
+
+    Positions sit in a dict keyed by symbol. Every BookStore update (stream
+    bookTicker) is checked synchronously, so with the stream on a breach is
+    seen as soon as the quote arrives. Symbols without a fresh stream quote
+    are polled over REST every `poll_seconds` (one bulk bookTicker, or
+    per-symbol calls when that is cheaper in weight). The DB is re-read every
+    `reload_seconds` so positions opened from other workers show up.
+
+    Events go to the ``position_events`` table and the breach / last mark to
+    the position row, so every API worker serves them and a restart does not
+    fire the same breach again.
+    """
+
+    def __init__(self, market: MarketService, poll_seconds: float = 1.0, reload_seconds: float = 10.0,
+                 max_events: int = 500):
+        self.market = market
+        self.poll_seconds = poll_seconds
+        self.reload_seconds = reload_seconds
+        self.index: Dict[str, Position] = {}
+        self.events: deque = deque(maxlen=max_events)
+        self._new_event = asyncio.Event()
+        self._dirty: set = set()      # DB'ye yazılmamış mark'lar
+        self._writes: set = set()     # bekleyen event insert task'ları
+        self._task: asyncio.Task | None = None
+        self.src = _Source()
+        market.books.subscribe(self.on_book)
+
+    # -------- positions --------
+    async def reload(self):
+        rows = await list_positions()
+        index = {}
+        for r in rows:
+            sym = r["symbol"]
+            old = self.index.get(sym)
+            pos = Position(
+                symbol=sym,
+                side=(r.get("side") or LONG).upper(),
+                entry=r.get("entry_price"),
+                stop=r.get("stop"),
+                target=r.get("target"),
+                qty=r.get("qty"),
+                opened_at=r["opened_at"],
+                # DB'deki breach: restart sonrası aynı seviye tekrar event üretmez
+                breached=r.get("breached"),
+            )
+            if old is not None and (old.opened_at, old.stop, old.target, old.side) == (pos.opened_at, pos.stop, pos.target, pos.side):
+                pos.mark, pos.pnl_pct, pos.pnl, pos.quote_at = old.mark, old.pnl_pct, old.pnl, old.quote_at
+                pos.breached = pos.breached or old.breached
+            index[sym] = pos
+        self.index = index
+        self.market.pin(index)
+
+    # -------- sıcak yol --------
+    def on_book(self, symbol: str, bid: float, ask: float, ts: float):
+        pos = self.index.get(symbol)
+        if pos is None:
+            return
+        self.src.stream_quotes += 1
+        self._check(pos, bid, ask, ts)
+
+    def _check(self, pos: Position, bid: float, ask: float, ts: float):
+        long = pos.side != SHORT
+        mark = bid if long else ask
+        if mark <= 0:
+            return
+        pos.mark = mark
+        pos.quote_at = ts
+        self._dirty.add(pos.symbol)
+        if pos.entry:
+            move = (mark - pos.entry) if long else (pos.entry - mark)
+            pos.pnl_pct = round(move / pos.entry * 100.0, 4)
+            pos.pnl = round(move * pos.qty, 6) if pos.qty else None
+        if pos.breached:
+            return
+        kind = level = None
+        if pos.stop is not None and (mark <= pos.stop if long else mark >= pos.stop):
+            kind, level = STOP, pos.stop
+        elif pos.target is not None and (mark >= pos.target if long else mark <= pos.target):
+            kind, level = TARGET, pos.target
+        if kind is None:
+            return
+        pos.breached = kind
+        ev = BreachEvent(
+            id=0,
+            symbol=pos.symbol,
+            opened_at=pos.opened_at,
+            kind=kind,
+            side=pos.side,
+            price=mark,
+            level=level,
+            entry=pos.entry,
+            pnl_pct=pos.pnl_pct,
+            ts=datetime.now(timezone.utc).isoformat(),
+            detect_ms=round((time.time() - ts) * 1000, 3),
+        )
+        task = asyncio.get_running_loop().create_task(self._save_event(ev))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _save_event(self, ev: BreachEvent):
+        try:
+            ev.id = await insert_position_event(asdict(ev))
+        except Exception:
+            self.src.last_error = traceback.format_exc()
+            return
+        self.events.append(ev)
+        # bekleyen long-poll'ları uyandır
+        self._new_event.set()
+        self._new_event = asyncio.Event()
+
+    async def _flush_marks(self):
+        dirty, self._dirty = self._dirty, set()
+        rows = []
+        for sym in dirty:
+            p = self.index.get(sym)
+            if p is not None:
+                rows.append((p.mark, p.pnl_pct, p.pnl, p.quote_at, p.symbol, p.opened_at))
+        await update_position_marks(rows)
+
+    # -------- REST yedeği --------
+    def _stale(self) -> List[str]:
+        """Symbols without a recent stream quote."""
+        cutoff = time.time() - 2 * self.poll_seconds
+        out = []
+        for s in self.index:
+            bt = self.market.books.get(s)
+            if bt is None or bt.ts < cutoff:
+                out.append(s)
+        return out
+
+    async def _poll(self, symbols: List[str]):
+        client = self.market.client
+        now = time.time()
+        # weight: tekil bookTicker 2, toplu 5
+        if len(symbols) <= 2:
+            rows = zip(symbols, await asyncio.gather(*(client.book_ticker(s) for s in symbols)))
+        else:
+            rows = ((r.get("symbol"), r) for r in await client.book_tickers())
+        self.src.rest_polls += 1
+        for sym, r in rows:
+            pos = self.index.get(sym)
+            if pos is not None:
+                self._check(pos, _safe_float(r.get("bidPrice")), _safe_float(r.get("askPrice")), now)
+
+    async def _run(self):
+        next_reload = 0.0
+        while True:
+            try:
+                if time.monotonic() >= next_reload:
+                    next_reload = time.monotonic() + self.reload_seconds
+                    await self.reload()
+                stale = self._stale()
+                if stale:
+                    await self._poll(stale)
+                await self._flush_marks()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.src.rest_errors += 1
+                self.src.last_error = traceback.format_exc()
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    # -------- API --------
+    async def wait_new_event(self, timeout: float) -> bool:
+        """Wakes the leader's long-polls as soon as an event is stored."""
+        try:
+            await asyncio.wait_for(self._new_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def positions(self) -> List[dict]:
+        return [asdict(p) for p in self.index.values()]
+
+    def stats(self) -> dict:
+        return {
+            "positions": len(self.index),
+            "events": len(self.events),
+            "stream_quotes": self.src.stream_quotes,
+            "rest_polls": self.src.rest_polls,
+            "rest_errors": self.src.rest_errors,
+            "last_error": self.src.last_error,
+        }
+
+
+# main.py kurar (sadece fetcher/lider süreçte)
+monitor: PositionMonitor | None = None
@@ -0,0 +1,95 @@
+"""Run refresh cycles against recorded Binance traffic (no network).
+
+    python -m src.app.services.replay --record data/cycle.rec --cycles 3   # canlıdan kaydet
+    python -m src.app.services.replay --replay data/cycle.rec --cycles 20 --speed 0
+    python -m src.app.services.replay --replay data/cycle.rec --speed 1 --profile out.pstats
+    EVAL_BACKEND=process python -m src.app.services.replay --replay data/cycle.rec --cycles 5
+
+The full ``run_refresh`` pipeline runs unchanged; only BinanceClient's httpx
+transport is swapped (infra/http/replay.py). Snapshot / history writes go
+to ``--db`` (default: a fresh temp file), never to the live data/app.db.
+Prints per-cycle timings with the stage breakdown as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import json
+import tempfile
+from pathlib import Path
+
+from ..infra.http.binance_client import BinanceClient
+from ..infra.http.replay import RecordingTransport, ReplayTransport, ResponseArchive
+from ..infra.scheduler import jobs
+from ..infra.storage import db
+from ..settings import settings
+from .eval_backend import make_backend
+from .market_service import MarketService
+
+
+async def run_cycles(transport, cycles: int, interval_s: float = 0.0, db_path: str | Path | None = None) -> list[dict]:
+    if db_path is not None:
+        db.DB_PATH = Path(db_path)
+    await db.init_db()
+    client = BinanceClient(
+        settings.binance_base_url,
+        max_concurrency=settings.max_concurrency,
+        weight_limit_1m=settings.weight_limit_1m,
+        transport=transport,
+    )
+    wl = [s.strip().upper() for s in settings.symbol_whitelist_csv.split(",") if s.strip()]
+    market = MarketService(client, top_n=settings.top_n, whitelist=wl, min_quote_volume_24h=settings.min_quote_volume_24h)
+    if settings.eval_backend != "inline":
+        market.backend = make_backend(settings.eval_backend, market, settings.eval_workers)
+        await market.backend.start()
+    runs = []
+    try:
+        for i in range(cycles):
+            if i and interval_s:
+                await asyncio.sleep(interval_s)
+            await jobs.run_refresh(market)
+            runs.append({**jobs.store.runs[-1], "signals": len(jobs.store.signals), "error": jobs.store.last_error,
+                         "eval": jobs.store.eval_backend})
+    finally:
+        if market.backend:
+            await market.backend.close()
+        await client.close()
+    return runs
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Record or replay refresh cycles")
+    mode = ap.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--record", metavar="ARCHIVE", help="live run, archive every upstream response")
+    mode.add_argument("--replay", metavar="ARCHIVE", help="serve upstream responses from the archive")
+    ap.add_argument("--cycles", type=int, default=1)
+    ap.add_argument("--interval", type=float, default=0.0, help="seconds between cycles")
+    ap.add_argument("--speed", type=float, default=0.0, help="replay: 1 = recorded latency, 0 = none, N = N x faster")
+    ap.add_argument("--profile", metavar="PSTATS", help="cProfile the cycles into this file")
+    ap.add_argument("--db", metavar="SQLITE", help="SQLite file for snapshots/history (default: temp file)")
+    args = ap.parse_args()
+
+    db_path = Path(args.db) if args.db else Path(tempfile.mkdtemp(prefix="replay-")) / "app.db"
+    archive = ResponseArchive(args.record or args.replay, readonly=bool(args.replay))
+    transport = RecordingTransport(archive) if args.record else ReplayTransport(archive, speed=args.speed)
+
+    prof = cProfile.Profile() if args.profile else None
+    if prof:
+        prof.enable()
+    runs = asyncio.run(run_cycles(transport, args.cycles, args.interval, db_path))
+    if prof:
+        prof.disable()
+        prof.dump_stats(args.profile)
+
+    report = {"db": str(db_path), "runs": runs}
+    if isinstance(transport, ReplayTransport):
+        report["replay"] = transport.stats()
+        if transport.misses:
+            report["warning"] = f"{transport.misses} requests not in the archive (served 404)"
+    report["archive"] = ResponseArchive(archive.path, readonly=True).stats()
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
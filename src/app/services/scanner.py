@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .market_service import MarketService, _safe_float
+
+
+@dataclass
+class Candidate:
+    symbol: str
+    quote_volume: float
+    range_pct: float     # (high - low) / last, %
+    change_pct: float    # 24h değişim, %
+    rank: float = 0.0    # 0..1, ön filtre skoru
+
+
+def _percentile_ranks(values: List[float]) -> List[float]:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    out = [0.0] * len(values)
+    for r, i in enumerate(order):
+        out[i] = r / max(1, len(values) - 1)
+    return out
+
+
+class UniverseScanner:
+    """Two-stage scan over every tradable USDT perpetual.
+
+    Stage 1 ranks the whole universe from the single bulk ``ticker_24h`` call
+    (volume, 24h range, |change|) and keeps the best `candidates`. Stage 2 runs
+    the full multi-timeframe evaluation on at most `deep_per_cycle` of them per
+    cycle, within an estimated kline `weight_budget`; never-evaluated and
+    least recently evaluated symbols go first, so the candidates are sharded
+    across cycles and each cycle costs about the same as a fixed TOP_N run.
+    """
+
+    def __init__(
+        self,
+        market: MarketService,
+        candidates: int = 60,
+        deep_per_cycle: int = 15,
+        weight_budget: int = 80,
+        min_quote_volume_24h: float = 0.0,
+    ):
+        self.market = market
+        self.max_candidates = candidates
+        self.deep_per_cycle = deep_per_cycle
+        self.weight_budget = weight_budget
+        self.min_quote_volume_24h = min_quote_volume_24h
+        self.candidates: List[Candidate] = []
+        self._deep_at: Dict[str, float] = {}  # symbol -> son derin analiz zamanı
+        self.cycles = 0
+        self.last_cycle: dict = {}
+
+    async def prefilter(self) -> List[Candidate]:
+        cands = []
+        for t in await self.market.tickers():
+            qv = _safe_float(t.get("quoteVolume"))
+            last = _safe_float(t.get("lastPrice"))
+            if qv < self.min_quote_volume_24h or last <= 0:
+                continue
+            rng = (_safe_float(t.get("highPrice")) - _safe_float(t.get("lowPrice"))) / last * 100.0
+            cands.append(Candidate(t["symbol"], qv, rng, _safe_float(t.get("priceChangePercent"))))
+        if not cands:
+            return []
+
+        # hacim ağırlıklı; oynaklık ve hareket adayı öne çeker
+        vol = _percentile_ranks([math.log10(c.quote_volume + 1) for c in cands])
+        rng = _percentile_ranks([c.range_pct for c in cands])
+        chg = _percentile_ranks([abs(c.change_pct) for c in cands])
+        for c, v, r, m in zip(cands, vol, rng, chg):
+            c.rank = 0.5 * v + 0.3 * r + 0.2 * m
+        cands.sort(key=lambda c: c.rank, reverse=True)
+        return cands[: self.max_candidates]
+
+    def _cost(self, symbol: str) -> int:
+        m = self.market
+        return sum(m.candles.fetch_weight(symbol, iv, n) for iv, n in m.windows.items())
+
+    def plan(self, candidates: List[Candidate]) -> List[str]:
+        """Pick this cycle's deep-analysis shard under the count / weight budget."""
+        # hiç bakılmamışlar önce (ön filtre sırasıyla), sonra en eskiler
+        queue = sorted(
+            enumerate(candidates),
+            key=lambda ic: (ic[1].symbol in self._deep_at, self._deep_at.get(ic[1].symbol, 0.0), ic[0]),
+        )
+        batch: List[str] = []
+        spent = 0
+        for _, c in queue:
+            if len(batch) >= self.deep_per_cycle:
+                break
+            cost = self._cost(c.symbol)
+            if batch and spent + cost > self.weight_budget:
+                continue
+            batch.append(c.symbol)
+            spent += cost
+        self.last_cycle = {"candidates": len(candidates), "deep": len(batch), "est_weight": spent}
+        return batch
+
+    async def next_batch(self) -> Tuple[List[str], List[str]]:
+        """(candidate universe in rank order, symbols to evaluate this cycle)"""
+        self.candidates = await self.prefilter()
+        batch = self.plan(self.candidates)
+        now = time.time()
+        for sym in batch:
+            self._deep_at[sym] = now
+        # adaylıktan düşenler unutulur (geri gelirse yeni sayılır)
+        live = {c.symbol for c in self.candidates}
+        for sym in [s for s in self._deep_at if s not in live]:
+            del self._deep_at[sym]
+        self.cycles += 1
+        return [c.symbol for c in self.candidates], batch
+
+    def stats(self) -> dict:
+        return {"cycles": self.cycles, **self.last_cycle}
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Dict, List, Set
+
+from ..domain.models import Signal
+from ..settings import settings
+
+
+def _dump(s: Signal) -> dict:
+    return s.model_dump(mode="json")
+
+
+def _event(kind: str, version: int, **data) -> str:
+    return json.dumps({"type": kind, "version": version, **data}, ensure_ascii=False, separators=(",", ":"))
+
+
+class Subscriber:
+    """One connected client: bounded queue of pre-serialized messages."""
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self.resyncs = 0
+
+
+class SignalFeed:
+    """Fans out signal snapshots/deltas to SSE and WebSocket clients.
+
+    Deltas carry only symbols whose decision or plan changed, or whose score
+    moved at least `score_delta` since the last value sent. A subscriber whose
+    queue is full is not blocked on: its backlog is dropped and replaced by a
+    single full snapshot (resync), so a slow client skips intermediate states
+    but never ends up with a wrong view.
+    """
+
+    def __init__(self, score_delta: int = 3, queue_size: int = 100):
+        self.score_delta = score_delta
+        self.queue_size = queue_size
+        self._subs: Set[Subscriber] = set()
+        self._sent: Dict[str, dict] = {}  # symbol -> son gönderilen hali
+        self._signals: List[Signal] = []
+        self.version = 0
+        self.messages = 0
+        self.resyncs = 0
+
+    def snapshot_message(self) -> str:
+        return _event("snapshot", self.version, signals=[_dump(s) for s in self._signals])
+
+    def subscribe(self) -> Subscriber:
+        sub = Subscriber(self.queue_size)
+        sub.queue.put_nowait(self.snapshot_message())
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self._subs.discard(sub)
+
+    def _changed(self, prev: dict | None, cur: dict) -> bool:
+        if prev is None:
+            return True
+        return (
+            prev["decision"] != cur["decision"]
+            or prev["plan"] != cur["plan"]
+            or abs(prev["score"] - cur["score"]) >= self.score_delta
+        )
+
+    def on_publish(self, store, changed: List[Signal] | None = None):
+        """SignalStore listener; `changed` None => full snapshot."""
+        self._signals = list(store.signals)
+        self.version = store.version
+        candidates = self._signals if changed is None else changed
+
+        updates = []
+        for s in candidates:
+            cur = _dump(s)
+            if self._changed(self._sent.get(s.symbol), cur):
+                self._sent[s.symbol] = cur
+                updates.append(cur)
+
+        # universe'den çıkan semboller (scanner modunda kısmi publish'te de olur)
+        live = {s.symbol for s in self._signals}
+        removed = [sym for sym in self._sent if sym not in live]
+        for sym in removed:
+            del self._sent[sym]
+
+        if updates or removed:
+            self._broadcast(_event("delta", self.version, signals=updates, removed=removed))
+
+    def _broadcast(self, msg: str):
+        self.messages += 1
+        snapshot = None
+        for sub in self._subs:
+            try:
+                sub.queue.put_nowait(msg)
+            except asyncio.QueueFull:
+                # yavaş tüketici: birikmiş delta'lar atılır, tek snapshot ile yeniden senkron
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                if snapshot is None:
+                    snapshot = self.snapshot_message()
+                sub.queue.put_nowait(snapshot)
+                sub.resyncs += 1
+                self.resyncs += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subs),
+            "version": self.version,
+            "messages": self.messages,
+            "resyncs": self.resyncs,
+        }
+
+
+feed = SignalFeed(score_delta=settings.feed_score_delta, queue_size=settings.feed_queue_size)
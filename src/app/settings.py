@@ -5,21 +5,97 @@ class Settings(BaseModel):
     # Binance Futures base
     binance_base_url: str = os.getenv("BINANCE_BASE_URL", "https://fapi.binance.com")
 
+    # Binance Futures WebSocket (market data stream)
+    binance_ws_url: str = os.getenv("BINANCE_WS_URL", "wss://fstream.binance.com")
+    # REST trafiğini arşive kaydet / arşivden oynat (infra/http/replay.py); ikisi birden verilmez
+    binance_record_path: str = os.getenv("BINANCE_RECORD", "")
+    binance_replay_path: str = os.getenv("BINANCE_REPLAY", "")
+    # replay hızı: 1 = kayıttaki gecikmeler, 0 = beklemeden, N = N kat hızlı
+    replay_speed: float = float(os.getenv("REPLAY_SPEED", "0"))
+    # replay'in SQLite dosyası (boş = geçici dosya); canlı DB (data/app.db) reddedilir
+    replay_db_path: str = os.getenv("REPLAY_DB", "")
+    stream_enabled: bool = os.getenv("STREAM_ENABLED", "0") == "1"
+
     # Top N
     top_n: int = int(os.getenv("TOP_N", "15"))
 
     # Scheduler (seconds)
     refresh_seconds: int = int(os.getenv("REFRESH_SECONDS", "60"))
+    # tick'lerin hepsi aynı saniyeye denk gelmesin
+    refresh_jitter_seconds: int = int(os.getenv("REFRESH_JITTER", "2"))
+    # bir refresh run'ı en fazla bu kadar sürebilir (0 => refresh_seconds)
+    refresh_deadline_seconds: float = float(os.getenv("REFRESH_DEADLINE", "0"))
+
+    # Değerlendirme modu: "interval" (her REFRESH_SECONDS'ta tüm semboller)
+    # veya "event" (mum kapanışı / fiyat-spread hareketinde tek sembol)
+    eval_mode: str = os.getenv("EVAL_MODE", "interval")
+    # event modunda universe (top N) yenileme aralığı
+    universe_refresh_seconds: int = int(os.getenv("UNIVERSE_REFRESH_SECONDS", "900"))
+    eval_stagger_seconds: float = float(os.getenv("EVAL_STAGGER_SECONDS", "20"))
+    eval_price_move_pct: float = float(os.getenv("EVAL_PRICE_MOVE_PCT", "0.5"))
+    eval_poll_seconds: float = float(os.getenv("EVAL_POLL_SECONDS", "5"))
 
     # Concurrency for HTTP calls
     max_concurrency: int = int(os.getenv("MAX_CONCURRENCY", "6"))
 
+    # Binance IP request weight limiti (dakikalık)
+    weight_limit_1m: int = int(os.getenv("BINANCE_WEIGHT_LIMIT", "2400"))
+
         # Eğer boş değilse sadece bu semboller kullanılacak (MVP için önerilen büyükler)
     symbol_whitelist_csv: str = os.getenv(
         "SYMBOL_WHITELIST",
         "BTCUSDT,ETHUSDT,SOLUSDT,XRPUSDT,BNBUSDT,DOGEUSDT,ADAUSDT,AVAXUSDT,LINKUSDT,TONUSDT,TRXUSDT,DOTUSDT,ATOMUSDT,NEARUSDT,LTCUSDT"
     )
 
+    # Signal history (SQLite) retention
+    history_retention_days: int = int(os.getenv("HISTORY_RETENTION_DAYS", "30"))
+    # bu süreden eski satırlar sembol başına saatlik tek satıra indirgenir
+    history_downsample_hours: int = int(os.getenv("HISTORY_DOWNSAMPLE_HOURS", "48"))
+    history_compact_seconds: int = int(os.getenv("HISTORY_COMPACT_SECONDS", "3600"))
+    # hydrate için tutulan son snapshot blob sayısı
+    snapshot_keep: int = int(os.getenv("SNAPSHOT_KEEP", "100"))
+
+    # Kapalı mumların SQLite cache'i (restart sonrası warm start)
+    candle_cache_enabled: bool = os.getenv("CANDLE_CACHE", "1") == "1"
+    candle_flush_seconds: int = int(os.getenv("CANDLE_FLUSH_SECONDS", "300"))
+    candle_retention_days: int = int(os.getenv("CANDLE_RETENTION_DAYS", "400"))
+
+    # SSE/WebSocket delta feed
+    feed_score_delta: int = int(os.getenv("FEED_SCORE_DELTA", "3"))
+    feed_queue_size: int = int(os.getenv("FEED_QUEUE_SIZE", "100"))
+
+    # İki aşamalı tam-universe tarama (SCAN_MODE=1 iken whitelist / TOP_N kullanılmaz)
+    scan_enabled: bool = os.getenv("SCAN_MODE", "0") == "1"
+    scan_candidates: int = int(os.getenv("SCAN_CANDIDATES", "60"))
+    # cycle başına derin analiz bütçesi (sembol sayısı / tahmini kline weight)
+    scan_deep_per_cycle: int = int(os.getenv("SCAN_DEEP_PER_CYCLE", "15"))
+    scan_weight_budget: int = int(os.getenv("SCAN_WEIGHT_BUDGET", "80"))
+
+    # ScoreParams override (JSON, kısmi olabilir), örn. '{"buy_score": 72, "stop_atr": 1.5}'
+    # optimizer çıktısındaki "env" alanı buraya yapıştırılır
+    score_params_json: str = os.getenv("SCORE_PARAMS", "")
+    # Yan yana çalışan stratejiler (domain/strategy.py); ilki Signal'in ana alanlarını belirler,
+    # veri ihtiyaçları birleştirilip sembol başına tek seferde çekilir. Örn. "trend,rsi_reversion"
+    strategies_csv: str = os.getenv("STRATEGIES", "trend")
+    # İndikatör + strateji hesabının çalıştığı yer: inline | thread | process
+    # (process: sembol başına sabit worker, mumlar shared memory ile); 0 => cpu sayısı
+    eval_backend: str = os.getenv("EVAL_BACKEND", "inline")
+    eval_workers: int = int(os.getenv("EVAL_WORKERS", "0"))
+
+    # Çok worker'lı deploy (uvicorn --workers N): file-lock ile tek fetcher, diğerleri
+    # lider'in paylaşımlı snapshot'ını okur
+    shared_snapshot: bool = os.getenv("SHARED_SNAPSHOT", "0") == "1"
+    shared_dir: str = os.getenv("SHARED_DIR", "data/shared")
+    snapshot_poll_seconds: float = float(os.getenv("SNAPSHOT_POLL_SECONDS", "0.5"))
+    leader_retry_seconds: float = float(os.getenv("LEADER_RETRY_SECONDS", "5"))
+
+    # Açık pozisyon izleme (stop/target breach); stream yoksa REST bookTicker aralığı
+    position_monitor_enabled: bool = os.getenv("POSITION_MONITOR", "1") == "1"
+    position_poll_seconds: float = float(os.getenv("POSITION_POLL_SECONDS", "1.0"))
+
+    # /admin/* için X-Admin-Token (boşsa /admin/* kapalı, 403)
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
+
     min_quote_volume_24h: float = float(os.getenv("MIN_QUOTE_VOL_24H", "50000000"))  # 50M USDT
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Backtest features vs. what live evaluation (`evaluate_input`) computes on the same bar."""
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.app.domain.backtest import Series, evaluate, features, live_windows
+from src.app.domain.batch import BUY, SELL
+from src.app.domain.candles import Candles
+from src.app.infra.storage.candles import INTERVAL_MS
+from src.app.services.market_service import EvalInput, MarketService
+
+E, H, D = INTERVAL_MS["15m"], INTERVAL_MS["1h"], INTERVAL_MS["1d"]
+T0 = 1_700_000_000_000 // D * D
+
+
+def _series(start_ms, step, n, seed, vol=0.01):
+    rnd = random.Random(seed)
+    x, close = 100.0, []
+    for _ in range(n):
+        x *= 1 + rnd.gauss(0.0003, vol)
+        close.append(x)
+    close = np.array(close)
+    return Series(
+        open_time=np.arange(start_ms, start_ms + n * step, step, dtype=np.int64),
+        high=close * 1.004,
+        low=close * 0.996,
+        close=close,
+    )
+
+
+def _window(s: Series, j: int, n: int, price: float | None = None) -> Candles:
+    """Last `n` candles ending at index j; j is the open candle (close = price)."""
+    lo = max(0, j - n + 1)
+    close = s.close[lo:j + 1].tolist()
+    if price is not None:
+        close[-1] = price
+    return Candles(open_time=s.open_time[lo:j + 1].tolist(), high=s.high[lo:j + 1].tolist(),
+                   low=s.low[lo:j + 1].tolist(), close=close)
+
+
+@pytest.mark.parametrize("daily_days", [300, 208, 199])  # tam pencere / kısa geçmiş / seed açık mumu içerir
+def test_features_match_live_evaluation(daily_days):
+    w_e, w_h, w_d = live_windows("15m")
+    entry = _series(T0, E, 4 * 24 * 6, seed=1, vol=0.004)
+    hourly = _series(T0 - 100 * H, H, 100 + 24 * 6, seed=2, vol=0.006)
+    daily = _series(T0 - daily_days * D, D, daily_days + 6, seed=3, vol=0.03)
+    f = features(entry, hourly, daily, H, D)
+    ev = evaluate(entry, hourly, daily, H, D)
+
+    checked = 0
+    for i in range(w_e, len(entry.close), 37):
+        price = float(entry.close[i])
+        ot = int(entry.open_time[i])
+        jh = int(np.searchsorted(hourly.open_time, ot, side="right")) - 1
+        jd = int(np.searchsorted(daily.open_time, ot, side="right")) - 1
+        inp = EvalInput("TESTUSDT", datetime.utcnow(), {
+            "1d": _window(daily, jd, w_d, price),
+            "1h": _window(hourly, jh, w_h, price),
+            "15m": _window(entry, i, w_e),
+        })
+        market = MarketService(client=None)
+        sig, _ = market.compute(inp)
+        windows = {"15m": w_e, "1h": w_h, "1d": w_d}
+        v = {iv: market._track("TESTUSDT", iv, windows[iv]).values(c) for iv, c in inp.candles.items()}
+
+        assert f["valid"][i]
+        assert f["daily_ok"][i] == ((price > v["1d"]["ema50"]) and (v["1d"]["ema50"] > v["1d"]["ema200"]))
+        assert f["h_ok"][i] == (price > v["1h"]["ema50"])
+        assert f["ema_up"][i] == (v["15m"]["ema20"] > v["15m"]["ema50"])
+        assert f["rsi"][i] == pytest.approx(v["15m"]["rsi14"], rel=1e-9)
+        assert f["atr"][i] == pytest.approx(v["15m"]["atr14"], rel=1e-9)
+
+        code = {"AL": BUY, "SELL": SELL}.get(sig.decision.value, 0)
+        assert (ev.score[i], ev.decision[i]) == (sig.score, code)
+        assert ev.stop[i] == pytest.approx(sig.plan.stop, rel=1e-9)
+        checked += 1
+    assert checked >= 10
+
+
+def test_windowed_ema_differs_from_full_history():
+    """The reason for the rolling windows: full-history EMA200 drifts away from what live sees."""
+    from src.app.domain.backtest import _ema_1d
+    from src.app.domain.indicators import ema
+
+    x = _series(T0, D, 600, seed=4, vol=0.03).close
+    windowed = _ema_1d(x, 200, 220)
+    assert windowed[-1] == pytest.approx(ema(x[-220:].tolist(), 200), rel=1e-10)
+    assert abs(windowed[-1] / ema(x.tolist(), 200) - 1) > 1e-3
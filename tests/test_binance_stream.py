@@ -0,0 +1,145 @@
+"""BinanceStream against a local stand-in server replaying recorded combined-stream frames."""
+import asyncio
+import json
+import time
+
+import pytest
+import websockets
+
+from src.app.domain.candles import Candles
+from src.app.infra.http import binance_stream
+from src.app.infra.http.binance_stream import BinanceStream
+from src.app.infra.storage.books import BookStore
+from src.app.infra.storage.candles import INTERVAL_MS, CandleStore
+
+STEP = INTERVAL_MS["1m"]
+NOW = int(time.time() * 1000) // STEP * STEP  # açık mumun open_time'ı
+
+
+def _kline(sym, ot, close, closed=False):
+    k = {"t": ot, "T": ot + STEP - 1, "s": sym, "i": "1m", "o": "100.0", "h": "101.0", "l": "99.0",
+         "c": str(close), "v": "12.5", "q": "1250.0", "x": closed}
+    return json.dumps({"stream": f"{sym.lower()}@kline_1m", "data": {"e": "kline", "E": ot, "s": sym, "k": k}})
+
+
+def _book(sym, bid, ask):
+    return json.dumps({"stream": f"{sym.lower()}@bookTicker",
+                       "data": {"e": "bookTicker", "s": sym, "b": str(bid), "a": str(ask)}})
+
+
+# fstream'den kaydedilmiş akışın kısaltılmışı (zamanlar test anına kaydırıldı)
+SESSION_1 = [
+    _book("BTCUSDT", 64000.1, 64000.2),
+    _kline("BTCUSDT", NOW, 100.5),
+    _kline("ETHUSDT", NOW, 100.7),
+]
+SESSION_2 = [
+    _kline("BTCUSDT", NOW, 100.9),
+    _book("ETHUSDT", 3100.0, 3100.5),
+]
+
+
+class RestStub:
+    """REST side of the resync: records kline calls, serves a flat window ending at the open candle."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def klines(self, symbol, interval, limit=200, start_time=None):
+        self.calls.append((symbol, interval, start_time))
+        first = start_time if start_time is not None else NOW - (limit - 1) * STEP
+        rows = [[t, "100.0", "101.0", "99.0", "100.0", "10", t + STEP - 1, "1000", 1, "0", "0", "0"]
+                for t in range(first, NOW + 1, STEP)][:limit]
+        return Candles.from_json(json.dumps(rows).encode())
+
+
+@pytest.fixture
+def no_backoff_jitter(monkeypatch):
+    # reconnect beklemesi 1 sn'ye sabitlenir
+    monkeypatch.setattr(binance_stream.random, "random", lambda: 0.0)
+
+
+async def _wait(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        await asyncio.sleep(0.02)
+
+
+async def _serve(sessions):
+    """Replay one recorded session per connection; every session but the last ends in a disconnect."""
+    paths = []
+
+    async def handler(ws):
+        i = len(paths)
+        paths.append(ws.request.path)
+        for frame in sessions[min(i, len(sessions) - 1)]:
+            await ws.send(frame)
+        if i < len(sessions) - 1:
+            await ws.close()  # zorla kopma
+        else:
+            await ws.wait_closed()
+
+    server = await websockets.serve(handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"ws://127.0.0.1:{port}", paths
+
+
+async def _setup(url):
+    rest = RestStub()
+    candles = CandleStore(rest)
+    for sym in ("BTCUSDT", "ETHUSDT"):
+        await candles.get(sym, "1m", 30)
+    rest.calls.clear()
+    books = BookStore()
+    stream = BinanceStream(url, candles, books, ["1m"])
+    return rest, candles, books, stream
+
+
+def test_replays_frames_and_resyncs_over_rest_after_disconnect(no_backoff_jitter):
+    async def main():
+        server, url, paths = await _serve([SESSION_1, SESSION_2])
+        rest, candles, books, stream = await _setup(url)
+        try:
+            stream.set_symbols(["ETHUSDT", "BTCUSDT"])
+            await _wait(lambda: stream.reconnects == 1 and books.get("ETHUSDT") is not None)
+            await _wait(lambda: candles.series("BTCUSDT", "1m").candles.close[-1] == 100.9)
+        finally:
+            await stream.close()
+            server.close()
+            await server.wait_closed()
+
+        assert len(paths) == 2
+        assert paths[0] == "/stream?streams=btcusdt@kline_1m/btcusdt@bookTicker/ethusdt@kline_1m/ethusdt@bookTicker"
+        # kopma sonrası her kline serisi REST'ten tamamlanır (delta: startTime = son mum)
+        assert sorted(rest.calls) == [("BTCUSDT", "1m", NOW), ("ETHUSDT", "1m", NOW)]
+        assert candles.series("ETHUSDT", "1m").candles.close[-1] == 100.0  # resync, akıştaki revizyonu ezer
+        assert len(candles.series("BTCUSDT", "1m").candles) == 30
+        bt = books.get("BTCUSDT")
+        assert (bt.bid, bt.ask) == (64000.1, 64000.2)
+        assert stream.connected == 0
+
+    asyncio.run(main())
+
+
+def test_kline_gap_triggers_rest_refresh(no_backoff_jitter):
+    gap = [_kline("BTCUSDT", NOW + 3 * STEP, 105.0)]
+
+    async def main():
+        server, url, _ = await _serve([gap])
+        rest, candles, _, stream = await _setup(url)
+        try:
+            stream.set_symbols(["BTCUSDT"])
+            await _wait(lambda: rest.calls)
+        finally:
+            await stream.close()
+            server.close()
+            await server.wait_closed()
+
+        assert rest.calls == [("BTCUSDT", "1m", NOW)]
+        # boşluklu mum uygulanmaz
+        assert candles.series("BTCUSDT", "1m").last_open_time == NOW
+        assert stream.reconnects == 0
+
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""Process backend: indicator state handoff between the workers and the main process."""
+import asyncio
+import random
+from array import array
+from datetime import datetime
+
+from src.app.domain.candles import Candles
+from src.app.infra.storage.candles import INTERVAL_MS
+from src.app.services.eval_backend import ProcessBackend
+from src.app.services.market_service import EvalInput, MarketService
+
+SYMBOLS = ("BTCUSDT", "ETHUSDT", "SOLUSDT")
+
+
+def _candles(symbol, interval, n, shift=0):
+    rnd = random.Random(f"{symbol}{interval}")
+    step = INTERVAL_MS[interval]
+    x, rows = 100.0, []
+    for i in range(n + shift):
+        x *= 1 + rnd.gauss(0, 0.01)
+        rows.append((i * step, x, x * 1.005, x * 0.995, x))
+    rows = rows[shift:]
+    return Candles(
+        open_time=array("q", (r[0] for r in rows)),
+        high=array("d", (r[2] for r in rows)),
+        low=array("d", (r[3] for r in rows)),
+        close=array("d", (r[4] for r in rows)),
+    )
+
+
+def _inputs(market, shift=0):
+    now = datetime.utcnow()
+    return [EvalInput(s, now, {iv: _candles(s, iv, n, shift) for iv, n in market.windows.items()}, 0.02)
+            for s in SYMBOLS]
+
+
+def test_worker_state_round_trips_through_the_main_process():
+    async def main():
+        market = MarketService(client=None)
+        backend = ProcessBackend(market, workers=2)
+        await backend.start()
+        try:
+            first = await backend.run(_inputs(market))
+            await backend.collect_state()
+        finally:
+            await backend.close()
+
+        state = market.export_indicator_state()
+        assert sorted(state) == sorted(f"{s}|{iv}|{w}" for s in SYMBOLS for iv, w in market.tracker_specs)
+        assert all(d["last_ot"] is not None for d in state.values())
+
+        # warm start: yeni worker'lar bu state'le açılır ve geri verir
+        warm = ProcessBackend(market, workers=2)
+        market._indicators.clear()
+        market.load_indicator_state(state)
+        await warm.start()
+        market._indicators.clear()  # geri gelen state sadece worker'lardan
+        try:
+            await warm.collect_state()
+            assert market.export_indicator_state() == state
+            nxt = _inputs(market, shift=1)
+            got = await warm.run(nxt)
+        finally:
+            await warm.close()
+
+        # aynı pencereyle sıfırdan (inline) hesaplananla aynı sinyal
+        cold = MarketService(client=None)
+        want = [cold.compute(inp)[0] for inp in nxt]
+        for (sig, _), ref in zip(got, want):
+            assert sig.model_dump(exclude={"updated_at"}) == ref.model_dump(exclude={"updated_at"})
+        assert all(not isinstance(r, Exception) for r, _ in first)
+
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""Event evaluator: only signals still in the universe are published and persisted."""
+import asyncio
+from datetime import datetime
+
+from src.app.domain.models import Signal
+from src.app.infra.scheduler import events
+from src.app.infra.scheduler.events import EventEvaluator
+from src.app.infra.scheduler.jobs import store
+from src.app.services.market_service import MarketService
+
+
+def _sig(symbol, score):
+    return Signal(symbol=symbol, decision="BEKLE", score=score, daily_trend_ok=False, updated_at=datetime.utcnow())
+
+
+def test_symbol_dropped_mid_tick_is_not_persisted(monkeypatch):
+    monkeypatch.setattr(store, "signals", [_sig("BTCUSDT", 50)])
+    persisted = []
+
+    async def evaluate_symbols(market, symbols, snapshot):
+        # ETHUSDT değerlendirilirken universe'den düştü
+        return [_sig("BTCUSDT", 60), _sig("ETHUSDT", 70)]
+
+    async def persist_snapshot(changed=None):
+        persisted.append(changed)
+
+    async def prefetch(symbols):
+        return None
+
+    monkeypatch.setattr(events, "evaluate_symbols", evaluate_symbols)
+    monkeypatch.setattr(events, "persist_snapshot", persist_snapshot)
+    ev = EventEvaluator(MarketService(client=None))
+    monkeypatch.setattr(ev.market, "prefetch", prefetch)
+
+    asyncio.run(ev._evaluate([], ["BTCUSDT", "ETHUSDT"], 0.0))
+    assert [s.symbol for s in store.signals] == ["BTCUSDT"] and store.signals[0].score == 60
+    assert [[s.symbol for s in changed] for changed in persisted] == [["BTCUSDT"]]
+
+    # hepsi düştüyse yazılacak bir şey yok
+    store.signals = []
+    asyncio.run(ev._evaluate([], ["BTCUSDT", "ETHUSDT"], 0.0))
+    assert len(persisted) == 1
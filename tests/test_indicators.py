@@ -0,0 +1,154 @@
+"""Parity: incremental indicators vs. the reference functions in domain/indicators.py."""
+import json
+import random
+
+import pytest
+
+from src.app.domain.candles import Candles
+from src.app.domain.indicators import (
+    ATR, EMA, RSI, SMA, NotEnoughData, WindowedEMA, WindowedRSI, atr, ema, indicator_from_dict, rsi,
+)
+from src.app.services.market_service import _SeriesIndicators
+
+
+def _walk(n, seed=1, start=100.0):
+    rnd = random.Random(seed)
+    out, x = [], start
+    for _ in range(n):
+        x *= 1 + rnd.gauss(0, 0.01)
+        out.append(x)
+    return out
+
+
+def _bars(n, seed=2):
+    rnd = random.Random(seed)
+    closes = _walk(n, seed)
+    highs = [c * (1 + rnd.random() * 0.01) for c in closes]
+    lows = [c * (1 - rnd.random() * 0.01) for c in closes]
+    return highs, lows, closes
+
+
+def test_ema_full_history_matches_reference():
+    xs = _walk(300)
+    e = EMA(50)
+    for i, x in enumerate(xs):
+        if i + 1 >= 50:
+            assert e.peek(x) == pytest.approx(ema(xs[: i + 1], 50), rel=1e-12)
+        e.update(x)
+
+
+def test_rsi_full_history_matches_reference():
+    xs = _walk(300, seed=3)
+    r = RSI(14)
+    for i, x in enumerate(xs):
+        if i >= 14:
+            assert r.peek(x) == pytest.approx(rsi(xs[: i + 1], 14), rel=1e-9)
+        r.update(x)
+
+
+def test_atr_and_sma_match_reference():
+    hs, ls, cs = _bars(200)
+    a = ATR(14)
+    s = SMA(10)
+    for i in range(len(cs)):
+        if i >= 14:
+            assert a.peek(hs[i], ls[i], cs[i]) == pytest.approx(atr(hs[: i + 1], ls[: i + 1], cs[: i + 1], 14))
+        if i >= 9:
+            assert s.peek(cs[i]) == pytest.approx(sum(cs[i - 9:i + 1]) / 10)
+        a.update(hs[i], ls[i], cs[i])
+        s.update(cs[i])
+
+
+@pytest.mark.parametrize("period,window", [(200, 220), (50, 120), (20, 160), (50, 50)])
+def test_windowed_ema_matches_rolling_reference(period, window):
+    xs = _walk(window + 400, seed=period)
+    e = WindowedEMA(period, window)
+    for i, x in enumerate(xs):
+        if i + 1 >= period:
+            ref = ema(xs[max(0, i + 1 - window): i + 1], period)
+            assert e.peek(x) == pytest.approx(ref, rel=1e-10)
+        else:
+            with pytest.raises(NotEnoughData):
+                e.peek(x)
+        e.update(x)
+
+
+def test_windowed_rsi_matches_rolling_reference():
+    xs = _walk(600, seed=9)
+    r = WindowedRSI(14, 160)
+    for i, x in enumerate(xs):
+        if i >= 14:
+            assert r.peek(x) == pytest.approx(rsi(xs[max(0, i + 1 - 160): i + 1], 14), rel=1e-9)
+        r.update(x)
+
+
+def test_peek_does_not_touch_state():
+    xs = _walk(260)
+    e = WindowedEMA(200, 220)
+    for x in xs[:-1]:
+        e.update(x)
+    before = e.to_dict()
+    for revised in (xs[-1], xs[-1] * 1.05, xs[-1] * 0.9):
+        e.peek(revised)
+    assert e.to_dict() == before
+
+
+@pytest.mark.parametrize("ind", [EMA(20), RSI(14), WindowedEMA(50, 120), WindowedRSI(14, 160), SMA(5)])
+def test_serialization_round_trip(ind):
+    xs = _walk(300, seed=4)
+    for x in xs:
+        ind.update(x)
+    clone = indicator_from_dict(ind.to_dict())
+    for x in _walk(50, seed=5, start=xs[-1]):
+        assert clone.peek(x) == pytest.approx(ind.peek(x), rel=1e-12)
+        clone.update(x)
+        ind.update(x)
+
+
+def test_series_indicators_match_reference_on_rolling_window():
+    """What MarketService sees: last `window` candles (last one still open) per refresh."""
+    window = 220
+    hs, ls, cs = _bars(window + 150, seed=6)
+    ot = [i * 86_400_000 for i in range(len(cs))]
+    t = _SeriesIndicators("1d", [("ema", 50), ("ema", 200), ("rsi", 14), ("atr", 14)], window)
+    for end in range(window, len(cs) + 1):
+        lo = end - window
+        # açık mum her refresh'te revize edilir
+        for wobble in (0.995, 1.0):
+            closes = cs[lo:end - 1] + [cs[end - 1] * wobble]
+            c = Candles(open_time=ot[lo:end], high=hs[lo:end], low=ls[lo:end], close=closes)
+            v = t.values(c)
+        assert v["ema200"] == pytest.approx(ema(closes, 200), rel=1e-10)
+        assert v["ema50"] == pytest.approx(ema(closes, 50), rel=1e-10)
+        assert v["rsi14"] == pytest.approx(rsi(closes, 14), rel=1e-9)
+        assert v["atr14"] == pytest.approx(atr(hs[lo:end], ls[lo:end], closes, 14), rel=1e-10)
+
+
+def test_series_indicators_state_survives_export_and_load():
+    """Restart path: to_dict -> JSON (indicator_state) -> load into a fresh tracker."""
+    window = 220
+    specs = [("ema", 50), ("ema", 200), ("rsi", 14), ("atr", 14)]
+    hs, ls, cs = _bars(window + 60, seed=8)
+    ot = [i * 86_400_000 for i in range(len(cs))]
+
+    def candles(end):
+        lo = end - window
+        return Candles(open_time=ot[lo:end], high=hs[lo:end], low=ls[lo:end], close=cs[lo:end])
+
+    t = _SeriesIndicators("1d", specs, window)
+    for end in range(window, window + 30):
+        t.values(candles(end))
+    clone = _SeriesIndicators("1d", specs, window)
+    clone.load(json.loads(json.dumps(t.to_dict())))
+    assert clone.last_ot == t.last_ot is not None
+    for end in range(window + 30, len(cs) + 1):
+        assert clone.values(candles(end)) == pytest.approx(t.values(candles(end)), rel=1e-12)
+
+
+def test_series_indicators_load_rejects_other_window():
+    t = _SeriesIndicators("1h", [("ema", 50)], 120)
+    t.values(Candles(open_time=[i * 3_600_000 for i in range(130)], high=[1.0] * 130, low=[1.0] * 130,
+                     close=[1.0] * 130))
+    other = _SeriesIndicators("1h", [("ema", 50)], 160)
+    other.load(t.to_dict())
+    assert other.last_ot is None
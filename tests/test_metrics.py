@@ -0,0 +1,41 @@
+"""API latency middleware and stage-timer label children."""
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from src.app.api.latency import ApiLatency
+from src.app.infra.metrics import API_LATENCY, STAGE_DURATION, Spans
+
+
+def test_latency_recorded_per_route_template():
+    app = FastAPI()
+    app.add_middleware(ApiLatency)
+
+    @app.get("/things/{key}")
+    async def thing(key: str):
+        return {"key": key}
+
+    @app.websocket("/ws")
+    async def ws(sock: WebSocket):
+        await sock.accept()
+        await sock.send_text("hi")
+        await sock.close()
+
+    before = API_LATENCY.labels("GET", "/things/{key}", "200").count
+    with TestClient(app) as client:
+        assert client.get("/things/a").json() == {"key": "a"}
+        assert client.get("/things/b").status_code == 200
+        assert client.get("/nope").status_code == 404
+        with client.websocket_connect("/ws") as sock:  # http dışı scope'lar dokunulmadan geçer
+            assert sock.receive_text() == "hi"
+    assert API_LATENCY.labels("GET", "/things/{key}", "200").count == before + 2
+    assert API_LATENCY.labels("GET", "unmatched", "404").count >= 1
+
+
+def test_spans_reuse_stage_children():
+    sp = Spans("test_scope")
+    sp.mark("a")
+    child = STAGE_DURATION.labels("test_scope", "a")
+    Spans("test_scope").mark("a")
+    assert child.count == 2
+    assert sp._children is Spans("test_scope")._children
+    assert sp._children["a"] is child
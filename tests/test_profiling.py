@@ -0,0 +1,72 @@
+"""On-demand profiler: who may arm it, what counts as a cycle, sampler idle between cycles."""
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from src.app.domain.models import Signal
+from src.app.infra.profiling import RefreshProfiler, profiler
+from src.app.infra.scheduler.events import EventEvaluator
+from src.app.infra.scheduler.jobs import store
+from src.app.services.market_service import MarketService
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_arm_refused_outside_the_fetcher():
+    p = RefreshProfiler()
+    with pytest.raises(RuntimeError, match="no refresh cycles"):
+        p.arm(1)
+    p.enabled = True
+    p.arm(1)
+    assert p.armed
+
+
+def test_sampler_only_samples_inside_cycles():
+    p = RefreshProfiler()
+    p.enabled = True
+    p.arm(2, "sample", interval_ms=1)
+    p.begin_cycle()
+    _busy(0.05)
+    p.end_cycle()
+    first = p.status()["samples"]
+    assert first > 0
+    time.sleep(0.1)  # cycle'lar arası: örnek yok
+    assert p.status()["samples"] == first
+    p.begin_cycle()
+    _busy(0.05)
+    p.end_cycle()
+    assert not p.armed and p.samples > first
+    assert p.result_name.endswith(".collapsed.txt") and b"_busy" in p.result
+
+
+def test_event_evaluator_tick_is_a_cycle(monkeypatch):
+    monkeypatch.setattr(profiler, "enabled", True)
+    monkeypatch.setattr(store, "signals", [Signal(symbol="BTCUSDT", decision="BEKLE", score=50,
+                                                  daily_trend_ok=False, updated_at=datetime.utcnow())])
+    ev = EventEvaluator(MarketService(client=None))
+    calls = []
+
+    async def evaluate(closed, moved, now):
+        calls.append(closed)
+        assert profiler._started is not None  # cycle içinde
+
+    ev._evaluate = evaluate
+    profiler.arm(1, "cprofile")
+    try:
+        ev._due["BTCUSDT"] = 0.0  # mum kapanışı geçmiş
+        asyncio.run(ev._tick())
+        assert calls == [["BTCUSDT"]]
+        assert not profiler.armed and profiler.result_name.endswith(".pstats")
+        # değerlendirme olmayan tick cycle sayılmaz
+        profiler.arm(1, "cprofile")
+        asyncio.run(ev._tick())
+        assert profiler.armed and len(calls) == 1
+    finally:
+        profiler.remaining = 0
+        profiler._prof = None
@@ -0,0 +1,31 @@
+"""BINANCE_REPLAY inside the app never writes to the live SQLite file."""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.app import main
+from src.app.infra.storage import db
+
+
+def test_replay_uses_its_own_db(monkeypatch, tmp_path):
+    live = db.DB_PATH
+    monkeypatch.setattr(db, "DB_PATH", live)
+    monkeypatch.setattr(main.settings, "replay_db_path", "")
+    main._use_replay_db()
+    assert db.DB_PATH != live and db.DB_PATH.name == "app.db"
+    asyncio.run(db.init_db())
+    assert db.DB_PATH.exists()
+
+    monkeypatch.setattr(db, "DB_PATH", live)
+    monkeypatch.setattr(main.settings, "replay_db_path", str(tmp_path / "replay.db"))
+    main._use_replay_db()
+    assert db.DB_PATH == tmp_path / "replay.db"
+
+
+def test_replay_refuses_the_live_db(monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", Path("data/app.db"))
+    monkeypatch.setattr(main.settings, "replay_db_path", "./data/../data/app.db")
+    with pytest.raises(RuntimeError, match="live database"):
+        main._use_replay_db()
+    assert db.DB_PATH == Path("data/app.db")
@@ -0,0 +1,22 @@
+"""ScoreParams parsing (SCORE_PARAMS env / optimizer output)."""
+import pytest
+
+from src.app.domain.scoring import ScoreParams
+
+
+def test_from_dict_coerces_to_field_types():
+    p = ScoreParams.from_dict({"buy_score": 72.0, "sell_score": "30", "stop_atr": "1.5", "target_atr": 2})
+    assert (p.buy_score, p.sell_score, p.stop_atr, p.target_atr) == (72, 30, 1.5, 2.0)
+    assert isinstance(p.buy_score, int) and isinstance(p.target_atr, float)
+
+
+@pytest.mark.parametrize("value", [72.5, "72.5", "abc"])
+def test_from_dict_rejects_non_integral_int_fields(value):
+    with pytest.raises(ValueError):
+        ScoreParams.from_dict({"buy_score": value})
+
+
+def test_from_json_rejects_unknown_keys():
+    with pytest.raises(ValueError, match="unknown score params"):
+        ScoreParams.from_json('{"buy_scor": 70}')
+    assert ScoreParams.from_json(None) == ScoreParams()
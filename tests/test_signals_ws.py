@@ -0,0 +1,59 @@
+"""/signals/ws subscriber lifecycle."""
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app.api.routes.signals import router, signals_ws
+from src.app.services.signal_feed import feed
+
+
+class FakeSocket:
+    """Client side under test control: `leave()` delivers websocket.disconnect."""
+
+    def __init__(self):
+        self.sent = []
+        self.inbox: asyncio.Queue = asyncio.Queue()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def receive(self):
+        return await self.inbox.get()
+
+    def say(self, text):
+        self.inbox.put_nowait({"type": "websocket.receive", "text": text})
+
+    def leave(self):
+        self.inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+
+
+def test_disconnect_unsubscribes_without_waiting_for_a_publish():
+    async def main():
+        ws = FakeSocket()
+        handler = asyncio.create_task(signals_ws(ws))
+        while not ws.sent:
+            await asyncio.sleep(0.01)
+        assert feed.stats()["subscribers"] == 1
+        ws.say("ping")  # istemci mesajları yok sayılır
+        await asyncio.sleep(0.05)
+        assert not handler.done()
+        ws.leave()
+        # publish olmadan handler biter, kuyruk bırakılır
+        await asyncio.wait_for(handler, timeout=1.0)
+        assert feed.stats()["subscribers"] == 0
+        assert '"snapshot"' in ws.sent[0]
+
+    asyncio.run(main())
+
+
+def test_snapshot_on_connect():
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        with client.websocket_connect("/signals/ws") as ws:
+            assert '"type":"snapshot"' in ws.receive_text()
+    assert feed.stats()["subscribers"] == 0
@@ -0,0 +1,91 @@
+"""Strategy plugin contract: abstract base, uniform constructor, requirement merge."""
+import pytest
+
+from src.app.domain import scoring
+from src.app.domain.strategy import RsiReversion, Strategy, TrendScore, build, merge
+
+
+def test_base_is_abstract():
+    with pytest.raises(TypeError):
+        Strategy()
+
+    class Partial(Strategy):
+        name = "partial"
+
+        def requires(self):
+            return merge([])
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_build_passes_params_and_entry_tf_to_every_plugin():
+    params = scoring.ScoreParams(buy_score=75)
+    out = build(["trend", "rsi_reversion"], params, "1h")
+    assert [type(s) for s in out] == [TrendScore, RsiReversion]
+    assert all(s.p is params and s.entry_tf == "1h" for s in out)
+    req = merge(s.requires() for s in out)
+    assert req.candles == {"1d": 220, "1h": 160}
+    assert ("rsi", 7) in req.indicators["1h"] and ("rsi", 14) in req.indicators["1h"]
+
+
+def test_build_defaults_and_unknown_names():
+    assert [type(s) for s in build([])] == [TrendScore]
+    with pytest.raises(ValueError, match="unknown strategy"):
+        build(["nope"])
+
+
+def _candles(interval, n, seed):
+    from array import array
+    import random
+
+    from src.app.domain.candles import Candles
+    from src.app.infra.storage.candles import INTERVAL_MS
+
+    rnd = random.Random(seed)
+    x, close = 100.0, []
+    for _ in range(n):
+        x *= 1 + rnd.gauss(0.0005, 0.01)
+        close.append(x)
+    step = INTERVAL_MS[interval]
+    return Candles(open_time=array("q", range(0, n * step, step)), high=array("d", (c * 1.004 for c in close)),
+                   low=array("d", (c * 0.996 for c in close)), close=array("d", close))
+
+
+class _Seen(RsiReversion):
+    """Records the indicator values it was evaluated on."""
+
+    def evaluate(self, st):
+        self.seen = st.values
+        return super().evaluate(st)
+
+
+def test_extra_strategy_does_not_change_the_primary_one():
+    """Each strategy's EMA/RSI run over its own lookback, not the merged fetch window."""
+    from datetime import datetime
+
+    from src.app.services.market_service import EvalInput, MarketService
+
+    def signal(strategies, fetched):
+        market = MarketService(client=None, strategies=strategies)
+        candles = {iv: fetched[iv].tail(n) for iv, n in market.windows.items()}
+        sig, _ = market.compute(EvalInput("TESTUSDT", datetime(2026, 1, 1), candles, 0.02, None))
+        return market, sig
+
+    fetched = {"1d": _candles("1d", 400, 1), "1h": _candles("1h", 400, 2), "15m": _candles("15m", 400, 3)}
+    alone_market, alone = signal([_Seen(entry_tf="1h")], fetched)
+    primary = _Seen(entry_tf="1h")
+    both_market, both = signal([primary, TrendScore()], fetched)
+    # birleşik fetch penceresi büyüdü ...
+    assert both_market.windows["1d"] > alone_market.windows["1d"]
+    # ... birincil stratejinin gördüğü EMA200/RSI7 birebir aynı kaldı
+    ref = alone_market.strategies[0].seen
+    assert primary.seen.keys() == ref.keys()
+    for iv in ref:
+        assert primary.seen[iv] == pytest.approx(ref[iv], rel=1e-12)
+    assert both.model_dump(exclude={"strategies"}) == alone.model_dump(exclude={"strategies"})
+    _, trend = signal([TrendScore()], fetched)
+    assert both.strategies["trend"].model_dump() == {
+        "decision": trend.decision, "score": trend.score, "plan": trend.plan.model_dump(),
+        "reason": trend.reason.rsplit(" | ", 1)[0],
+    }